@@ -1,20 +1,104 @@
 from django.contrib import admin
-from .models import Registration, Mcq, QuizResult
+from django.db.models import Q
+from .models import Registration, Mcq, QuizResult, McqStats, SlowRequest
+from .search import catalog_matches, index_mcqs, search_ids
+from .middleware import forget_quiz_user
+
+ADMIN_SEARCH_LIMIT = 1000
 
 # Admin for MCQ
 @admin.register(Mcq)
 class McqAdmin(admin.ModelAdmin):
     list_display = ("topic", "subtopic", "difficulty", "question_no", "question", "correct_answer")
+    # Question text goes through the full-text index and topic/subtopic
+    # substrings through the catalog, instead of icontains table scans
     search_fields = ("topic", "subtopic", "question")
     list_filter = ("topic", "difficulty")
 
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        ids = [mcq_id for mcq_id, _ in search_ids(search_term, ADMIN_SEARCH_LIMIT)]
+        topics, subtopics = catalog_matches(search_term)
+        return queryset.filter(Q(id__in=ids) | Q(topic__in=topics) | Q(subtopic__in=subtopics)), False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        index_mcqs([obj], replace=True)
+
 # Register the rest safely
 @admin.register(Registration)
 class RegistrationAdmin(admin.ModelAdmin):
     list_display = ("first_name", "last_name", "email", "contact", "gender")
     search_fields = ("first_name", "last_name", "email")
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        forget_quiz_user(obj.pk)
+
+    def delete_model(self, request, obj):
+        forget_quiz_user(obj.pk)
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for user_id in queryset.values_list("pk", flat=True):
+            forget_quiz_user(user_id)
+        super().delete_queryset(request, queryset)
+
 @admin.register(QuizResult)
 class QuizResultAdmin(admin.ModelAdmin):
     list_display = ("user", "topic", "subtopic", "difficulty", "score", "date_attempted")
     search_fields = ("user__first_name", "topic", "subtopic")
+
+# Item statistics, filled by `manage.py compute_item_stats`
+class QualityFilter(admin.SimpleListFilter):
+    title = "quality"
+    parameter_name = "quality"
+
+    def lookups(self, request, model_admin):
+        return (
+            ("too_easy", "Too easy (p > 0.9)"),
+            ("too_hard", "Too hard (p < 0.2)"),
+            ("low_discrimination", "Low discrimination (< 0.2)"),
+            ("negative_discrimination", "Negative discrimination (check answer key)"),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == "too_easy":
+            return queryset.filter(p_value__gt=0.9)
+        if self.value() == "too_hard":
+            return queryset.filter(p_value__lt=0.2)
+        if self.value() == "low_discrimination":
+            return queryset.filter(discrimination__lt=0.2)
+        if self.value() == "negative_discrimination":
+            return queryset.filter(discrimination__lt=0)
+        return queryset
+
+@admin.register(McqStats)
+class McqStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "mcq", "responses", "p_value", "discrimination",
+        "option1_count", "option2_count", "option3_count", "option4_count",
+        "unanswered_count", "computed_at",
+    )
+    list_filter = (QualityFilter, "mcq__topic", "mcq__difficulty")
+    list_select_related = ("mcq",)
+    ordering = ("discrimination",)
+    # Question text is matched through the search index, not icontains
+    search_fields = ("mcq__question",)
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        ids = [mcq_id for mcq_id, _ in search_ids(search_term, ADMIN_SEARCH_LIMIT)]
+        return queryset.filter(mcq_id__in=ids), False
+
+# Captured by base.profiling.ProfilingMiddleware
+@admin.register(SlowRequest)
+class SlowRequestAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "method", "path", "view_name", "status_code", "duration_ms", "query_count", "sql_ms", "trigger")
+    list_filter = ("trigger", "view_name")
+    ordering = ("-created_at",)
+    readonly_fields = [field.name for field in SlowRequest._meta.fields]
@@ -0,0 +1,208 @@
+"""
+Per-user cache for the analytics pages (dashboard, history, results, suggestions).
+
+A student's analytics only change when they submit a quiz, so every cached
+context is keyed by user, view name, view parameters and a per-user version
+counter. submit_quiz bumps the counter, which orphans all older entries for
+that user at once; they simply expire from the backend later.
+
+That only works if every worker sees the same counters, so caching is off
+when the backend is a per-process locmem cache and WEB_CONCURRENCY (the
+worker count gunicorn and most process managers read) is above 1.
+
+A bump also marks the user for REPLICA_PIN_SECONDS: entries built in that
+window read from the primary, so a lagging replica cannot store pre-submit
+data under the new version, whichever session or device asks first.
+"""
+import logging
+import os
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .routers import reset_read_alias, set_read_alias
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "analytics:version:{user_id}"
+PRIMARY_KEY = "analytics:primary_until:{user_id}"
+ENTRY_KEY = "analytics:{view}:{user_id}:{version}:{params}"
+STATS_KEY = "analytics:stats:{view}:{outcome}"
+
+
+def get_cache():
+    return caches[getattr(settings, "ANALYTICS_CACHE_ALIAS", "default")]
+
+
+def worker_count():
+    try:
+        return max(int(os.environ.get("WEB_CONCURRENCY", "1")), 1)
+    except ValueError:
+        return 1
+
+
+def analytics_cache_enabled():
+    """
+    False when ANALYTICS_CACHE_TIMEOUT is 0, or when several workers would
+    each keep their own locmem copy and miss each other's invalidations.
+    """
+    if not getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 3600):
+        return False
+    return not (isinstance(get_cache(), LocMemCache) and worker_count() > 1)
+
+
+def get_user_version(user_id):
+    """
+    Current analytics version for a user. A missing counter (first visit or
+    eviction) is seeded from the clock so it can never collide with a
+    version that older entries were stored under.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_user_version(user_id):
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def _pin_seconds():
+    return getattr(settings, "REPLICA_PIN_SECONDS", 10)
+
+
+def bump_user_version(user_id):
+    """
+    Invalidate every cached analytics context for a user.
+    """
+    cache = get_cache()
+    cache.set(PRIMARY_KEY.format(user_id=user_id), time.time() + _pin_seconds(), _pin_seconds() + 1)
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+async def abump_user_version(user_id):
+    cache = get_cache()
+    await cache.aset(PRIMARY_KEY.format(user_id=user_id), time.time() + _pin_seconds(), _pin_seconds() + 1)
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, time.time_ns(), timeout=None)
+
+
+def _record(view, outcome):
+    cache = get_cache()
+    key = STATS_KEY.format(view=view, outcome=outcome)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+async def _arecord(view, outcome):
+    cache = get_cache()
+    key = STATS_KEY.format(view=view, outcome=outcome)
+    if not await cache.aadd(key, 1, timeout=None):
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, timeout=None)
+
+
+def get_or_build(user_id, view, builder, **params):
+    """
+    Return the cached context for (user, view, params), calling builder()
+    and storing its result on a miss. The builder must return plain,
+    picklable data (lists and dicts, not lazy querysets).
+    """
+    if not analytics_cache_enabled():
+        return builder()
+    cache = get_cache()
+    key = ENTRY_KEY.format(
+        view=view,
+        user_id=user_id,
+        version=get_user_version(user_id),
+        params=urlencode(sorted(params.items())),
+    )
+    context = cache.get(key)
+    if context is not None:
+        _record(view, "hits")
+        return context
+
+    _record(view, "misses")
+    if cache.get(PRIMARY_KEY.format(user_id=user_id), 0) > time.time():
+        token = set_read_alias(None)
+        try:
+            context = builder()
+        finally:
+            reset_read_alias(token)
+    else:
+        context = builder()
+    cache.set(key, context, getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 3600))
+    return context
+
+
+async def aget_or_build(user_id, view, builder, **params):
+    """
+    get_or_build() for async views; builder is a coroutine function.
+    """
+    if not analytics_cache_enabled():
+        return await builder()
+    cache = get_cache()
+    key = ENTRY_KEY.format(
+        view=view,
+        user_id=user_id,
+        version=await aget_user_version(user_id),
+        params=urlencode(sorted(params.items())),
+    )
+    context = await cache.aget(key)
+    if context is not None:
+        await _arecord(view, "hits")
+        return context
+
+    await _arecord(view, "misses")
+    if await cache.aget(PRIMARY_KEY.format(user_id=user_id), 0) > time.time():
+        token = set_read_alias(None)
+        try:
+            context = await builder()
+        finally:
+            reset_read_alias(token)
+    else:
+        context = await builder()
+    await cache.aset(key, context, getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 3600))
+    return context
+
+
+def cache_stats(views=("dashboard", "history", "results", "suggestions")):
+    """
+    Hit/miss counters and hit rate per cached view.
+    """
+    cache = get_cache()
+    stats = {}
+    for view in views:
+        hits = cache.get(STATS_KEY.format(view=view, outcome="hits"), 0)
+        misses = cache.get(STATS_KEY.format(view=view, outcome="misses"), 0)
+        total = hits + misses
+        stats[view] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+    return stats
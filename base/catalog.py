@@ -0,0 +1,79 @@
+"""
+Topic -> subtopic -> difficulty catalog of the question bank, with counts.
+
+Built from a single GROUP BY over Mcq and kept in the cache, so the quiz
+dropdowns never scan the bank on a page view. Ingestion paths call
+refresh_catalog() after adding questions; the timeout only bounds how long
+another worker's local cache can lag behind.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Mcq
+
+CATALOG_KEY = "catalog:tree"
+
+
+def build_catalog():
+    rows = (
+        Mcq.objects.values("topic", "subtopic", "difficulty")
+        .annotate(count=Count("id"))
+        .order_by("topic", "subtopic", "difficulty")
+    )
+
+    topics = {}
+    for row in rows:
+        topic = topics.setdefault(row["topic"], {"name": row["topic"], "count": 0, "subtopics": {}})
+        subtopic = topic["subtopics"].setdefault(
+            row["subtopic"], {"name": row["subtopic"], "count": 0, "difficulties": []}
+        )
+        subtopic["difficulties"].append({"name": row["difficulty"], "count": row["count"]})
+        subtopic["count"] += row["count"]
+        topic["count"] += row["count"]
+
+    for topic in topics.values():
+        topic["subtopics"] = list(topic["subtopics"].values())
+
+    return {
+        "topics": list(topics.values()),
+        "total": sum(topic["count"] for topic in topics.values()),
+    }
+
+
+def get_catalog():
+    catalog = cache.get(CATALOG_KEY)
+    if catalog is None:
+        catalog = refresh_catalog()
+    return catalog
+
+
+async def aget_catalog():
+    catalog = await cache.aget(CATALOG_KEY)
+    if catalog is None:
+        catalog = await sync_to_async(refresh_catalog)()
+    return catalog
+
+
+def refresh_catalog():
+    catalog = build_catalog()
+    cache.set(CATALOG_KEY, catalog, getattr(settings, "CATALOG_CACHE_TIMEOUT", 300))
+    return catalog
+
+
+def dropdown_options(catalog):
+    """
+    Flat, sorted topic/subtopic/difficulty lists for the quiz form.
+    """
+    subtopics = set()
+    difficulties = set()
+    for topic in catalog["topics"]:
+        for subtopic in topic["subtopics"]:
+            subtopics.add(subtopic["name"])
+            difficulties.update(d["name"] for d in subtopic["difficulties"])
+    return {
+        "topics": [topic["name"] for topic in catalog["topics"]],
+        "subtopics": sorted(subtopics),
+        "difficulties": sorted(difficulties),
+    }
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .caching import analytics_cache_enabled, get_cache, worker_count
+from .metrics import metrics_enabled
+
+
+@register()
+def check_analytics_cache(app_configs, **kwargs):
+    """
+    Warn when analytics caching is switched off because the cache is not
+    shared between workers.
+    """
+    if not getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 3600) or analytics_cache_enabled():
+        return []
+    return [Warning(
+        f"{type(get_cache()).__name__} is per process but WEB_CONCURRENCY is {worker_count()}; "
+        "analytics caching is disabled.",
+        hint="Use a shared cache (QUIZ_CACHE_BACKEND=file, the default) or run a single worker.",
+        id="base.W001",
+    )]
+
+
+@register()
+def check_metrics_token(app_configs, **kwargs):
+    """
+    Warn when metrics are on without a scrape token, so /metrics is limited
+    to admin sessions.
+    """
+    if not metrics_enabled() or getattr(settings, "METRICS_TOKEN", ""):
+        return []
+    return [Warning(
+        "METRICS_ENABLED is on but METRICS_TOKEN is not set; /metrics only answers admin sessions.",
+        hint="Set QUIZ_METRICS_TOKEN and scrape with \"Authorization: Bearer <token>\".",
+        id="base.W002",
+    )]
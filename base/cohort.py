@@ -0,0 +1,166 @@
+"""
+Admin-wide cohort analytics over every QuizResult, aggregated with NumPy.
+
+Results are read in fixed-size keyset chunks (one query per chunk, see
+pagination.keyset_chunks) and folded into small running aggregates (a
+0.1-point score histogram, per-topic and per-week sums), so memory stays
+bounded by the chunk size no matter how many rows exist. Percentiles are read off the histogram. The finished report is
+written as JSON to COHORT_REPORT_PATH, where every worker reads it; the
+cohort_analytics management command (e.g. from cron) refreshes it out of
+band, so admin page views never scan QuizResult.
+"""
+import json
+import os
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+
+from .models import QuizResult
+from .pagination import keyset_chunks
+
+CHUNK_SIZE = 50_000
+PASS_MARK = 60.0
+HISTOGRAM_BINS = 1001  # 0.0 .. 100.0 in steps of 0.1
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+SECONDS_PER_WEEK = 7 * 24 * 3600
+# The Unix epoch fell on a Thursday; shift so weeks start on Monday
+WEEK_OFFSET = 3 * 24 * 3600
+
+
+class _Grouped:
+    """
+    Running attempts / score sum / passes per key (a topic or a week start).
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.attempts = np.zeros(0, dtype=np.int64)
+        self.score_sum = np.zeros(0, dtype=np.float64)
+        self.passes = np.zeros(0, dtype=np.int64)
+
+    def add(self, keys, scores):
+        uniques, inverse = np.unique(keys, return_inverse=True)
+        for key in uniques:
+            self.index.setdefault(key, len(self.index))
+        size = len(self.index)
+        if size > len(self.attempts):
+            grow = size - len(self.attempts)
+            self.attempts = np.concatenate([self.attempts, np.zeros(grow, dtype=np.int64)])
+            self.score_sum = np.concatenate([self.score_sum, np.zeros(grow)])
+            self.passes = np.concatenate([self.passes, np.zeros(grow, dtype=np.int64)])
+
+        codes = np.fromiter((self.index[key] for key in uniques), dtype=np.int64, count=len(uniques))[inverse]
+        self.attempts += np.bincount(codes, minlength=size)
+        self.score_sum += np.bincount(codes, weights=scores, minlength=size)
+        self.passes += np.bincount(codes, weights=scores >= PASS_MARK, minlength=size).astype(np.int64)
+
+    def rows(self):
+        for key, code in self.index.items():
+            attempts = int(self.attempts[code])
+            yield key, {
+                "attempts": attempts,
+                "avg_score": round(float(self.score_sum[code]) / attempts, 2),
+                "pass_rate": round(100.0 * int(self.passes[code]) / attempts, 2),
+            }
+
+
+def _percentile(cumulative, total, q):
+    target = q / 100.0 * total
+    return round(float(np.searchsorted(cumulative, target)) / 10.0, 1)
+
+
+def compute_cohort_analytics(chunk_size=CHUNK_SIZE):
+    histogram = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+    total = 0
+    score_sum = 0.0
+    score_sq_sum = 0.0
+    topics = _Grouped()
+    weeks = _Grouped()
+
+    for chunk in keyset_chunks(QuizResult.objects.all(), ("topic", "score", "date_attempted"), chunk_size):
+        n = len(chunk)
+        chunk_topics = np.array([row[0] for row in chunk], dtype=object)
+        scores = np.fromiter((row[1] for row in chunk), dtype=np.float64, count=n)
+        stamps = np.fromiter((row[2].timestamp() for row in chunk), dtype=np.float64, count=n)
+
+        bins = np.clip(np.rint(scores * 10), 0, HISTOGRAM_BINS - 1).astype(np.int64)
+        histogram += np.bincount(bins, minlength=HISTOGRAM_BINS)
+        total += n
+        score_sum += float(scores.sum())
+        score_sq_sum += float(np.square(scores).sum())
+
+        topics.add(chunk_topics, scores)
+        week_starts = (stamps + WEEK_OFFSET) // SECONDS_PER_WEEK * SECONDS_PER_WEEK - WEEK_OFFSET
+        weeks.add(week_starts, scores)
+
+    report = {
+        "computed_at": datetime.now(dt_timezone.utc).isoformat(),
+        "total_results": total,
+        "mean_score": 0.0,
+        "std_score": 0.0,
+        "percentiles": {},
+        "score_distribution": [],
+        "topics": [],
+        "weekly": [],
+    }
+    if not total:
+        return report
+
+    mean = score_sum / total
+    cumulative = np.cumsum(histogram)
+    report["mean_score"] = round(mean, 2)
+    report["std_score"] = round(float(np.sqrt(max(score_sq_sum / total - mean * mean, 0.0))), 2)
+    report["percentiles"] = {
+        f"p{q}": _percentile(cumulative, total, q) for q in PERCENTILES
+    }
+
+    # Ten 10-point buckets; 100 joins the 90-100 bucket
+    deciles = np.add.reduceat(histogram[:1000], np.arange(0, 1000, 100))
+    deciles[-1] += histogram[1000]
+    report["score_distribution"] = [
+        {"range": f"{low}-{low + 10}", "count": int(count)}
+        for low, count in zip(range(0, 100, 10), deciles)
+    ]
+
+    report["topics"] = sorted(
+        ({"topic": topic, **stats} for topic, stats in topics.rows()),
+        key=lambda row: row["pass_rate"],
+    )
+    report["weekly"] = sorted(
+        (
+            {"week_start": datetime.fromtimestamp(week, dt_timezone.utc).date().isoformat(), **stats}
+            for week, stats in weeks.rows()
+        ),
+        key=lambda row: row["week_start"],
+    )
+    return report
+
+
+def _report_path():
+    return getattr(settings, "COHORT_REPORT_PATH", os.path.join(settings.BASE_DIR, ".cache", "cohort_report.json"))
+
+
+def refresh_cohort_analytics(chunk_size=CHUNK_SIZE):
+    """
+    Recompute the report and replace the stored one atomically.
+    """
+    report = compute_cohort_analytics(chunk_size)
+    path = _report_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(report, fh)
+    os.replace(tmp_path, path)
+    return report
+
+
+def get_cohort_analytics():
+    """
+    The stored report, or None if it has never been computed.
+    """
+    try:
+        with open(_report_path()) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
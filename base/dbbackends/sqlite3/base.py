@@ -0,0 +1,10 @@
+"""
+SQLite backend that records connection-open counts and time (see base/dbstats.py).
+"""
+from django.db.backends.sqlite3 import base
+
+from base.dbstats import TimedConnectMixin
+
+
+class DatabaseWrapper(TimedConnectMixin, base.DatabaseWrapper):
+    pass
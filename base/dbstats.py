@@ -0,0 +1,53 @@
+"""
+Connection-open statistics for the database backends in base/dbbackends.
+
+The backends time every new connection (including the TLS/auth handshake
+for MySQL and the init_command PRAGMAs for SQLite) and record it here, per
+alias. With CONN_MAX_AGE > 0 the open count should stay near the number of
+worker threads instead of growing with every request. Counters are per
+process and reset on restart.
+"""
+import threading
+import time
+
+_lock = threading.Lock()
+_stats = {}
+_started = time.time()
+
+
+def record_connect(alias, seconds):
+    with _lock:
+        stats = _stats.setdefault(alias, {"opens": 0, "open_seconds": 0.0})
+        stats["opens"] += 1
+        stats["open_seconds"] += seconds
+
+
+def connection_stats():
+    with _lock:
+        aliases = {
+            alias: {
+                "opens": stats["opens"],
+                "open_seconds": round(stats["open_seconds"], 6),
+                "avg_open_ms": round(1000 * stats["open_seconds"] / stats["opens"], 3),
+            }
+            for alias, stats in _stats.items()
+        }
+    return {"since": _started, "aliases": aliases}
+
+
+def reset_connection_stats():
+    with _lock:
+        _stats.clear()
+
+
+class TimedConnectMixin:
+    """
+    Mixed into a backend's DatabaseWrapper to time get_new_connection().
+    """
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        try:
+            return super().get_new_connection(conn_params)
+        finally:
+            record_connect(self.alias, time.perf_counter() - started)
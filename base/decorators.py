@@ -1,9 +1,56 @@
 # ---------- base/decorators.py ----------
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib import messages
 from django.shortcuts import redirect
 
+from .routers import aread_alias_for, read_alias_for, reset_read_alias, set_read_alias
+
 def custom_login_required(view_func):
+    """
+    Redirect to login unless request.quiz_user (see middleware.py) resolves
+    to a Registration; the view can then reuse it without another query.
+    Async views get the same check through request.aquiz_user().
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if not await request.aquiz_user():
+                messages.warning(request, "Please log in first.")
+                return redirect("login")
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if "user_id" not in request.session:
-            return redirect("user_login")  # 👈 make sure this matches your login URL name
+        if not request.quiz_user:
+            messages.warning(request, "Please log in first.")
+            return redirect("login")
         return view_func(request, *args, **kwargs)
     return wrapper
+
+def read_from_replica(view_func):
+    """
+    Run the view's reads on the replica database (see routers.py), unless
+    the session was pinned to the primary by a recent write.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            # The ORM's sync_to_async calls copy this context, alias included
+            token = set_read_alias(await aread_alias_for(request))
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                reset_read_alias(token)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        token = set_read_alias(read_alias_for(request))
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            reset_read_alias(token)
+    return wrapper
@@ -0,0 +1,537 @@
+"""
+Near-duplicate question detection with MinHash and locality-sensitive hashing.
+
+Each question is reduced to a set of shingles (word 3-grams of the question
+plus each whole option), and the set to a MinHash signature of NUM_PERM
+values. Two signatures agree in a position with probability equal to the
+Jaccard similarity of the shingle sets. Signatures are split into BANDS bands
+of ROWS values; questions sharing any band are candidates, so a lookup only
+compares against a few questions instead of the whole bank. Candidates are
+then confirmed by estimated similarity >= threshold.
+
+The bank's index lives in the DEDUP_INDEX_PATH directory as plain .npy
+arrays that every worker memory-maps, so the signatures sit once in the OS
+page cache rather than once per process: ids in ascending order, their
+signatures, and for each band the band keys in sorted order with the rows
+they belong to, which a lookup binary-searches. Questions added, edited or
+deleted since that base was written are kept in a small delta file until it
+grows past DELTA_LIMIT and is merged into a new base. A manifest names the
+current base and delta and is replaced atomically, so readers always see a
+consistent pair and reload when it changes.
+
+Ingestion screens rows with a Screener before saving, then calls sync_index()
+to add everything newer than the last indexed id; edits and deletions reach
+the delta through signals, batched per transaction (see signals.py). rebuild_index() rewrites the
+index from the database, and store_clusters() saves the near-duplicate
+clusters the admin report reads.
+"""
+import heapq
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+
+from .models import Mcq
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialised across processes
+    fcntl = None
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+THRESHOLD = 0.8
+MODES = ("flag", "skip", "off")
+TEXT_FIELDS = ("id", "question", "option1", "option2", "option3", "option4")
+MAX_REPORTED = 1000
+DELTA_LIMIT = 50_000
+KEY_CHUNK = 100_000
+MANIFEST = "manifest.json"
+CLUSTERS = "clusters.json"
+LOCK = "write.lock"
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 1 << 62, size=ROWS, dtype=np.uint64)
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingles(question, options):
+    words = WORD_RE.findall((question or "").lower())
+    grams = {
+        " ".join(words[i:i + SHINGLE_SIZE])
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    } if words else set()
+    for option in options:
+        option_words = WORD_RE.findall((option or "").lower())
+        if option_words:
+            grams.add("opt:" + " ".join(option_words))
+    return grams
+
+
+def signature(question, options):
+    """
+    MinHash signature (uint32[NUM_PERM]) or None for text without words.
+    """
+    grams = shingles(question, options)
+    if not grams:
+        return None
+    hashed = np.fromiter(
+        (zlib.crc32(gram.encode()) % _PRIME for gram in grams), dtype=np.uint64, count=len(grams)
+    )
+    # (a * x + b) mod p stays below 2**63 because a, x < 2**31
+    return ((_A[:, None] * hashed[None, :] + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def mcq_signature(mcq):
+    return signature(mcq.question, (mcq.option1, mcq.option2, mcq.option3, mcq.option4))
+
+
+def band_keys(signatures):
+    """
+    One uint64 hash per band for each row of an (n, NUM_PERM) signature matrix.
+    """
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    return (bands * _BAND_MIX).sum(axis=2)
+
+
+def _ranked(matches):
+    return sorted(matches, key=lambda match: (-match[1], str(match[0])))
+
+
+class DedupIndex:
+    """
+    In-memory MinHash LSH index for small sets: an upload's pending rows,
+    the stored index's delta and cluster representatives.
+    """
+
+    def __init__(self):
+        self.signatures = {}
+        self.buckets = [defaultdict(list) for _ in range(BANDS)]
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def add(self, mcq_id, sig):
+        with self.lock:
+            self.remove(mcq_id)
+            self.signatures[mcq_id] = sig
+            for band, key in enumerate(band_keys(sig[None, :])[0].tolist()):
+                self.buckets[band][key].append(mcq_id)
+
+    def remove(self, mcq_id):
+        with self.lock:
+            sig = self.signatures.pop(mcq_id, None)
+            if sig is None:
+                return
+            for band, key in enumerate(band_keys(sig[None, :])[0].tolist()):
+                bucket = self.buckets[band][key]
+                bucket.remove(mcq_id)
+                if not bucket:
+                    del self.buckets[band][key]
+
+    def find(self, sig, threshold=THRESHOLD):
+        """
+        Indexed ids at least `threshold` similar to sig, most similar first.
+        """
+        with self.lock:
+            found = set()
+            for band, key in enumerate(band_keys(sig[None, :])[0].tolist()):
+                found.update(self.buckets[band].get(key, ()))
+            if not found:
+                return []
+            candidates = list(found)
+            matrix = np.stack([self.signatures[c] for c in candidates])
+        scores = (matrix == sig).mean(axis=1)
+        return _ranked((candidates[i], float(scores[i])) for i in np.flatnonzero(scores >= threshold))
+
+
+class StoredIndex:
+    """
+    The bank's index as stored under DEDUP_INDEX_PATH: a memory-mapped base
+    plus the delta (added or re-signed questions, and base ids no longer
+    valid) since the base was written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.signatures = np.zeros((0, NUM_PERM), dtype=np.uint32)
+        self.band_keys = np.zeros((BANDS, 0), dtype=np.uint64)
+        self.band_rows = np.zeros((BANDS, 0), dtype=np.int64)
+        self.delta = DedupIndex()
+        self.removed = set()
+        self.max_id = 0
+        self.stamp = None
+
+    @classmethod
+    def load(cls, path):
+        index = cls(path)
+        manifest_path = os.path.join(path, MANIFEST)
+        try:
+            stat = os.stat(manifest_path)
+            with open(manifest_path) as fh:
+                manifest = json.load(fh)
+        except FileNotFoundError:
+            return index
+        index.stamp = (stat.st_ino, stat.st_mtime_ns)
+        index.max_id = manifest["max_id"]
+        if manifest["version"]:
+            index.version = manifest["version"]
+            directory = os.path.join(path, index.version)
+            for name in ("ids", "signatures", "band_keys", "band_rows"):
+                setattr(index, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+        if manifest["delta"]:
+            with np.load(os.path.join(path, manifest["delta"])) as data:
+                for mcq_id, sig in zip(data["ids"].tolist(), data["signatures"]):
+                    index.delta.add(mcq_id, sig.copy())
+                index.removed = set(data["removed"].tolist())
+        return index
+
+    def find(self, sig, threshold=THRESHOLD):
+        """
+        Live questions at least `threshold` similar to sig, most similar first.
+        """
+        matches = self.delta.find(sig, threshold)
+        rows = []
+        for band, key in enumerate(band_keys(sig[None, :])[0]):
+            keys = self.band_keys[band]
+            low, high = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+            if high > low:
+                rows.append(self.band_rows[band, low:high])
+        if rows:
+            rows = np.unique(np.concatenate(rows))
+            ids = self.ids[rows].tolist()
+            scores = (self.signatures[rows] == sig).mean(axis=1)
+            matches += [
+                (ids[i], float(scores[i]))
+                for i in np.flatnonzero(scores >= threshold)
+                if ids[i] not in self.removed
+            ]
+        return _ranked(matches)
+
+    def live_items(self, chunk_size=KEY_CHUNK):
+        """
+        (id, signature) of every live question, in id order.
+        """
+        def base():
+            for start in range(0, len(self.ids), chunk_size):
+                ids = self.ids[start:start + chunk_size].tolist()
+                signatures = np.asarray(self.signatures[start:start + chunk_size])
+                for mcq_id, sig in zip(ids, signatures):
+                    if mcq_id not in self.removed:
+                        yield mcq_id, sig
+
+        return heapq.merge(base(), sorted(self.delta.signatures.items(), key=lambda item: item[0]),
+                           key=lambda item: item[0])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def index_path():
+    return str(getattr(settings, "DEDUP_INDEX_PATH", settings.BASE_DIR / ".cache" / "dedup_index"))
+
+
+def get_index(path=None):
+    """
+    The process-wide index, reloaded when the manifest has been replaced.
+    """
+    global _index
+    path = path or index_path()
+    try:
+        stat = os.stat(os.path.join(path, MANIFEST))
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+    except OSError:
+        stamp = None
+    with _index_lock:
+        if _index is None or _index.path != path or _index.stamp != stamp:
+            _index = StoredIndex.load(path)
+        return _index
+
+
+@contextmanager
+def _writing(path):
+    """
+    Serialise writers across processes and hand them the current index.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, LOCK), "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield get_index(path)
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp_path, path)
+
+
+def _publish(path, version, delta_name, max_id):
+    """
+    Point the manifest at a base and delta, then drop files nothing uses.
+    """
+    _write_json(os.path.join(path, MANIFEST), {"version": version, "delta": delta_name, "max_id": max_id})
+    # Processes still mapping an old base keep it readable until they reload
+    for name in os.listdir(path):
+        stale_base = name.startswith("v") and name != version
+        stale_delta = name.startswith("delta-") and name != delta_name
+        if stale_base:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+        elif stale_delta:
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+
+def _write_delta(index, delta, removed, max_id):
+    name = f"delta-{time.time_ns()}.npz"
+    ids = list(delta.signatures)
+    np.savez_compressed(
+        os.path.join(index.path, name),
+        ids=np.array(ids, dtype=np.int64),
+        signatures=np.array([delta.signatures[i] for i in ids], dtype=np.uint32).reshape(len(ids), NUM_PERM),
+        removed=np.array(sorted(removed), dtype=np.int64),
+    )
+    _publish(index.path, index.version, name, max_id)
+
+
+def _write_base(path, ids, signatures, max_id):
+    """
+    Write ids (ascending) and their signatures as a new base with an empty delta.
+    """
+    version = f"v{time.time_ns()}"
+    directory = os.path.join(path, version)
+    os.makedirs(directory)
+    keys = np.empty((BANDS, len(ids)), dtype=np.uint64)
+    for start in range(0, len(ids), KEY_CHUNK):
+        keys[:, start:start + KEY_CHUNK] = band_keys(signatures[start:start + KEY_CHUNK]).T
+    rows = np.argsort(keys, axis=1, kind="stable")
+    np.save(os.path.join(directory, "ids.npy"), ids)
+    np.save(os.path.join(directory, "signatures.npy"), signatures)
+    np.save(os.path.join(directory, "band_keys.npy"), np.take_along_axis(keys, rows, axis=1))
+    np.save(os.path.join(directory, "band_rows.npy"), rows)
+    _publish(path, version, None, max_id)
+
+
+def _compact(index):
+    ids, signatures = [], []
+    for mcq_id, sig in index.live_items():
+        ids.append(mcq_id)
+        signatures.append(sig)
+    _write_base(
+        index.path,
+        np.array(ids, dtype=np.int64),
+        np.array(signatures, dtype=np.uint32).reshape(len(ids), NUM_PERM),
+        index.max_id,
+    )
+
+
+def _store(index, max_id):
+    """
+    Persist the delta, or merge it into a new base once it outgrows DELTA_LIMIT.
+    """
+    if len(index.delta) + len(index.removed) > DELTA_LIMIT:
+        _compact(index)
+    else:
+        _write_delta(index, index.delta, index.removed, max_id)
+
+
+def _signed_rows(queryset, chunk_size):
+    for mcq in queryset.only(*TEXT_FIELDS).order_by("id").iterator(chunk_size=chunk_size):
+        sig = mcq_signature(mcq)
+        if sig is not None:
+            yield mcq.id, sig
+
+
+def sync_index(chunk_size=5000):
+    """
+    Index every question saved since the last sync. Returns the number of
+    questions added.
+    """
+    with _writing(index_path()) as index:
+        added = 0
+        max_id = index.max_id
+        delta = index.delta
+        for mcq_id, sig in _signed_rows(Mcq.objects.filter(id__gt=index.max_id), chunk_size):
+            delta.add(mcq_id, sig)
+            max_id = max(max_id, mcq_id)
+            added += 1
+        if added:
+            index.max_id = max_id
+            _store(index, max_id)
+    return added
+
+
+def update_mcqs(mcqs):
+    """
+    Re-sign edited questions, with one index write for the whole batch.
+    """
+    with _writing(index_path()) as index:
+        for mcq in mcqs:
+            sig = mcq_signature(mcq)
+            index.removed.add(mcq.pk)
+            if sig is None:
+                index.delta.remove(mcq.pk)
+            else:
+                index.delta.add(mcq.pk, sig)
+        _store(index, index.max_id)
+
+
+def remove_mcqs(mcq_ids):
+    """
+    Drop deleted questions from the index, with one write for the batch.
+    """
+    with _writing(index_path()) as index:
+        for mcq_id in mcq_ids:
+            index.removed.add(mcq_id)
+            index.delta.remove(mcq_id)
+        _store(index, index.max_id)
+
+
+def rebuild_index(chunk_size=5000):
+    """
+    Re-sign every question and write a fresh base. Returns the number indexed.
+    """
+    path = index_path()
+    ids, signatures = [], []
+    for mcq_id, sig in _signed_rows(Mcq.objects.all(), chunk_size):
+        ids.append(mcq_id)
+        signatures.append(sig)
+    with _writing(path):
+        _write_base(
+            path,
+            np.array(ids, dtype=np.int64),
+            np.array(signatures, dtype=np.uint32).reshape(len(ids), NUM_PERM),
+            Mcq.objects.order_by("-id").values_list("id", flat=True).first() or 0,
+        )
+    return len(ids)
+
+
+def ingest_mode():
+    mode = getattr(settings, "DEDUP_ON_INGEST", "flag")
+    return mode if mode in MODES else "flag"
+
+
+def compute_clusters(index, threshold=THRESHOLD):
+    """
+    Groups of near-duplicate ids, largest first. Questions are visited in id
+    order and join the cluster of the first earlier representative they
+    match, so each lookup only searches the representatives' index.
+    """
+    representatives = DedupIndex()
+    members = defaultdict(list)
+    for mcq_id, sig in index.live_items():
+        matches = representatives.find(sig, threshold)
+        if matches:
+            members[matches[0][0]].append(mcq_id)
+        else:
+            representatives.add(mcq_id, sig)
+    groups = [[rep] + dupes for rep, dupes in members.items()]
+    return sorted(groups, key=lambda g: (-len(g), g[0]))
+
+
+def store_clusters(threshold=None):
+    """
+    Compute the clusters for the admin report from the stored index and save them.
+    """
+    threshold = threshold or getattr(settings, "DEDUP_THRESHOLD", THRESHOLD)
+    path = index_path()
+    report = {
+        "computed_at": datetime.now(dt_timezone.utc).isoformat(),
+        "threshold": threshold,
+        "clusters": compute_clusters(get_index(path), threshold),
+    }
+    os.makedirs(path, exist_ok=True)
+    _write_json(os.path.join(path, CLUSTERS), report)
+    return report
+
+
+_clusters = (None, None)
+
+
+def duplicate_clusters():
+    """
+    The stored cluster report, or None before the first rebuild. Parsed once
+    per process until the file is replaced.
+    """
+    global _clusters
+    path = os.path.join(index_path(), CLUSTERS)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    stamp = (path, stat.st_ino, stat.st_mtime_ns)
+    if _clusters[0] != stamp:
+        with open(path) as fh:
+            _clusters = (stamp, json.load(fh))
+    return _clusters[1]
+
+
+class Screener:
+    """
+    Checks unsaved questions against the bank and against earlier rows of the
+    same upload. check() returns the best match as (mcq_id or "row N", similarity)
+    or None; rows that are kept are remembered for later comparisons.
+    """
+
+    def __init__(self, mode=None, threshold=None):
+        self.mode = mode or ingest_mode()
+        self.threshold = threshold or getattr(settings, "DEDUP_THRESHOLD", THRESHOLD)
+        self.index = get_index() if self.mode != "off" else None
+        self.pending = DedupIndex()
+        self.flagged_count = 0
+        self.flagged = []
+
+    def check(self, mcq, label=None):
+        if self.mode == "off":
+            return None
+        sig = mcq_signature(mcq)
+        if sig is None:
+            return None
+        label = label if label is not None else len(self.pending) + 1
+        matches = self.index.find(sig, self.threshold) + self.pending.find(sig, self.threshold)
+        match = min(matches, key=lambda m: (-m[1], str(m[0]))) if matches else None
+        if match:
+            self.flagged_count += 1
+            if len(self.flagged) < MAX_REPORTED:
+                self.flagged.append((label, match[0], round(match[1], 2)))
+        if match is None or self.mode == "flag":
+            self.pending.add(f"row {label}", sig)
+        return match
+
+    def keep(self, mcq, label=None):
+        """
+        True if the question should be saved under the current mode.
+        """
+        return self.check(mcq, label) is None or self.mode != "skip"
+
+    def summary(self):
+        if not self.flagged_count:
+            return ""
+        verb = "skipped" if self.mode == "skip" else "flagged"
+        shown = "; ".join(f"{label} ~ {match} ({score:.0%})" for label, match, score in self.flagged[:10])
+        return f"{self.flagged_count} near-duplicates {verb}: {shown}"
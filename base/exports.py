@@ -0,0 +1,106 @@
+"""
+Streaming CSV / JSONL exports of QuizResult and Mcq.
+
+Rows are read in keyset chunks (one id-keyed, LIMITed query per batch, see
+pagination.keyset_chunks) and encoded a batch at a time, optionally through
+an incremental gzip compressor, so memory stays flat whatever the table size
+and database driver. The same generators back the admin export views and
+the export_data management command.
+"""
+import csv
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date
+
+from .models import Mcq, QuizResult
+from .pagination import keyset_chunks
+
+CHUNK_SIZE = 2000
+FORMATS = ("csv", "jsonl")
+
+RESULT_FIELDS = (
+    "id", "user_id", "user__email", "topic", "subtopic", "difficulty", "date_attempted",
+    "total_questions", "correct_questions", "wrong_questions", "score",
+)
+MCQ_FIELDS = (
+    "id", "topic", "subtopic", "difficulty", "question_no", "question",
+    "option1", "option2", "option3", "option4", "correct_answer", "created_at",
+)
+
+
+class Echo:
+    """
+    File-like object whose write() hands the encoded line straight back to csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _parse_day(value, name):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"Invalid {name} '{value}', expected YYYY-MM-DD.")
+    return day
+
+
+def export_queryset(kind, topic="", date_from="", date_to="", user=""):
+    """
+    Build the filtered queryset and field list for "results" or "questions".
+    Raises ValueError for unknown kinds or malformed filters.
+    """
+    if kind == "results":
+        queryset, fields, date_field = QuizResult.objects.all(), RESULT_FIELDS, "date_attempted"
+        if user.isdigit():
+            queryset = queryset.filter(user_id=int(user))
+        elif user:
+            queryset = queryset.filter(user__email=user)
+    elif kind == "questions":
+        if user:
+            raise ValueError("The user filter only applies to results.")
+        queryset, fields, date_field = Mcq.objects.all(), MCQ_FIELDS, "created_at"
+    else:
+        raise ValueError(f"Unknown export '{kind}', expected results or questions.")
+
+    if topic:
+        queryset = queryset.filter(topic=topic)
+    if date_from:
+        queryset = queryset.filter(**{f"{date_field}__date__gte": _parse_day(date_from, "date_from")})
+    if date_to:
+        queryset = queryset.filter(**{f"{date_field}__date__lte": _parse_day(date_to, "date_to")})
+    return queryset.order_by("id"), fields
+
+
+def csv_stream(queryset, fields, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for batch in keyset_chunks(queryset, fields, chunk_size):
+        yield "".join(writer.writerow(row) for row in batch)
+
+
+def jsonl_stream(queryset, fields, chunk_size=CHUNK_SIZE):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for batch in keyset_chunks(queryset, fields, chunk_size):
+        yield "".join(encoder.encode(dict(zip(fields, row))) + "\n" for row in batch)
+
+
+def gzip_stream(chunks):
+    """
+    Compress a stream of text chunks into a gzip byte stream on the fly.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(queryset, fields, fmt="csv", compress=False, chunk_size=CHUNK_SIZE):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected csv or jsonl.")
+    stream = (csv_stream if fmt == "csv" else jsonl_stream)(queryset, fields, chunk_size)
+    if compress:
+        return gzip_stream(stream)
+    return (chunk.encode() for chunk in stream)
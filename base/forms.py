@@ -18,3 +18,9 @@ class MCQUploadForm(forms.Form):
     sub_topic_name = forms.CharField(max_length=100)
     difficulty_level = forms.CharField(max_length=50)
     document = forms.FileField()
+
+class MCQImportForm(forms.Form):
+    topic_name = forms.CharField(max_length=100, required=False)
+    sub_topic_name = forms.CharField(max_length=100, required=False)
+    difficulty_level = forms.CharField(max_length=50, required=False)
+    document = forms.FileField()
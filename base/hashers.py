@@ -0,0 +1,24 @@
+"""
+Password hashers with a configurable work factor.
+
+PBKDF2 cost is the main CPU expense of a login. The hashers here keep the
+standard algorithm names, so existing hashes still verify, but take their
+iteration count from settings.PBKDF2_ITERATIONS. Django's check_password
+reports hashes made with a different count (or with a hasher other than the
+first in PASSWORD_HASHERS) as needing an update, and the login view then
+rehashes them with the current settings.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, PBKDF2SHA1PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, "PBKDF2_ITERATIONS", PBKDF2PasswordHasher.iterations)
+
+
+class ConfigurablePBKDF2SHA1PasswordHasher(PBKDF2SHA1PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, "PBKDF2_ITERATIONS", PBKDF2SHA1PasswordHasher.iterations)
@@ -0,0 +1,174 @@
+"""
+Streaming bulk import of questions from CSV or JSONL.
+
+Rows are read one at a time from a text stream, validated against the Mcq
+field constraints with clean_fields(), and written in bulk_create batches,
+so memory stays flat whatever the file size. Invalid rows are skipped and
+reported with their line number; only the first MAX_REPORTED_ERRORS messages
+are kept. Batches are committed as they fill, so if the file cannot be read
+to the end the saved rows stay and ImportInterrupted reports how many. Each
+saved batch is added to the search index, and rows are screened for
+near-duplicates of the bank (see dedup.py) before saving.
+
+Expected columns / keys: question_no, question, option1..option4,
+correct_answer (1-4 or A-D), plus topic, subtopic and difficulty unless
+defaults are given for them.
+"""
+import csv
+import gzip
+import io
+import json
+
+from django.core.exceptions import ValidationError
+
+from .dedup import Screener, sync_index
+from .models import Mcq
+from .search import index_mcqs
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ("csv", "jsonl")
+IMPORT_FIELDS = (
+    "topic", "subtopic", "difficulty", "question_no", "question",
+    "option1", "option2", "option3", "option4", "correct_answer",
+)
+ANSWER_MAP = {"A": "1", "B": "2", "C": "3", "D": "4"}
+
+
+class ImportInterrupted(Exception):
+    """
+    The import stopped part-way; `report` covers the rows already saved.
+    """
+
+    def __init__(self, report, line_no):
+        super().__init__(f"Import stopped after line {line_no} with {report['created']} rows saved.")
+        self.report = report
+        self.line_no = line_no
+
+
+def detect_format(filename):
+    """
+    Return (format, gzipped) from a file name such as bank.csv or bank.jsonl.gz.
+    """
+    name = filename.lower()
+    gzipped = name.endswith(".gz")
+    if gzipped:
+        name = name[:-3]
+    if name.endswith(".csv"):
+        return "csv", gzipped
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl", gzipped
+    raise ValueError("Only .csv and .jsonl files (optionally .gz) are supported.")
+
+
+def open_text(binary_file, gzipped=False):
+    if gzipped:
+        binary_file = gzip.GzipFile(fileobj=binary_file)
+    return io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+
+
+def iter_rows(text_stream, fmt):
+    """
+    Yield (line_no, row dict or None, error message or None).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(text_stream)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(text_stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, None, "Expected a JSON object."
+                continue
+            yield line_no, row, None
+    else:
+        raise ValueError(f"Unknown format '{fmt}', expected csv or jsonl.")
+
+
+def build_mcq(row, defaults):
+    """
+    Validate one row and return an unsaved Mcq; raises ValidationError.
+    """
+    values = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        if value is None or value == "":
+            value = defaults.get(field, "")
+        values[field] = str(value).strip()
+
+    answer = values["correct_answer"].upper()
+    values["correct_answer"] = ANSWER_MAP.get(answer, answer)
+    values["difficulty"] = values["difficulty"].lower()
+
+    mcq = Mcq(**values)
+    mcq.clean_fields(exclude=["created_at"])
+    return mcq
+
+
+def _format_error(error):
+    if hasattr(error, "message_dict"):
+        return "; ".join(
+            f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items()
+        )
+    return " ".join(error.messages)
+
+
+def import_mcqs(text_stream, fmt, defaults=None, batch_size=BATCH_SIZE, dedup=None):
+    """
+    Import questions from a text stream. Returns a report dict with the
+    number created, the number of invalid rows, the first error messages
+    as (line_no, message) pairs and the near-duplicate summary. dedup
+    overrides settings.DEDUP_ON_INGEST ("flag", "skip" or "off").
+    """
+    defaults = defaults or {}
+    report = {"created": 0, "error_count": 0, "errors": [], "duplicates": ""}
+    screener = Screener(dedup)
+
+    def reject(line_no, message):
+        report["error_count"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append((line_no, message))
+
+    batch = []
+    line_no = 0
+    try:
+        for line_no, row, error in iter_rows(text_stream, fmt):
+            if error:
+                reject(line_no, error)
+                continue
+            try:
+                mcq = build_mcq(row, defaults)
+            except ValidationError as e:
+                reject(line_no, _format_error(e))
+                continue
+            if not screener.keep(mcq, f"line {line_no}"):
+                continue
+            batch.append(mcq)
+            if len(batch) >= batch_size:
+                report["created"] += _save_batch(batch)
+                batch = []
+
+        if batch:
+            report["created"] += _save_batch(batch)
+    except Exception as e:
+        raise ImportInterrupted(report, line_no) from e
+    finally:
+        if screener.mode != "off":
+            sync_index()
+        report["duplicates"] = screener.summary()
+    return report
+
+
+def _save_batch(batch):
+    # Primary keys are set by bulk_create on SQLite/PostgreSQL; on MySQL the
+    # FULLTEXT index needs no postings, so index_mcqs is a no-op there.
+    Mcq.objects.bulk_create(batch)
+    index_mcqs(batch)
+    return len(batch)
@@ -0,0 +1,119 @@
+"""
+Bulk item statistics for the question bank.
+
+submit_quiz records every answer as a QuestionResponse. compute_item_stats()
+reads those rows in keyset chunks (one bounded query each, see
+pagination.keyset_chunks) and accumulates per-question sums in dense NumPy
+arrays indexed by Mcq id, then derives for each question:
+
+* p_value: the share of responses that were correct (the difficulty index);
+* discrimination: the point-biserial correlation between answering this
+  question correctly and the student's score on the rest of that quiz;
+* how often each option (or nothing) was chosen.
+
+A low or negative discrimination usually means a confusing question or a
+wrong correct_answer key. Results are upserted into McqStats.
+"""
+import numpy as np
+from django.db.models import Max
+
+from .models import Mcq, McqStats, QuestionResponse
+from .pagination import keyset_chunks
+
+CHUNK_SIZE = 100_000
+OPTION_INDEX = {"": 0, "1": 1, "2": 2, "3": 3, "4": 4}
+
+
+def compute_item_stats(chunk_size=CHUNK_SIZE, batch_size=5000):
+    """
+    Recompute McqStats for every answered question; returns how many were stored.
+    """
+    size = (Mcq.objects.aggregate(max_id=Max("id"))["max_id"] or 0) + 1
+    responses = np.zeros(size, dtype=np.int64)
+    correct = np.zeros(size, dtype=np.int64)
+    options = np.zeros((size, len(OPTION_INDEX)), dtype=np.int64)
+    # Rest-of-quiz score sums, only over attempts with at least one other question
+    rest_n = np.zeros(size, dtype=np.int64)
+    rest_correct_n = np.zeros(size, dtype=np.int64)
+    rest_sum = np.zeros(size)
+    rest_sq_sum = np.zeros(size)
+    rest_correct_sum = np.zeros(size)
+
+    # Questions added after `size` was read are picked up on the next run
+    chunks = keyset_chunks(
+        QuestionResponse.objects.filter(mcq_id__lt=size),
+        ("mcq_id", "is_correct", "selected_option", "result__correct_questions", "result__total_questions"),
+        chunk_size,
+    )
+    for chunk in chunks:
+        n = len(chunk)
+        mcq_ids = np.fromiter((row[0] for row in chunk), dtype=np.int64, count=n)
+        is_correct = np.fromiter((row[1] for row in chunk), dtype=bool, count=n)
+        chosen = np.fromiter((OPTION_INDEX.get(row[2], 0) for row in chunk), dtype=np.int64, count=n)
+        quiz_correct = np.fromiter((row[3] for row in chunk), dtype=np.float64, count=n)
+        quiz_total = np.fromiter((row[4] for row in chunk), dtype=np.float64, count=n)
+
+        responses += np.bincount(mcq_ids, minlength=size)
+        correct += np.bincount(mcq_ids, weights=is_correct, minlength=size).astype(np.int64)
+        np.add.at(options, (mcq_ids, chosen), 1)
+
+        has_rest = quiz_total > 1
+        ids = mcq_ids[has_rest]
+        hit = is_correct[has_rest]
+        rest = 100.0 * (quiz_correct[has_rest] - hit) / (quiz_total[has_rest] - 1)
+        rest_n += np.bincount(ids, minlength=size)
+        rest_correct_n += np.bincount(ids, weights=hit, minlength=size).astype(np.int64)
+        rest_sum += np.bincount(ids, weights=rest, minlength=size)
+        rest_sq_sum += np.bincount(ids, weights=rest * rest, minlength=size)
+        rest_correct_sum += np.bincount(ids, weights=rest * hit, minlength=size)
+
+    answered = np.flatnonzero(responses)
+    p_values = correct[answered] / responses[answered]
+
+    # Point-biserial: (M1 - M0) / s * sqrt(p * q), undefined when p is 0 or 1
+    # or when every rest score is the same.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n_rest = rest_n[answered].astype(np.float64)
+        n1 = rest_correct_n[answered].astype(np.float64)
+        n0 = n_rest - n1
+        mean = rest_sum[answered] / n_rest
+        std = np.sqrt(np.maximum(rest_sq_sum[answered] / n_rest - mean * mean, 0.0))
+        m1 = rest_correct_sum[answered] / n1
+        m0 = (rest_sum[answered] - rest_correct_sum[answered]) / n0
+        p = n1 / n_rest
+        discrimination = (m1 - m0) / std * np.sqrt(p * (1 - p))
+    discrimination[~np.isfinite(discrimination) | (n1 == 0) | (n0 == 0)] = np.nan
+
+    stored = 0
+    batch = []
+    for i, mcq_id in enumerate(answered.tolist()):
+        counts = options[mcq_id]
+        batch.append(McqStats(
+            mcq_id=mcq_id,
+            responses=int(responses[mcq_id]),
+            p_value=round(float(p_values[i]), 4),
+            discrimination=None if np.isnan(discrimination[i]) else round(float(discrimination[i]), 4),
+            unanswered_count=int(counts[0]),
+            option1_count=int(counts[1]),
+            option2_count=int(counts[2]),
+            option3_count=int(counts[3]),
+            option4_count=int(counts[4]),
+        ))
+        if len(batch) >= batch_size:
+            stored += _upsert(batch)
+            batch = []
+    stored += _upsert(batch)
+    return stored
+
+
+def _upsert(batch):
+    McqStats.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=["mcq"],
+        update_fields=[
+            "responses", "p_value", "discrimination", "unanswered_count",
+            "option1_count", "option2_count", "option3_count", "option4_count", "computed_at",
+        ],
+    )
+    return len(batch)
@@ -0,0 +1,255 @@
+"""
+Leaderboards per (topic, difficulty) and overall, ranked by average score.
+
+Entries are updated in place from submit_quiz (record_score), so rankings
+never order the QuizResult table. Top-N is a range scan on
+leaderboard_rank_idx within one bucket.
+
+Students with the same average and attempts share a rank; user_id only
+orders them for display. For "my rank", each bucket keeps counts at two
+grains: entries per band of 1/SCORE_BINS_PER_POINT points
+(LeaderboardScoreBin) and entries per exact (average, attempts) tie group
+(LeaderboardScoreGroup). A rank is the entries in higher bands plus those in
+higher tie groups of the user's own band. Both sums read one row per band
+or group, never one per student, so a rank costs the same however many
+students share a score. rebuild_leaderboards() recomputes everything from
+QuizResult with grouped queries.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import LeaderboardEntry, LeaderboardScoreBin, LeaderboardScoreGroup, QuizResult
+
+OVERALL = ("", "")
+RANK_ORDER = ("-avg_score", "-attempts", "user_id")
+SCORE_BINS_PER_POINT = 10
+
+
+def score_bin(avg_score):
+    return max(int(avg_score * SCORE_BINS_PER_POINT), 0)
+
+
+def add_to_bin(topic, difficulty, bin_no, delta):
+    """
+    Adjust the number of entries counted in one score band.
+    """
+    bins = LeaderboardScoreBin.objects.filter(topic=topic, difficulty=difficulty, score_bin=bin_no)
+    if bins.update(entries=F("entries") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            LeaderboardScoreBin.objects.create(topic=topic, difficulty=difficulty, score_bin=bin_no, entries=delta)
+    except IntegrityError:
+        # A concurrent submission created the band first
+        bins.update(entries=F("entries") + delta)
+
+
+def add_to_group(topic, difficulty, avg_score, attempts, delta):
+    """
+    Move one entry into (delta=1) or out of (delta=-1) a tie group.
+    """
+    groups = LeaderboardScoreGroup.objects.filter(
+        topic=topic, difficulty=difficulty, avg_score=avg_score, attempts=attempts
+    )
+    if delta < 0:
+        # The last entry leaving deletes the group, so empty groups never pile up
+        if not groups.filter(entries=1).delete()[0]:
+            groups.update(entries=F("entries") - 1)
+        return
+    if groups.update(entries=F("entries") + 1):
+        return
+    try:
+        with transaction.atomic():
+            LeaderboardScoreGroup.objects.create(
+                topic=topic, difficulty=difficulty, score_bin=score_bin(avg_score),
+                avg_score=avg_score, attempts=attempts, entries=1,
+            )
+    except IntegrityError:
+        groups.update(entries=F("entries") + 1)
+
+
+def _apply_score(user_id, topic, difficulty, score):
+    """
+    Add a score to one entry and move it between score bands if needed. The
+    entry row is locked, so its old band is known exactly; call inside a
+    transaction.
+    """
+    entry = LeaderboardEntry.objects.select_for_update().filter(
+        user_id=user_id, topic=topic, difficulty=difficulty
+    ).first()
+    if entry is None:
+        return False
+    old_bin, old_group = entry.score_bin, (entry.avg_score, entry.attempts)
+    entry.attempts += 1
+    entry.total_score += score
+    entry.avg_score = entry.total_score / entry.attempts
+    entry.score_bin = score_bin(entry.avg_score)
+    entry.updated_at = timezone.now()
+    entry.save(update_fields=["attempts", "total_score", "avg_score", "score_bin", "updated_at"])
+    if entry.score_bin != old_bin:
+        # Lower band first so concurrent moves lock bands in the same order
+        for bin_no, delta in sorted(((old_bin, -1), (entry.score_bin, 1))):
+            add_to_bin(topic, difficulty, bin_no, delta)
+    for avg_score, attempts, delta in sorted((old_group + (-1,), (entry.avg_score, entry.attempts, 1))):
+        add_to_group(topic, difficulty, avg_score, attempts, delta)
+    return True
+
+
+def record_score(user_id, topic, difficulty, score):
+    """
+    Add one quiz score to the user's (topic, difficulty) and overall entries.
+    Buckets are always locked in that order, the overall one last.
+    """
+    with transaction.atomic():
+        for bucket in ((topic, difficulty), OVERALL):
+            if _apply_score(user_id, *bucket, score):
+                continue
+            try:
+                with transaction.atomic():
+                    LeaderboardEntry.objects.create(
+                        user_id=user_id,
+                        topic=bucket[0],
+                        difficulty=bucket[1],
+                        attempts=1,
+                        total_score=score,
+                        avg_score=score,
+                        score_bin=score_bin(score),
+                    )
+                    add_to_bin(*bucket, score_bin(score), 1)
+                    add_to_group(*bucket, score, 1, 1)
+            except IntegrityError:
+                # A concurrent submission created the entry first
+                _apply_score(user_id, *bucket, score)
+
+
+def _top_queryset(topic, difficulty, limit):
+    return (
+        LeaderboardEntry.objects.filter(topic=topic, difficulty=difficulty)
+        .order_by(*RANK_ORDER)
+        .values("user_id", "user__first_name", "user__last_name", "attempts", "avg_score")[:limit]
+    )
+
+
+def _with_ranks(rows):
+    """
+    Number top-N rows in place; tied rows share the rank of the first.
+    """
+    previous = None
+    for position, row in enumerate(rows, start=1):
+        tie = (row["avg_score"], row["attempts"])
+        if tie != previous:
+            rank, previous = position, tie
+        row["rank"] = rank
+    return rows
+
+
+def top_entries(topic="", difficulty="", limit=10):
+    return _with_ranks(list(_top_queryset(topic, difficulty, limit)))
+
+
+async def atop_entries(topic="", difficulty="", limit=10):
+    return _with_ranks([row async for row in _top_queryset(topic, difficulty, limit)])
+
+
+def _ahead_in_bin(entry):
+    return LeaderboardScoreGroup.objects.filter(
+        topic=entry.topic, difficulty=entry.difficulty, score_bin=entry.score_bin
+    ).filter(
+        Q(avg_score__gt=entry.avg_score) | Q(avg_score=entry.avg_score, attempts__gt=entry.attempts)
+    )
+
+
+def _higher_bins(entry):
+    return LeaderboardScoreBin.objects.filter(
+        topic=entry.topic, difficulty=entry.difficulty, score_bin__gt=entry.score_bin
+    )
+
+
+def user_rank(user_id, topic="", difficulty=""):
+    """
+    Return (rank, entry) for a user in a bucket, or (None, None) if they have
+    no score there yet. Ties share a rank: 1, 2, 2, 4.
+    """
+    entry = LeaderboardEntry.objects.filter(
+        user_id=user_id, topic=topic, difficulty=difficulty
+    ).first()
+    if entry is None:
+        return None, None
+    higher = _higher_bins(entry).aggregate(n=Sum("entries"))["n"] or 0
+    ahead = _ahead_in_bin(entry).aggregate(n=Sum("entries"))["n"] or 0
+    return higher + ahead + 1, entry
+
+
+async def auser_rank(user_id, topic="", difficulty=""):
+    entry = await LeaderboardEntry.objects.filter(
+        user_id=user_id, topic=topic, difficulty=difficulty
+    ).afirst()
+    if entry is None:
+        return None, None
+    higher = (await _higher_bins(entry).aaggregate(n=Sum("entries")))["n"] or 0
+    ahead = (await _ahead_in_bin(entry).aaggregate(n=Sum("entries")))["n"] or 0
+    return higher + ahead + 1, entry
+
+
+def rebuild_leaderboards(batch_size=5000):
+    """
+    Recompute every leaderboard entry from QuizResult.
+    """
+    per_bucket = (
+        QuizResult.objects.values("user_id", "topic", "difficulty")
+        .annotate(attempts=Count("id"), total_score=Sum("score"))
+        .order_by()
+    )
+    overall = (
+        QuizResult.objects.values("user_id")
+        .annotate(attempts=Count("id"), total_score=Sum("score"))
+        .order_by()
+    )
+
+    created = 0
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        batch = []
+        for rows in (per_bucket.iterator(), overall.iterator()):
+            for row in rows:
+                batch.append(LeaderboardEntry(
+                    user_id=row["user_id"],
+                    topic=row.get("topic", ""),
+                    difficulty=row.get("difficulty", ""),
+                    attempts=row["attempts"],
+                    total_score=row["total_score"],
+                    avg_score=row["total_score"] / row["attempts"],
+                    score_bin=score_bin(row["total_score"] / row["attempts"]),
+                ))
+                if len(batch) >= batch_size:
+                    LeaderboardEntry.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+        LeaderboardEntry.objects.bulk_create(batch)
+        created += len(batch)
+
+        LeaderboardScoreBin.objects.all().delete()
+        LeaderboardScoreBin.objects.bulk_create([
+            LeaderboardScoreBin(entries=row.pop("n"), **row)
+            for row in LeaderboardEntry.objects.values("topic", "difficulty", "score_bin").annotate(n=Count("id")).order_by()
+        ], batch_size=batch_size)
+        LeaderboardScoreGroup.objects.all().delete()
+        LeaderboardScoreGroup.objects.bulk_create([
+            LeaderboardScoreGroup(entries=row.pop("n"), **row)
+            for row in LeaderboardEntry.objects.values("topic", "difficulty", "score_bin", "avg_score", "attempts")
+            .annotate(n=Count("id")).order_by()
+        ], batch_size=batch_size)
+    return created
+
+
+def forget_user(user_id):
+    """
+    Take a user's entries out of the score bands and tie groups before they
+    are deleted.
+    """
+    for topic, difficulty, bin_no, avg_score, attempts in LeaderboardEntry.objects.filter(
+        user_id=user_id
+    ).values_list("topic", "difficulty", "score_bin", "avg_score", "attempts"):
+        add_to_bin(topic, difficulty, bin_no, -1)
+        add_to_group(topic, difficulty, avg_score, attempts, -1)
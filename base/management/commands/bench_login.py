@@ -0,0 +1,114 @@
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from base.models import Registration
+
+EMAIL_PATTERN = "bench-login-{}@example.com"
+PASSWORD = "bench-Password-123"
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login throughput under contention: concurrent threads POST to the "
+        "login view in-process, either as valid logins from many IPs or as a "
+        "credential-stuffing burst from one IP."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", choices=("valid", "stuffing"), default="valid")
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--iterations", type=int, help="PBKDF2 iterations; defaults to PBKDF2_ITERATIONS.")
+        parser.add_argument("--no-ratelimit", action="store_true")
+
+    def handle(self, *args, **options):
+        overrides = {"LOGIN_RATELIMIT_ENABLED": not options["no_ratelimit"]}
+        if options["iterations"]:
+            overrides["PBKDF2_ITERATIONS"] = options["iterations"]
+
+        # Refused logins are expected here; keep "Too Many Requests" warnings quiet
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        with override_settings(**overrides):
+            emails = self.create_users(options["users"])
+            try:
+                latencies, statuses, elapsed = self.run(emails, options)
+            finally:
+                Registration.objects.filter(email__in=emails).delete()
+                request_logger.setLevel(level)
+
+        latencies.sort()
+        total = len(latencies)
+        self.stdout.write(
+            f"{options['scenario']}: {total} requests, concurrency {options['concurrency']}, "
+            f"{elapsed:.2f}s, {total / elapsed:.1f} req/s"
+        )
+        self.stdout.write("status: " + ", ".join(f"{code}={count}" for code, count in sorted(statuses.items())))
+        self.stdout.write(
+            "latency ms: "
+            + ", ".join(f"p{int(q * 100)}={percentile(latencies, q) * 1000:.1f}" for q in (0.5, 0.95, 0.99))
+        )
+
+    def create_users(self, count):
+        # Hash once; every bench user shares the same password
+        password = make_password(PASSWORD)
+        emails = [EMAIL_PATTERN.format(i) for i in range(count)]
+        Registration.objects.filter(email__in=emails).delete()
+        Registration.objects.bulk_create([
+            Registration(first_name="Bench", last_name=str(i), email=email,
+                         password=password, contact="0", gender="other")
+            for i, email in enumerate(emails)
+        ])
+        return emails
+
+    def run(self, emails, options):
+        counter = itertools.count()
+        lock = threading.Lock()
+        latencies, statuses = [], Counter()
+        stuffing = options["scenario"] == "stuffing"
+
+        def worker(worker_no):
+            client = Client(HTTP_HOST="localhost")
+            rng = random.Random(worker_no)
+            try:
+                while (request_no := next(counter)) < options["requests"]:
+                    n = rng.randrange(1 << 16)
+                    ip = "203.0.113.7" if stuffing else f"10.{worker_no}.{n >> 8}.{n & 255}"
+                    data = {
+                        "email": emails[request_no % len(emails)],
+                        "password": "wrong-password" if stuffing else PASSWORD,
+                    }
+                    started = time.perf_counter()
+                    response = client.post("/login/", data, REMOTE_ADDR=ip)
+                    took = time.perf_counter() - started
+                    with lock:
+                        latencies.append(took)
+                        statuses[response.status_code] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options["concurrency"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, statuses, time.perf_counter() - started
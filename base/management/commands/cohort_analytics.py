@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from base.cohort import CHUNK_SIZE, refresh_cohort_analytics
+
+
+class Command(BaseCommand):
+    help = "Recompute the admin cohort analytics report and write it to COHORT_REPORT_PATH."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        report = refresh_cohort_analytics(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            f"{report['total_results']} results, mean {report['mean_score']}%, "
+            f"median {report['percentiles'].get('p50', 0)}%"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stored report computed at {report['computed_at']}."))
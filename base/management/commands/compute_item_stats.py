@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from base.itemstats import CHUNK_SIZE, compute_item_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute per-question p-value, discrimination and option counts from recorded responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        stored = compute_item_stats(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Done: stats stored for {stored} questions."))
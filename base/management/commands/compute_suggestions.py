@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from base.models import Registration
+from base.suggestions import compute_for_users
+
+
+class Command(BaseCommand):
+    help = "Recompute stored quiz suggestions for every user in chunked, set-based passes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        user_ids = Registration.objects.order_by("id").values_list("id", flat=True)
+
+        last_id = 0
+        total = 0
+        while True:
+            chunk = list(user_ids.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            compute_for_users(chunk)
+            total += len(chunk)
+            last_id = chunk[-1]
+            self.stdout.write(f"Computed suggestions for {total} users")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total} users."))
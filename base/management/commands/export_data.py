@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base.exports import CHUNK_SIZE, FORMATS, export_queryset, export_stream
+
+
+class Command(BaseCommand):
+    help = "Stream QuizResult or Mcq rows to CSV/JSONL, optionally gzip-compressed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=["results", "questions"])
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--output", default="-", help="File path, or - for stdout.")
+        parser.add_argument("--topic", default="")
+        parser.add_argument("--date-from", default="", help="YYYY-MM-DD, inclusive.")
+        parser.add_argument("--date-to", default="", help="YYYY-MM-DD, inclusive.")
+        parser.add_argument("--user", default="", help="User id or email (results only).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            queryset, fields = export_queryset(
+                options["kind"],
+                topic=options["topic"],
+                date_from=options["date_from"],
+                date_to=options["date_to"],
+                user=options["user"],
+            )
+            stream = export_stream(
+                queryset, fields, options["format"], options["gzip"], options["chunk_size"]
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["output"] == "-":
+            out = sys.stdout.buffer
+            for chunk in stream:
+                out.write(chunk)
+            out.flush()
+        else:
+            with open(options["output"], "wb") as out:
+                for chunk in stream:
+                    out.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
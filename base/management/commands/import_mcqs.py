@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from base.catalog import refresh_catalog
+from base.dedup import MODES
+from base.imports import BATCH_SIZE, FORMATS, ImportInterrupted, detect_format, import_mcqs, open_text
+
+
+class Command(BaseCommand):
+    help = "Stream questions from a CSV or JSONL file (optionally .gz) into the question bank."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--topic", default="", help="Used when a row has no topic.")
+        parser.add_argument("--subtopic", default="", help="Used when a row has no subtopic.")
+        parser.add_argument("--difficulty", default="", help="Used when a row has no difficulty.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--dedup", choices=MODES, help="Near-duplicate handling; defaults to DEDUP_ON_INGEST.")
+
+    def handle(self, *args, **options):
+        try:
+            fmt, gzipped = detect_format(options["path"])
+        except ValueError as e:
+            if not options["format"]:
+                raise CommandError(str(e))
+            fmt, gzipped = options["format"], options["path"].lower().endswith(".gz")
+        fmt = options["format"] or fmt
+
+        defaults = {
+            field: options[field]
+            for field in ("topic", "subtopic", "difficulty")
+            if options[field]
+        }
+        try:
+            with open(options["path"], "rb") as binary_file:
+                report = import_mcqs(
+                    open_text(binary_file, gzipped), fmt, defaults, options["batch_size"], options["dedup"]
+                )
+        except ImportInterrupted as e:
+            raise CommandError(f"{e} Cause: {e.__cause__}")
+        finally:
+            refresh_catalog()
+
+        for line_no, message in report["errors"]:
+            self.stderr.write(f"line {line_no}: {message}")
+        if report["error_count"] > len(report["errors"]):
+            self.stderr.write(f"... {report['error_count'] - len(report['errors'])} more errors not shown")
+        if report["duplicates"]:
+            self.stderr.write(report["duplicates"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} questions, {report['error_count']} rows rejected."
+        ))
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+import httpx
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connections
+from django.db.models import Count
+from django.test.utils import override_settings
+
+from base.models import Mcq, Registration
+
+from .bench_login import percentile
+
+EMAIL_PATTERN = "loadtest-{}@example.com"
+PASSWORD = "loadtest-Password-123"
+STEPS = ("login_page", "login", "userdashboard", "start_quiz", "submit_quiz")
+QUESTION_FIELD = re.compile(r'name="(question_\d+)"')
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+class LoadTestServer(ThreadedWSGIServer):
+    # The default backlog of 10 resets connections under a burst of students
+    request_queue_size = 1024
+
+
+class StepStats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(Counter)
+        self.errors = Counter()
+
+    def record(self, step, seconds, outcome, ok):
+        self.latencies[step].append(seconds)
+        self.outcomes[step][outcome] += 1
+        if not ok:
+            self.errors[step] += 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate exam-day traffic on localhost: N students log in, open the "
+        "dashboard, start and submit quizzes concurrently (asyncio + httpx, with "
+        "real sessions and CSRF tokens). Serves the app in-process on 127.0.0.1 "
+        "(threaded WSGI, uvicorn ASGI, or both one after the other for a "
+        "comparison) unless --url points at a local server. Reports throughput, "
+        "error rates and p50/p95/p99 per step."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, help="Students active at once; defaults to all of them.")
+        parser.add_argument("--quizzes", type=int, default=1, help="Quizzes each student takes.")
+        parser.add_argument("--num-questions", type=int, default=10)
+        parser.add_argument("--think-time", type=float, default=0.0,
+                            help="Maximum random pause in seconds between starting and submitting a quiz.")
+        parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which students arrive.")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--server", choices=("wsgi", "asgi", "both"), default="wsgi",
+                            help="In-process server; 'both' runs the same load against each.")
+        parser.add_argument("--url", help=(
+            "Already running server on this machine, e.g. http://127.0.0.1:8000. It keeps its own "
+            "settings: --iterations only sets the stored hashes and --ratelimit does nothing."
+        ))
+        parser.add_argument("--iterations", type=int, help="PBKDF2 iterations; defaults to PBKDF2_ITERATIONS.")
+        parser.add_argument("--ratelimit", action="store_true",
+                            help="Keep login rate limiting on. Only failed logins are charged, so this measures its overhead.")
+        parser.add_argument("--json", help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        if options["students"] < 1 or options["quizzes"] < 1 or options["num_questions"] < 1:
+            raise CommandError("--students, --quizzes and --num-questions must be positive.")
+        if options["url"] and urlsplit(options["url"]).hostname not in LOOPBACK_HOSTS:
+            raise CommandError("--url must point at localhost.")
+        if options["url"] and options["server"] == "both":
+            raise CommandError("--server both needs the in-process servers; drop --url.")
+        if options["url"]:
+            self.warn_external(options)
+        buckets = self.quiz_buckets(options["num_questions"])
+        if not buckets:
+            raise CommandError(f"No topic/subtopic/difficulty has {options['num_questions']} questions; import some first.")
+
+        # Refused or failed requests are counted in the report; keep the log quiet
+        loggers = [logging.getLogger(name) for name in ("django.request", "django.server")]
+        levels = [logger.level for logger in loggers]
+        for logger in loggers:
+            logger.setLevel(logging.CRITICAL)
+        overrides = {
+            "LOGIN_RATELIMIT_ENABLED": options["ratelimit"],
+            "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "127.0.0.1"],
+        }
+        if options["iterations"]:
+            overrides["PBKDF2_ITERATIONS"] = options["iterations"]
+        servers = ("wsgi", "asgi") if options["server"] == "both" else (options["server"],)
+        summaries = {}
+        with override_settings(**overrides):
+            emails = self.create_users(options["students"])
+            try:
+                for kind in servers:
+                    stop = None
+                    try:
+                        if options["url"]:
+                            base_url = options["url"].rstrip("/")
+                            kind = "url"
+                        else:
+                            stop, base_url = self.start_server(kind)
+                        stats, flows, elapsed = asyncio.run(self.run(base_url, emails, buckets, options))
+                    finally:
+                        if stop:
+                            stop()
+                    summaries[kind] = self.report(stats, flows, elapsed, options, kind)
+            finally:
+                Registration.objects.filter(email__in=emails).delete()
+                for logger, level in zip(loggers, levels):
+                    logger.setLevel(level)
+
+        if len(summaries) > 1:
+            self.compare(summaries["wsgi"], summaries["asgi"])
+        if options["json"]:
+            with open(options["json"], "w") as fh:
+                json.dump(summaries if len(summaries) > 1 else next(iter(summaries.values())), fh, indent=2)
+
+    def warn_external(self, options):
+        """
+        Settings overrides only reach the in-process servers; say what an
+        external one will do instead.
+        """
+        if options["iterations"]:
+            self.stderr.write(self.style.WARNING(
+                f"--iterations {options['iterations']} only applies to the stored password hashes. "
+                "The server at --url rehashes each student to its own PBKDF2_ITERATIONS on their first "
+                "login, so that login costs two hashes and a write."
+            ))
+        if options["ratelimit"]:
+            self.stderr.write(self.style.WARNING(
+                "--ratelimit has no effect with --url; the server's own LOGIN_RATELIMIT_ENABLED "
+                "(QUIZ_LOGIN_RATELIMIT) decides."
+            ))
+
+    def quiz_buckets(self, num_questions):
+        return list(
+            Mcq.objects.values_list("topic", "subtopic", "difficulty")
+            .annotate(n=Count("id"))
+            .filter(n__gte=num_questions)
+            .values_list("topic", "subtopic", "difficulty")
+        )
+
+    def create_users(self, count):
+        # Hash once; every simulated student shares the same password
+        password = make_password(PASSWORD)
+        emails = [EMAIL_PATTERN.format(i) for i in range(count)]
+        Registration.objects.filter(email__in=emails).delete()
+        Registration.objects.bulk_create([
+            Registration(first_name="Load", last_name=str(i), email=email,
+                         password=password, contact="0", gender="other")
+            for i, email in enumerate(emails)
+        ], batch_size=1000)
+        return emails
+
+    def start_server(self, kind):
+        """
+        Serve the app on a free 127.0.0.1 port; returns (stop, base_url).
+        The handlers are built directly because get_*_application() would
+        run setup() again and reset logging.
+        """
+        if kind == "asgi":
+            return self.start_asgi_server()
+        server = LoadTestServer(("127.0.0.1", 0), WSGIRequestHandler, allow_reuse_address=False)
+        server.set_app(WSGIHandler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+        return stop, f"http://127.0.0.1:{server.server_port}"
+
+    def start_asgi_server(self):
+        try:
+            import uvicorn
+        except ImportError:
+            raise CommandError("--server asgi needs uvicorn: pip install uvicorn")
+
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(
+            ASGIHandler(), lifespan="off", log_level="error", access_log=False, backlog=1024,
+        ))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        while not server.started:
+            if not thread.is_alive():
+                raise CommandError("The ASGI server failed to start.")
+            time.sleep(0.01)
+        # As asgi.py does for a deployment; the connection objects share this dict
+        db_settings = connections["default"].settings_dict
+        conn_max_age = db_settings["CONN_MAX_AGE"]
+        db_settings["CONN_MAX_AGE"] = 0
+
+        def stop():
+            server.should_exit = True
+            thread.join()
+            sock.close()
+            db_settings["CONN_MAX_AGE"] = conn_max_age
+        return stop, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    async def run(self, base_url, emails, buckets, options):
+        stats = StepStats()
+        semaphore = asyncio.Semaphore(options["concurrency"] or len(emails))
+        limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+
+        async def student(n, email):
+            await asyncio.sleep(options["ramp"] * n / len(emails))
+            rng = random.Random(options["seed"] * 1_000_003 + n)
+            async with semaphore:
+                async with httpx.AsyncClient(base_url=base_url, timeout=options["timeout"], limits=limits) as client:
+                    return await self.student(client, email, rng.choice(buckets), rng, stats, options)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(student(n, email) for n, email in enumerate(emails)))
+        return stats, sum(results), time.perf_counter() - started
+
+    async def student(self, client, email, bucket, rng, stats, options):
+        """
+        One student's session; returns 1 if every step succeeded.
+        """
+        if await self.step(stats, "login_page", client.get("/login/"), 200) is None:
+            return 0
+        login = client.post("/login/", data={
+            "email": email, "password": PASSWORD, "csrfmiddlewaretoken": client.cookies.get("csrftoken", ""),
+        })
+        if await self.step(stats, "login", login, 302) is None:
+            return 0
+        if await self.step(stats, "userdashboard", client.get("/userdashboard/"), 200) is None:
+            return 0
+
+        topic, subtopic, difficulty = bucket
+        for _ in range(options["quizzes"]):
+            quiz = await self.step(stats, "start_quiz", client.post("/start-quiz/", data={
+                "topic": topic, "subtopic": subtopic, "difficulty": difficulty,
+                "num_questions": options["num_questions"],
+                "csrfmiddlewaretoken": client.cookies.get("csrftoken", ""),
+            }), 200)
+            if quiz is None:
+                return 0
+            answers = {field: str(rng.randint(1, 4)) for field in set(QUESTION_FIELD.findall(quiz.text))}
+            if options["think_time"]:
+                await asyncio.sleep(rng.uniform(0, options["think_time"]))
+            answers["csrfmiddlewaretoken"] = client.cookies.get("csrftoken", "")
+            if await self.step(stats, "submit_quiz", client.post("/submit-quiz/", data=answers), 200) is None:
+                return 0
+        return 1
+
+    async def step(self, stats, name, request, expected_status):
+        """
+        Await one request and record it; returns the response, or None on failure.
+        """
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError as e:
+            stats.record(name, time.perf_counter() - started, type(e).__name__, False)
+            return None
+        ok = response.status_code == expected_status
+        stats.record(name, time.perf_counter() - started, response.status_code, ok)
+        return response if ok else None
+
+    def report(self, stats, flows, elapsed, options, server):
+        students = options["students"]
+        requests = sum(len(values) for values in stats.latencies.values())
+        errors = sum(stats.errors.values())
+        rows = []
+        for name in STEPS:
+            latencies = sorted(stats.latencies.get(name, []))
+            rows.append({
+                "step": name,
+                "requests": len(latencies),
+                "errors": stats.errors[name],
+                "error_rate": stats.errors[name] / len(latencies) if latencies else 0.0,
+                **{f"p{int(q * 100)}_ms": round(percentile(latencies, q) * 1000, 1) for q in (0.5, 0.95, 0.99)},
+                "outcomes": {str(k): v for k, v in sorted(stats.outcomes[name].items(), key=lambda item: str(item[0]))},
+            })
+
+        self.stdout.write(
+            f"[{server}] {students} students, concurrency {options['concurrency'] or students}, "
+            f"{options['quizzes']} quiz(zes) each, {elapsed:.2f}s"
+        )
+        self.stdout.write(
+            f"completed sessions: {flows}/{students} ({flows / elapsed:.1f}/s), "
+            f"requests: {requests} ({requests / elapsed:.1f} req/s), "
+            f"errors: {errors} ({errors / requests:.1%})" if requests else "no requests made"
+        )
+        self.stdout.write(f"{'step':<14}{'requests':>9}{'errors':>8}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+        for row in rows:
+            self.stdout.write(
+                f"{row['step']:<14}{row['requests']:>9}{row['errors']:>8}{row['error_rate']:>7.1%}"
+                f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+            )
+            if row["errors"]:
+                self.stdout.write("    outcomes: " + ", ".join(f"{k}={v}" for k, v in row["outcomes"].items()))
+
+        return {
+            "server": server,
+            "students": students,
+            "concurrency": options["concurrency"] or students,
+            "quizzes": options["quizzes"],
+            "elapsed_s": round(elapsed, 3),
+            "completed_sessions": flows,
+            "requests": requests,
+            "requests_per_s": round(requests / elapsed, 2),
+            "errors": errors,
+            "steps": rows,
+        }
+
+    def compare(self, wsgi, asgi):
+        self.stdout.write("")
+        self.stdout.write(f"{'':<20}{'wsgi':>10}{'asgi':>10}{'change':>9}")
+        self.stdout.write(
+            f"{'req/s':<20}{wsgi['requests_per_s']:>10.1f}{asgi['requests_per_s']:>10.1f}"
+            f"{self.change(wsgi['requests_per_s'], asgi['requests_per_s']):>9}"
+        )
+        for before, after in zip(wsgi["steps"], asgi["steps"]):
+            self.stdout.write(
+                f"{before['step'] + ' p95':<20}{before['p95_ms']:>10.1f}{after['p95_ms']:>10.1f}"
+                f"{self.change(before['p95_ms'], after['p95_ms']):>9}"
+            )
+
+    def change(self, before, after):
+        return f"{(after - before) / before:+.0%}" if before else "n/a"
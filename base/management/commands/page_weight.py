@@ -0,0 +1,145 @@
+import gzip
+import json
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from base.models import Mcq, QuizResult, Registration
+
+# page: (session, method, path)
+PAGES = {
+    "home": ("anon", "get", "/"),
+    "register": ("anon", "get", "/register/"),
+    "login": ("anon", "get", "/login/"),
+    "success": ("anon", "get", "/success/"),
+    "admin_login": ("anon", "get", "/adminlogin/"),
+    "userdashboard": ("student", "get", "/userdashboard/"),
+    "quiz": ("student", "post", "/start-quiz/"),
+    "history": ("student", "get", "/history/"),
+    "results": ("student", "get", "/results/"),
+    "leaderboard": ("student", "get", "/leaderboard/"),
+    "dashboard": ("student", "get", "/dashboard/"),
+    "suggestions": ("student", "get", "/suggestions/"),
+    "admindashboard": ("admin", "get", "/admindashboard/"),
+    "database": ("admin", "get", "/database/"),
+    "cohort_analytics": ("admin", "get", "/cohort-analytics/"),
+    "duplicates": ("admin", "get", "/duplicates/"),
+    "slow_requests": ("admin", "get", "/slow-requests/"),
+}
+ASSET_RE = re.compile(r"""<(?:link|script|img)\b[^>]*?\b(?:href|src)=["']([^"']+)["']""", re.I)
+
+
+def compressed_size(data):
+    """
+    Bytes on the wire for a static asset: brotli when it is installed (as
+    WhiteNoise then precompresses with it), otherwise gzip.
+    """
+    try:
+        import brotli
+    except ImportError:
+        return len(gzip.compress(data, 9))
+    return len(brotli.compress(data))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure bytes per page view: render each HTML page in-process and add up the "
+        "page and the static assets it references. A first view downloads both; a "
+        "repeat view only the HTML, since hashed assets are cached for a year."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", help="Student to render pages as; defaults to the most recently active one.")
+        parser.add_argument("--json", help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        student = self.student(options["email"])
+        rows = []
+        for name, (kind, method, path) in PAGES.items():
+            client = self.client_for(kind, student)
+            data = self.quiz_params() if name == "quiz" else None
+            response = getattr(client, method)(path, data) if data else getattr(client, method)(path)
+            if response.status_code != 200:
+                self.stderr.write(f"{name}: {path} returned {response.status_code}, skipped")
+                continue
+            html = response.content
+            assets = [self.asset_bytes(url) for url in dict.fromkeys(ASSET_RE.findall(html.decode()))]
+            assets = [data for data in assets if data is not None]
+            asset_raw = sum(len(data) for data in assets)
+            asset_wire = sum(compressed_size(data) for data in assets)
+            rows.append({
+                "page": name,
+                "html_bytes": len(html),
+                "html_gzip_bytes": len(gzip.compress(html, 9)),
+                "assets": len(assets),
+                "asset_bytes": asset_raw,
+                "asset_wire_bytes": asset_wire,
+                "first_view_bytes": len(html) + asset_wire,
+                "repeat_view_bytes": len(html),
+            })
+
+        self.stdout.write(
+            f"{'page':<18}{'html':>9}{'html.gz':>9}{'assets':>8}{'raw':>9}{'wire':>9}{'first':>9}{'repeat':>9}  (bytes)"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['page']:<18}{row['html_bytes']:>9}{row['html_gzip_bytes']:>9}{row['assets']:>8}"
+                f"{row['asset_bytes']:>9}{row['asset_wire_bytes']:>9}{row['first_view_bytes']:>9}"
+                f"{row['repeat_view_bytes']:>9}"
+            )
+        totals = {key: sum(row[key] for row in rows) for key in rows[0] if key.endswith("_bytes")} if rows else {}
+        if rows:
+            self.stdout.write(
+                f"{'total':<18}{totals['html_bytes']:>9}{totals['html_gzip_bytes']:>9}{'':>8}"
+                f"{totals['asset_bytes']:>9}{totals['asset_wire_bytes']:>9}{totals['first_view_bytes']:>9}"
+                f"{totals['repeat_view_bytes']:>9}"
+            )
+        if options["json"]:
+            with open(options["json"], "w") as fh:
+                json.dump({"pages": rows, "totals": totals}, fh, indent=2)
+
+    def student(self, email):
+        if email:
+            student = Registration.objects.filter(email=email).first()
+        else:
+            latest = QuizResult.objects.order_by("-id").values_list("user_id", flat=True).first()
+            student = Registration.objects.filter(id=latest).first() or Registration.objects.order_by("id").first()
+        if student is None:
+            raise CommandError("No student to render pages as; register one or pass --email.")
+        return student
+
+    def client_for(self, kind, student):
+        client = Client(HTTP_HOST="localhost")
+        if kind != "anon":
+            session = client.session
+            if kind == "student":
+                session["user_id"] = student.id
+                session["user_email"] = student.email
+            else:
+                session["is_admin"] = True
+            session.save()
+            client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        return client
+
+    def quiz_params(self):
+        mcq = Mcq.objects.order_by("id").values("topic", "subtopic", "difficulty").first() or {}
+        return {**mcq, "num_questions": 10}
+
+    def asset_bytes(self, url):
+        """
+        Contents of a referenced static file, hashed name or not; None for
+        anything outside STATIC_URL.
+        """
+        prefix = "/" + settings.STATIC_URL.lstrip("/")
+        if not url.startswith(prefix):
+            return None
+        name = url[len(prefix):].split("?")[0]
+        if settings.STATIC_ROOT and staticfiles_storage.exists(name):
+            return Path(staticfiles_storage.path(name)).read_bytes()
+        found = finders.find(name)
+        return Path(found).read_bytes() if found else None
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from base.dedup import index_path, rebuild_index, store_clusters
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the on-disk MinHash LSH index used for near-duplicate question detection, "
+        "and the cluster report shown on the admin duplicates page."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--skip-clusters", action="store_true", help="Only rebuild the index.")
+        parser.add_argument("--report", action="store_true", help="Also print duplicate clusters.")
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Done: {indexed} questions indexed in {index_path()}."))
+        if options["skip_clusters"]:
+            return
+        clusters = store_clusters()["clusters"]
+        if options["report"]:
+            for cluster in clusters:
+                self.stdout.write(" ".join(str(mcq_id) for mcq_id in cluster))
+        self.stdout.write(f"{len(clusters)} clusters of near-duplicates.")
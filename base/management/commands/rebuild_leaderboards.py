@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from base.leaderboard import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recompute all leaderboard entries from QuizResult."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        created = rebuild_leaderboards(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Done: {created} leaderboard entries."))
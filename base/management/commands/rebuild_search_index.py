@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from base.search import rebuild_search_index, uses_fulltext
+
+
+class Command(BaseCommand):
+    help = "Rebuild the inverted search index over question and option text (not needed on MySQL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if uses_fulltext():
+            self.stdout.write("MySQL FULLTEXT index in use; nothing to rebuild.")
+            return
+        indexed = rebuild_search_index(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Done: {indexed} questions indexed."))
@@ -0,0 +1,198 @@
+import time
+from datetime import date, datetime, timezone as dt_timezone
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from base.catalog import refresh_catalog
+from base.models import Mcq, QuizResult, Registration
+
+# Rows are generated in fixed-size chunks, each from its own generator seeded
+# with (seed, table, chunk), so the data depends only on --seed and the row
+# counts (and --until), not on --batch-size.
+CHUNK = 100_000
+EMAIL_PATTERN = "scale{seed}-{n}@example.com"
+PASSWORD = "scale-Password-123"
+
+# topic: (relative popularity, subtopics)
+TOPICS = {
+    "Python": (20, ["Basics", "Loops", "Functions", "OOP", "Modules", "Exceptions"]),
+    "Java": (15, ["Basics", "Collections", "Streams", "Generics", "Concurrency"]),
+    "SQL": (12, ["Joins", "Indexes", "Aggregation", "Transactions"]),
+    "Data Structures": (12, ["Arrays", "Linked Lists", "Trees", "Graphs", "Hashing"]),
+    "Algorithms": (10, ["Sorting", "Searching", "Dynamic Programming", "Greedy"]),
+    "Web": (9, ["HTTP", "HTML", "CSS", "JavaScript"]),
+    "Operating Systems": (7, ["Processes", "Memory", "Scheduling", "File Systems"]),
+    "Networks": (6, ["TCP/IP", "Routing", "DNS"]),
+    "Django": (5, ["Models", "Views", "Templates", "ORM"]),
+    "Git": (4, ["Branching", "Merging", "Rebasing"]),
+}
+DIFFICULTIES = np.array(["easy", "medium", "hard"])
+QUESTION_DIFFICULTY_P = [0.4, 0.4, 0.2]
+RESULT_DIFFICULTY_P = [0.45, 0.38, 0.17]
+# Added to a student's ability (share of answers right) per difficulty
+DIFFICULTY_OFFSET = np.array([0.12, 0.0, -0.15])
+QUIZ_SIZES = np.array([5, 10, 15, 20])
+QUIZ_SIZE_P = [0.35, 0.35, 0.15, 0.15]
+
+FIRST_NAMES = np.array("Aarav Aditi Amit Ananya Arjun Diya Ishaan Kavya Meera Neha Priya Rahul Riya Rohan "
+                       "Sanjay Sneha Tanvi Varun Vikram Zara Alex Sam Maria Chen Omar Lena Yuki Noah Emma".split())
+LAST_NAMES = np.array("Sharma Patel Reddy Iyer Singh Gupta Nair Das Khan Mehta Rao Joshi Kumar Shah Bose "
+                      "Smith Garcia Kim Nguyen Muller Rossi Silva Tanaka Ali Brown".split())
+GENDERS = np.array(["male", "female", "other"])
+GENDER_P = [0.49, 0.49, 0.02]
+VERBS = np.array("returns prints raises evaluates allocates compiles resolves yields stores sorts".split())
+NOUNS = np.array("list tuple dictionary index query cursor thread process packet pointer heap stack "
+                 "closure decorator iterator generator schema join transaction socket".split())
+
+BUCKETS = [
+    (topic, subtopic, weight / len(subtopics))
+    for topic, (weight, subtopics) in TOPICS.items()
+    for subtopic in subtopics
+]
+BUCKET_TOPICS = np.array([topic for topic, _, _ in BUCKETS])
+BUCKET_SUBTOPICS = np.array([subtopic for _, subtopic, _ in BUCKETS])
+BUCKET_P = np.array([weight for _, _, weight in BUCKETS]) / sum(weight for _, _, weight in BUCKETS)
+
+
+def chunk_rng(seed, table, chunk_no):
+    return np.random.default_rng([seed, table, chunk_no])
+
+
+def timestamps(rng, size, days, until):
+    """
+    UTC datetime strings over the `days` days before `until`: activity grows
+    towards `until`, dips at weekends and peaks in the afternoon.
+    """
+    age = np.arange(1, days + 1)
+    weekend = (until.weekday() - age) % 7 >= 5
+    day_weight = np.exp(-age / (days / 1.5)) * np.where(weekend, 0.6, 1.0)
+    day = rng.choice(days, size=size, p=day_weight / day_weight.sum())
+    seconds = np.clip(rng.normal(15 * 3600, 4 * 3600, size), 0, 86399).astype("int64")
+    values = np.datetime64(until, "s") - (day + 1).astype("timedelta64[D]") + seconds.astype("timedelta64[s]")
+    return np.char.replace(np.datetime_as_string(values, unit="s"), "T", " ")
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset (questions, students and quiz results) with "
+        "realistic topic, difficulty, activity and date distributions, using bulk "
+        "inserts. The same --seed and counts always produce the same data. Meant for a "
+        "throwaway performance database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mcqs", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--results", type=int, default=1_000_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--days", type=int, default=365, help="Spread results over this many days.")
+        parser.add_argument("--until", type=date.fromisoformat,
+                            help="Activity ends the day before this date (YYYY-MM-DD); defaults to today.")
+        parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per INSERT batch.")
+        parser.add_argument("--derived", action="store_true",
+                            help="Also rebuild leaderboards, suggestions and the search and dedup indexes.")
+
+    def handle(self, *args, **options):
+        seed = options["seed"]
+        if min(options["mcqs"], options["users"], options["results"]) < 0 or options["days"] < 1:
+            raise CommandError("Counts must not be negative and --days must be positive.")
+        if options["results"] and not options["users"]:
+            raise CommandError("Results need at least one user.")
+        if Registration.objects.filter(email=EMAIL_PATTERN.format(seed=seed, n=0)).exists():
+            raise CommandError(f"Data for seed {seed} already exists; use another --seed or a fresh database.")
+
+        self.seed_value = seed
+        self.batch_size = options["batch_size"]
+        until = options["until"] or datetime.now(dt_timezone.utc).date()
+        self.until = datetime(until.year, until.month, until.day)
+        started = time.perf_counter()
+
+        self.insert(Mcq, options["mcqs"], lambda rng, start, size: self.mcq_rows(rng, start, size, options))
+        # Fixed salt so reruns produce identical rows; hashers want 22+ salt characters
+        password = make_password(PASSWORD, salt=f"scale{seed}".ljust(22, "x"))
+        self.insert(Registration, options["users"], lambda rng, start, size: self.user_rows(rng, start, size, seed, password))
+        if options["results"]:
+            user_ids = np.fromiter(
+                Registration.objects.filter(email__startswith=f"scale{seed}-").order_by("id").values_list("id", flat=True),
+                dtype="int64",
+            )
+            # Heavy-tailed activity: most students take a few quizzes, some take many
+            activity = np.random.default_rng([seed, 99]).lognormal(0, 1.0, len(user_ids))
+            ability = np.clip(np.random.default_rng([seed, 98]).normal(0.62, 0.14, len(user_ids)), 0.05, 0.98)
+            self.insert(QuizResult, options["results"], lambda rng, start, size: self.result_rows(
+                rng, size, user_ids, activity / activity.sum(), ability, options["days"]))
+
+        refresh_catalog()
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.perf_counter() - started:.1f}s."))
+        if options["derived"]:
+            for command in ("rebuild_leaderboards", "compute_suggestions", "rebuild_search_index", "rebuild_dedup_index"):
+                self.stdout.write(f"Running {command}...")
+                call_command(command, stdout=self.stdout, stderr=self.stderr)
+
+    def insert(self, model, total, make_rows):
+        """
+        Insert `total` rows with executemany, skipping model instantiation.
+        """
+        fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+        qn = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            qn(model._meta.db_table), ", ".join(qn(f.column) for f in fields), ", ".join(["%s"] * len(fields)),
+        )
+        table = {Mcq: 1, Registration: 2, QuizResult: 3}[model]
+        started = time.perf_counter()
+        done = 0
+        for chunk_no, start in enumerate(range(0, total, CHUNK)):
+            size = min(CHUNK, total - start)
+            rows = make_rows(chunk_rng(self.seed_value, table, chunk_no), start, size)
+            for offset in range(0, size, self.batch_size):
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, rows[offset:offset + self.batch_size])
+            done += size
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{model.__name__}: {done}/{total} rows ({done / elapsed:,.0f} rows/s)")
+
+    def mcq_rows(self, rng, start, size, options):
+        bucket = rng.choice(len(BUCKETS), size=size, p=BUCKET_P)
+        difficulty = DIFFICULTIES[rng.choice(3, size=size, p=QUESTION_DIFFICULTY_P)]
+        verbs = VERBS[rng.integers(len(VERBS), size=size)]
+        nouns = NOUNS[rng.integers(len(NOUNS), size=(size, 6))]
+        correct = rng.integers(1, 5, size=size).astype(str)
+        created = timestamps(rng, size, options["days"], self.until)
+        return [
+            (topic, subtopic, diff, start + i + 1,
+             f"Which {n[0]} {verb} the {n[1]} when the {n[2]} is empty? (#{start + i + 1})",
+             f"The {n[3]}", f"The {n[4]}", f"The {n[5]}", "None of these", answer, ts)
+            for i, (topic, subtopic, diff, verb, n, answer, ts) in enumerate(zip(
+                BUCKET_TOPICS[bucket].tolist(), BUCKET_SUBTOPICS[bucket].tolist(), difficulty.tolist(),
+                verbs.tolist(), nouns.tolist(), correct.tolist(), created.tolist(),
+            ))
+        ]
+
+    def user_rows(self, rng, start, size, seed, password):
+        first = FIRST_NAMES[rng.integers(len(FIRST_NAMES), size=size)].tolist()
+        last = LAST_NAMES[rng.integers(len(LAST_NAMES), size=size)].tolist()
+        gender = GENDERS[rng.choice(3, size=size, p=GENDER_P)].tolist()
+        contact = rng.integers(6_000_000_000, 9_999_999_999, size=size).astype(str).tolist()
+        return [
+            (first[i], last[i], EMAIL_PATTERN.format(seed=seed, n=start + i), password, contact[i], gender[i])
+            for i in range(size)
+        ]
+
+    def result_rows(self, rng, size, user_ids, activity_p, ability, days):
+        user = rng.choice(len(user_ids), size=size, p=activity_p)
+        bucket = rng.choice(len(BUCKETS), size=size, p=BUCKET_P)
+        difficulty = rng.choice(3, size=size, p=RESULT_DIFFICULTY_P)
+        total = rng.choice(QUIZ_SIZES, size=size, p=QUIZ_SIZE_P)
+        p_correct = np.clip(ability[user] + DIFFICULTY_OFFSET[difficulty] + rng.normal(0, 0.08, size), 0.0, 1.0)
+        correct = rng.binomial(total, p_correct)
+        score = np.round(correct * 100.0 / total, 2)
+        attempted = timestamps(rng, size, days, self.until)
+        return list(zip(
+            user_ids[user].tolist(), BUCKET_TOPICS[bucket].tolist(), BUCKET_SUBTOPICS[bucket].tolist(),
+            DIFFICULTIES[difficulty].tolist(), attempted.tolist(), total.tolist(), correct.tolist(),
+            (total - correct).tolist(), score.tolist(),
+        ))
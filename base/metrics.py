@@ -0,0 +1,182 @@
+"""
+In-process request metrics in the Prometheus text exposition format.
+
+MetricsMiddleware records, per URL name and method, request latency and
+response size histograms, request counts by status, and the number and
+time of SQL queries (on every database alias). The instrumented template
+backend in template_backends.py adds render time per template. /metrics
+serves everything, together with the connection-open counters from
+dbstats.py, to scrapers with the METRICS_TOKEN bearer token or, with no
+token set, to admin sessions only.
+
+Metrics are per process; scrape each worker, or run a single process while
+investigating. With METRICS_ENABLED off the middleware removes itself
+(MiddlewareNotUsed) and settings keep the stock template backend, so there
+is no per-request cost at all.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .dbstats import connection_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+KNOWN_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, labels, (), value) for labels, value in self.values.items()]
+
+
+class Histogram(Counter):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, labels, value):
+        with self.lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self.lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self.values.items()]
+        samples = []
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", labels, (("le", _format_value(bound)),), cumulative))
+            samples.append((f"{self.name}_bucket", labels, (("le", "+Inf"),), count))
+            samples.append((f"{self.name}_sum", labels, (), total))
+            samples.append((f"{self.name}_count", labels, (), count))
+        return samples
+
+
+REQUEST_LATENCY = Histogram(
+    "quiz_request_duration_seconds", "Request latency by URL name.", ("view", "method"), LATENCY_BUCKETS
+)
+REQUESTS = Counter("quiz_requests_total", "Requests by URL name and status.", ("view", "method", "status"))
+RESPONSE_SIZE = Histogram(
+    "quiz_response_size_bytes", "Non-streaming response body size.", ("view", "method"), SIZE_BUCKETS
+)
+QUERIES_PER_REQUEST = Histogram(
+    "quiz_db_queries_per_request", "SQL queries issued per request.", ("view", "method"), QUERY_BUCKETS
+)
+QUERY_TIME = Counter("quiz_db_query_seconds_total", "Time spent in SQL queries.", ("view", "method"))
+TEMPLATE_RENDER = Histogram(
+    "quiz_template_render_seconds", "Template render time.", ("template",), LATENCY_BUCKETS
+)
+REGISTRY = (REQUEST_LATENCY, REQUESTS, RESPONSE_SIZE, QUERIES_PER_REQUEST, QUERY_TIME, TEMPLATE_RENDER)
+
+
+def metrics_enabled():
+    return getattr(settings, "METRICS_ENABLED", False)
+
+
+def _format_value(value):
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labels, extra=()):
+    pairs = list(zip(labelnames, labels)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, extra, value in metric.samples():
+            lines.append(f"{name}{_format_labels(metric.labelnames, labels, extra)} {_format_value(value)}")
+
+    db = connection_stats()["aliases"]
+    for name, key, documentation in (
+        ("quiz_db_connections_opened_total", "opens", "Database connections opened."),
+        ("quiz_db_connection_open_seconds_total", "open_seconds", "Time spent opening database connections."),
+    ):
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} counter")
+        for alias, stats in db.items():
+            lines.append(f'{name}{{alias="{_escape(alias)}"}} {_format_value(stats[key])}')
+    return "\n".join(lines) + "\n"
+
+
+class QueryTimer:
+    """
+    Database execute wrapper counting queries and their time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not metrics_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        method = request.method if request.method in KNOWN_METHODS else "other"
+        labels = (match.view_name if match else "unmatched", method)
+        REQUEST_LATENCY.observe(labels, elapsed)
+        REQUESTS.inc(labels + (str(response.status_code),))
+        QUERIES_PER_REQUEST.observe(labels, timer.count)
+        QUERY_TIME.inc(labels, timer.seconds)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(labels, len(response.content))
+        return response
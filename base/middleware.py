@@ -0,0 +1,102 @@
+"""
+Request-scoped access to the logged-in student.
+
+QuizUserMiddleware attaches request.quiz_user, a lazy object that loads the
+Registration for session["user_id"] the first time it is used and then
+memoizes it for the rest of the request. Views that never touch it cost no
+query. When no student is logged in it evaluates to None, so test it with
+`if not request.quiz_user`, not `is None`.
+
+Async views must not touch request.quiz_user (it queries synchronously);
+they use `await request.aquiz_user()` instead, memoized the same way. The
+middleware itself is sync and async capable, so it adds no thread switch
+in front of async views under ASGI.
+
+With QUIZ_USER_CACHE_TIMEOUT > 0 the non-sensitive profile fields are also
+kept in the cache for that many seconds; the password is left deferred and
+only loaded from the database if something reads it.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .models import Registration
+
+PROFILE_FIELDS = ("id", "first_name", "last_name", "email", "contact", "gender")
+PROFILE_KEY = "quiz_user:{user_id}"
+
+
+def _cache():
+    from .caching import get_cache
+
+    return get_cache()
+
+
+def load_quiz_user(user_id):
+    if not user_id:
+        return None
+    timeout = getattr(settings, "QUIZ_USER_CACHE_TIMEOUT", 0)
+    key = PROFILE_KEY.format(user_id=user_id)
+    if timeout:
+        values = _cache().get(key)
+        if values is not None:
+            return Registration.from_db(Registration.objects.db, PROFILE_FIELDS, values)
+
+    user = Registration.objects.only(*PROFILE_FIELDS).filter(id=user_id).first()
+    if user is not None and timeout:
+        _cache().set(key, [getattr(user, field) for field in PROFILE_FIELDS], timeout)
+    return user
+
+
+async def aload_quiz_user(user_id):
+    if not user_id:
+        return None
+    timeout = getattr(settings, "QUIZ_USER_CACHE_TIMEOUT", 0)
+    key = PROFILE_KEY.format(user_id=user_id)
+    if timeout:
+        values = await _cache().aget(key)
+        if values is not None:
+            return Registration.from_db(Registration.objects.db, PROFILE_FIELDS, values)
+
+    user = await Registration.objects.only(*PROFILE_FIELDS).filter(id=user_id).afirst()
+    if user is not None and timeout:
+        await _cache().aset(key, [getattr(user, field) for field in PROFILE_FIELDS], timeout)
+    return user
+
+
+async def aget_quiz_user(request):
+    if not hasattr(request, "_aquiz_user"):
+        request._aquiz_user = await aload_quiz_user(await request.session.aget("user_id"))
+    return request._aquiz_user
+
+
+def forget_quiz_user(user_id):
+    """
+    Drop a cached profile after the Registration is edited or deleted.
+    """
+    if getattr(settings, "QUIZ_USER_CACHE_TIMEOUT", 0):
+        _cache().delete(PROFILE_KEY.format(user_id=user_id))
+
+
+class QuizUserMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def attach(self, request):
+        request.quiz_user = SimpleLazyObject(lambda: load_quiz_user(request.session.get("user_id")))
+        request.aquiz_user = lambda: aget_quiz_user(request)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.attach(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.attach(request)
+        return await self.get_response(request)
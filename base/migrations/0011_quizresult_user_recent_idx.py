@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0010_alter_mcq_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['user', '-date_attempted', '-id'], name='quizresult_user_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_quizresult_user_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mcq',
+            index=models.Index(fields=['topic', 'subtopic', 'difficulty'], name='mcq_bucket_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0012_mcq_bucket_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSuggestions',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='base.registration')),
+                ('difficulty_stats', models.JSONField(default=dict)),
+                ('headline', models.TextField(blank=True)),
+                ('suggestions', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0013_usersuggestions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(blank=True, max_length=100)),
+                ('difficulty', models.CharField(blank=True, max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('total_score', models.FloatField(default=0)),
+                ('avg_score', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.registration')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['topic', 'difficulty', '-avg_score', '-attempts', 'user'], name='leaderboard_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'topic', 'difficulty'), name='leaderboard_user_bucket_uniq')],
+            },
+        ),
+    ]
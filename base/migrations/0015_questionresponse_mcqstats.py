@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0014_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='McqStats',
+            fields=[
+                ('mcq', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='base.mcq')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('p_value', models.FloatField(blank=True, null=True)),
+                ('discrimination', models.FloatField(blank=True, null=True)),
+                ('option1_count', models.PositiveIntegerField(default=0)),
+                ('option2_count', models.PositiveIntegerField(default=0)),
+                ('option3_count', models.PositiveIntegerField(default=0)),
+                ('option4_count', models.PositiveIntegerField(default=0)),
+                ('unanswered_count', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'mcq stats',
+                'indexes': [models.Index(fields=['p_value'], name='mcqstats_p_value_idx'), models.Index(fields=['discrimination'], name='mcqstats_discrimination_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_option', models.CharField(blank=True, max_length=1)),
+                ('is_correct', models.BooleanField()),
+                ('mcq', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='base.mcq')),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='base.quizresult')),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+FULLTEXT_INDEX = "mcq_fulltext_idx"
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        table = apps.get_model("base", "Mcq")._meta.db_table
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD FULLTEXT INDEX {FULLTEXT_INDEX} "
+            "(question, option1, option2, option3, option4)"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        table = apps.get_model("base", "Mcq")._meta.db_table
+        schema_editor.execute(f"ALTER TABLE {table} DROP INDEX {FULLTEXT_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0015_questionresponse_mcqstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='McqSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('mcq', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='base.mcq')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'mcq'], name='mcqsearchterm_term_idx')],
+            },
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0016_mcq_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500)),
+                ('view_name', models.CharField(blank=True, max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('query_count', models.PositiveIntegerField(default=0)),
+                ('sql_ms', models.FloatField(default=0)),
+                ('trigger', models.CharField(choices=[('sample', 'Sampled'), ('header', 'Signed header'), ('toggle', 'Admin toggle')], max_length=10)),
+                ('profile', models.TextField(blank=True)),
+                ('queries', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created_at'], name='slowrequest_recent_idx')],
+            },
+        ),
+    ]
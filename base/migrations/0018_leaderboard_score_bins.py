@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:27
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Floor
+
+# Must match leaderboard.SCORE_BINS_PER_POINT
+SCORE_BINS_PER_POINT = 10
+
+
+def fill_score_bins(apps, schema_editor):
+    LeaderboardEntry = apps.get_model("base", "LeaderboardEntry")
+    LeaderboardScoreBin = apps.get_model("base", "LeaderboardScoreBin")
+    LeaderboardEntry.objects.update(score_bin=Floor(models.F("avg_score") * SCORE_BINS_PER_POINT))
+    LeaderboardScoreBin.objects.bulk_create([
+        LeaderboardScoreBin(entries=row.pop("n"), **row)
+        for row in LeaderboardEntry.objects.values("topic", "difficulty", "score_bin").annotate(n=Count("id")).order_by()
+    ], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0017_slowrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardScoreBin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(blank=True, max_length=100)),
+                ('difficulty', models.CharField(blank=True, max_length=20)),
+                ('score_bin', models.PositiveSmallIntegerField()),
+                ('entries', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='score_bin',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['topic', 'difficulty', 'score_bin'], name='leaderboard_bin_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardscorebin',
+            constraint=models.UniqueConstraint(fields=('topic', 'difficulty', 'score_bin'), name='leaderboard_bin_uniq'),
+        ),
+        migrations.RunPython(fill_score_bins, migrations.RunPython.noop),
+    ]
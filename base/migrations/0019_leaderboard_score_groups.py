@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:01
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_score_groups(apps, schema_editor):
+    LeaderboardEntry = apps.get_model("base", "LeaderboardEntry")
+    LeaderboardScoreGroup = apps.get_model("base", "LeaderboardScoreGroup")
+    LeaderboardScoreGroup.objects.bulk_create([
+        LeaderboardScoreGroup(entries=row.pop("n"), **row)
+        for row in LeaderboardEntry.objects.values("topic", "difficulty", "score_bin", "avg_score", "attempts")
+        .annotate(n=Count("id")).order_by()
+    ], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0018_leaderboard_score_bins'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardScoreGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(blank=True, max_length=100)),
+                ('difficulty', models.CharField(blank=True, max_length=20)),
+                ('score_bin', models.PositiveSmallIntegerField()),
+                ('avg_score', models.FloatField()),
+                ('attempts', models.PositiveIntegerField()),
+                ('entries', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['topic', 'difficulty', 'score_bin'], name='leaderboard_group_bin_idx')],
+                'constraints': [models.UniqueConstraint(fields=('topic', 'difficulty', 'avg_score', 'attempts'), name='leaderboard_group_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_score_groups, migrations.RunPython.noop),
+    ]
@@ -26,6 +26,12 @@ class Mcq(models.Model):
     correct_answer = models.CharField(max_length=1, choices=[("1", "Option 1"), ("2", "Option 2"), ("3", "Option 3"), ("4", "Option 4")])
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Quiz selection and the bank browser filter on the full bucket
+            models.Index(fields=["topic", "subtopic", "difficulty"], name="mcq_bucket_idx"),
+        ]
+
     def __str__(self):
         return f"{self.topic} - {self.subtopic} (Q{self.question_no})"
 
@@ -40,5 +46,184 @@ class QuizResult(models.Model):
     wrong_questions = models.IntegerField()
     score = models.FloatField()
 
+    class Meta:
+        indexes = [
+            # Serves the keyset-paginated results list (see pagination.py)
+            models.Index(fields=["user", "-date_attempted", "-id"], name="quizresult_user_recent_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.first_name} - {self.topic} - {self.score}%"
+
+class UserSuggestions(models.Model):
+    """
+    Per-user difficulty stats and the suggestions derived from them, kept up
+    to date on quiz submission so pages never aggregate QuizResult.
+    """
+    user = models.OneToOneField(Registration, on_delete=models.CASCADE, primary_key=True)
+    difficulty_stats = models.JSONField(default=dict)
+    headline = models.TextField(blank=True)
+    suggestions = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Suggestions for {self.user_id}"
+
+class LeaderboardEntry(models.Model):
+    """
+    A user's running score in one leaderboard bucket. topic and difficulty
+    are both empty for the overall board.
+    """
+    user = models.ForeignKey(Registration, on_delete=models.CASCADE)
+    topic = models.CharField(max_length=100, blank=True)
+    difficulty = models.CharField(max_length=20, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    total_score = models.FloatField(default=0)
+    avg_score = models.FloatField(default=0)
+    # Band of avg_score this entry is counted in (see LeaderboardScoreBin)
+    score_bin = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "topic", "difficulty"], name="leaderboard_user_bucket_uniq"),
+        ]
+        indexes = [
+            # Top-N lookups are range scans within one bucket
+            models.Index(fields=["topic", "difficulty", "-avg_score", "-attempts", "user"], name="leaderboard_rank_idx"),
+            # Rank lookups only compare against entries in the same score band
+            models.Index(fields=["topic", "difficulty", "score_bin"], name="leaderboard_bin_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.topic or 'overall'} {self.difficulty} - {self.avg_score:.1f}%"
+
+class LeaderboardScoreBin(models.Model):
+    """
+    Number of entries in one leaderboard bucket whose average score falls in
+    one score band, kept up to date by record_score.
+    """
+    topic = models.CharField(max_length=100, blank=True)
+    difficulty = models.CharField(max_length=20, blank=True)
+    score_bin = models.PositiveSmallIntegerField()
+    entries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["topic", "difficulty", "score_bin"], name="leaderboard_bin_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.topic or 'overall'} {self.difficulty} bin {self.score_bin}: {self.entries}"
+
+
+class LeaderboardScoreGroup(models.Model):
+    """
+    Number of entries in one leaderboard bucket with exactly the same average
+    score and attempts. Students tied on both share a rank. Kept up to date
+    by record_score; a group is deleted when its last entry leaves it.
+    """
+    topic = models.CharField(max_length=100, blank=True)
+    difficulty = models.CharField(max_length=20, blank=True)
+    score_bin = models.PositiveSmallIntegerField()
+    avg_score = models.FloatField()
+    attempts = models.PositiveIntegerField()
+    entries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["topic", "difficulty", "avg_score", "attempts"], name="leaderboard_group_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["topic", "difficulty", "score_bin"], name="leaderboard_group_bin_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.topic or 'overall'} {self.difficulty} {self.avg_score} x{self.attempts}: {self.entries}"
+
+class QuestionResponse(models.Model):
+    """
+    The option a student chose for one question in one submitted quiz.
+    selected_option is empty when the question was left unanswered.
+    """
+    result = models.ForeignKey(QuizResult, on_delete=models.CASCADE, related_name="responses")
+    mcq = models.ForeignKey(Mcq, on_delete=models.CASCADE, related_name="responses")
+    selected_option = models.CharField(max_length=1, blank=True)
+    is_correct = models.BooleanField()
+
+    def __str__(self):
+        return f"Result {self.result_id} - Mcq {self.mcq_id}: {self.selected_option or '-'}"
+
+class McqStats(models.Model):
+    """
+    Item statistics for one question, computed in bulk by compute_item_stats.
+    p_value is the share of correct responses; discrimination is the
+    point-biserial correlation between answering correctly and the score on
+    the rest of the quiz.
+    """
+    mcq = models.OneToOneField(Mcq, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    responses = models.PositiveIntegerField(default=0)
+    p_value = models.FloatField(null=True, blank=True)
+    discrimination = models.FloatField(null=True, blank=True)
+    option1_count = models.PositiveIntegerField(default=0)
+    option2_count = models.PositiveIntegerField(default=0)
+    option3_count = models.PositiveIntegerField(default=0)
+    option4_count = models.PositiveIntegerField(default=0)
+    unanswered_count = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "mcq stats"
+        indexes = [
+            models.Index(fields=["p_value"], name="mcqstats_p_value_idx"),
+            models.Index(fields=["discrimination"], name="mcqstats_discrimination_idx"),
+        ]
+
+    def __str__(self):
+        return f"Stats for Mcq {self.mcq_id}"
+
+class McqSearchTerm(models.Model):
+    """
+    Inverted-index posting for question search on databases without a
+    native full-text index (see search.py). MySQL uses a FULLTEXT index instead.
+    """
+    term = models.CharField(max_length=64)
+    mcq = models.ForeignKey(Mcq, on_delete=models.CASCADE, related_name="search_terms")
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["term", "mcq"], name="mcqsearchterm_term_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.mcq_id}"
+
+class SlowRequest(models.Model):
+    """
+    A profiled request captured by ProfilingMiddleware (see profiling.py):
+    the top functions from cProfile and the SQL it ran.
+    """
+    TRIGGERS = [("sample", "Sampled"), ("header", "Signed header"), ("toggle", "Admin toggle")]
+
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True)
+    method = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    sql_ms = models.FloatField(default=0)
+    trigger = models.CharField(max_length=10, choices=TRIGGERS)
+    profile = models.TextField(blank=True)
+    queries = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="slowrequest_recent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
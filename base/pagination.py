@@ -0,0 +1,83 @@
+"""
+Keyset (cursor) pagination for QuizResult lists, newest first.
+
+Pages are addressed by the (date_attempted, id) of the last row shown rather
+than by an OFFSET, so fetching page 200 costs the same index range scan as
+fetching page 1.
+
+keyset_chunks() applies the same idea to full-table passes (exports, cohort
+and item statistics). QuerySet.iterator() is not enough there: mysqlclient
+buffers a whole result set on the client, so memory would grow with the
+table. Each chunk is instead its own query on id > last id seen.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+RESULTS_PAGE_SIZE = 25
+
+
+def encode_cursor(result):
+    raw = f"{result.date_attempted.isoformat()}|{result.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Return (date_attempted, id) for a cursor, or None if it is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        stamp, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(stamp), int(pk)
+    except (ValueError, binascii.Error, UnicodeError):
+        return None
+
+
+def _page_queryset(queryset, cursor, page_size):
+    queryset = queryset.order_by("-date_attempted", "-id")
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        stamp, pk = position
+        queryset = queryset.filter(
+            Q(date_attempted__lt=stamp) | Q(date_attempted=stamp, id__lt=pk)
+        )
+    # One extra row tells us whether another page exists without a COUNT(*)
+    return queryset[: page_size + 1]
+
+
+def _split_page(rows, page_size):
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def keyset_page(queryset, cursor=None, page_size=RESULTS_PAGE_SIZE):
+    """
+    Return (rows, next_cursor) for the page after `cursor`. next_cursor is
+    None on the last page.
+    """
+    return _split_page(list(_page_queryset(queryset, cursor, page_size)), page_size)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=RESULTS_PAGE_SIZE):
+    return _split_page([row async for row in _page_queryset(queryset, cursor, page_size)], page_size)
+
+
+def keyset_chunks(queryset, fields, chunk_size):
+    """
+    Yield lists of `fields` value tuples from queryset in id order, at most
+    chunk_size rows per list and one query per list.
+    """
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(page.values_list("pk", *fields)[:chunk_size])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield [row[1:] for row in rows]
+        if len(rows) < chunk_size:
+            return
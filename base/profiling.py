@@ -0,0 +1,173 @@
+"""
+Opt-in request profiling with slow-request capture.
+
+With PROFILING_ENABLED on, ProfilingMiddleware profiles a request under
+cProfile and records its SQL when one of these triggers applies:
+
+* sample: a random PROFILING_SAMPLE_RATE share of requests;
+* header: the request carries a valid signed X-Quiz-Profile token
+  (make_profile_token(), shown on the admin page);
+* toggle: an admin switched profiling on for everyone for a few minutes.
+
+Header-triggered requests are always stored; the others only when they take
+at least PROFILING_SLOW_MS. Stored rows (SlowRequest) keep the top functions
+by cumulative time and the SQL statements, without their parameters.
+With PROFILING_ENABLED off the middleware removes itself.
+"""
+import cProfile
+import io
+import pstats
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .models import SlowRequest
+
+PROFILE_HEADER = "X-Quiz-Profile"
+SIGNING_SALT = "base.profiling"
+TOGGLE_KEY = "profiling:forced_until"
+MAX_QUERIES = 200
+MAX_SQL_LENGTH = 2000
+KEEP_ROWS = 500
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def make_profile_token():
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign("profile")
+
+
+def valid_profile_token(token):
+    try:
+        value = signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            token, max_age=_setting("PROFILING_TOKEN_MAX_AGE", 60 * 60)
+        )
+    except signing.BadSignature:
+        return False
+    return value == "profile"
+
+
+def _cache():
+    from .caching import get_cache
+
+    return get_cache()
+
+
+def toggle_until():
+    """
+    Unix time until which every request is profiled, or 0.
+    """
+    return _cache().get(TOGGLE_KEY, 0)
+
+
+def set_toggle(minutes):
+    if minutes > 0:
+        _cache().set(TOGGLE_KEY, time.time() + minutes * 60, timeout=minutes * 60)
+    else:
+        _cache().delete(TOGGLE_KEY)
+
+
+class SQLRecorder:
+    """
+    Database execute wrapper keeping each statement and its duration.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            took = time.perf_counter() - started
+            self.count += 1
+            self.seconds += took
+            if len(self.queries) < MAX_QUERIES:
+                self.queries.append({
+                    "alias": context["connection"].alias,
+                    "sql": sql[:MAX_SQL_LENGTH],
+                    "ms": round(took * 1000, 3),
+                })
+
+
+def top_functions(profiler, limit):
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    text = stream.getvalue()
+    # Drop the preamble ("N function calls in X seconds", ordering note)
+    start = text.find("   ncalls")
+    return text[start:] if start >= 0 else text
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not _setting("PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def trigger_for(self, request):
+        token = request.headers.get(PROFILE_HEADER)
+        if token and valid_profile_token(token):
+            return "header"
+        if toggle_until() > time.time():
+            return "toggle"
+        if random.random() < _setting("PROFILING_SAMPLE_RATE", 0.0):
+            return "sample"
+        return None
+
+    def __call__(self, request):
+        trigger = self.trigger_for(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        recorder = SQLRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            try:
+                profiler.enable()
+                profiling = True
+            except ValueError:
+                # Another profiler is already active in this thread
+                profiling = False
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiling:
+                    profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if trigger == "header" or duration_ms >= _setting("PROFILING_SLOW_MS", 500):
+            self.store(request, response, trigger, duration_ms, recorder,
+                       top_functions(profiler, _setting("PROFILING_TOP_FUNCTIONS", 30)) if profiling else "")
+        return response
+
+    def store(self, request, response, trigger, duration_ms, recorder, profile):
+        match = request.resolver_match
+        slow = SlowRequest.objects.create(
+            path=request.get_full_path()[:500],
+            view_name=match.view_name if match else "",
+            method=request.method[:10],
+            status_code=response.status_code,
+            duration_ms=round(duration_ms, 3),
+            query_count=recorder.count,
+            sql_ms=round(recorder.seconds * 1000, 3),
+            trigger=trigger,
+            profile=profile,
+            queries=recorder.queries,
+        )
+        if slow.pk % 50 == 0:
+            cutoff = SlowRequest.objects.order_by("-id").values_list("id", flat=True)[KEEP_ROWS:KEEP_ROWS + 1]
+            SlowRequest.objects.filter(id__lte=cutoff.first() or 0).delete()
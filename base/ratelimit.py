@@ -0,0 +1,140 @@
+"""
+Token-bucket rate limiting for login attempts.
+
+Each failed attempt takes a token from three buckets: the client IP, the
+submitted email from that IP ("account"), and the email from anywhere. The
+account bucket is the strict one, and a successful login refills it, so a
+user who mistypes a password a few times is not locked out. The looser
+email bucket bounds guessing spread across many addresses, which means such
+guessing can also use it up for the owner. To keep that from locking the
+owner out, a successful login marks its address as known for the email
+(LOGIN_RATELIMIT_KNOWN_SECONDS, 30 days by default), and a known address is
+only held to its IP and account buckets. The owner can still be refused
+from an address they have not logged in from before while the email bucket
+is empty. Buckets refill continuously at `rate` tokens per second up to
+`capacity`, so short bursts are allowed but sustained guessing is not.
+The login view checks the buckets before looking up the user or hashing the
+password, so refused attempts cost no PBKDF2 work.
+
+Buckets live in the LOGIN_RATELIMIT_CACHE_ALIAS cache (a per-process locmem
+cache by default) and updates are serialized with a process lock, so the
+limits apply per worker process.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+BUCKET_KEY = "ratelimit:{scope}:{identity}"
+KNOWN_KEY = "ratelimit:known:{identity}"
+KNOWN_SECONDS = 30 * 24 * 3600
+DEFAULT_LIMITS = {
+    # scope: (capacity, tokens refilled per second)
+    "ip": (20, 20 / 60),
+    "account": (5, 5 / 300),
+    "email": (50, 50 / 3600),
+}
+
+_lock = threading.Lock()
+
+
+def get_limits():
+    """
+    DEFAULT_LIMITS with any scopes overridden by settings.LOGIN_RATE_LIMITS.
+    """
+    return {**DEFAULT_LIMITS, **getattr(settings, "LOGIN_RATE_LIMITS", {})}
+
+
+def client_ip(request):
+    if getattr(settings, "LOGIN_RATELIMIT_TRUST_FORWARDED", False):
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _cache():
+    return caches[getattr(settings, "LOGIN_RATELIMIT_CACHE_ALIAS", "default")]
+
+
+def _tokens(cache, key, capacity, rate, now):
+    tokens, updated = cache.get(key, (capacity, now))
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def wait(scope, identity, capacity, rate, now=None):
+    """
+    0 if the bucket has a token, else seconds until it will.
+    """
+    key = BUCKET_KEY.format(scope=scope, identity=identity)
+    now = time.time() if now is None else now
+    tokens = _tokens(_cache(), key, capacity, rate, now)
+    return 0 if tokens >= 1 else (1 - tokens) / rate
+
+
+def take(scope, identity, capacity, rate, now=None):
+    """
+    Take one token, if there is one left.
+    """
+    cache = _cache()
+    key = BUCKET_KEY.format(scope=scope, identity=identity)
+    now = time.time() if now is None else now
+    with _lock:
+        tokens = _tokens(cache, key, capacity, rate, now)
+        cache.set(key, (max(tokens - 1, 0), now), timeout=int(capacity / rate) + 1)
+
+
+def reset(scope, identity):
+    _cache().delete(BUCKET_KEY.format(scope=scope, identity=identity))
+
+
+def _buckets(request, email):
+    ip = client_ip(request)
+    email = email.strip().lower()
+    limits = get_limits()
+    identities = (("ip", ip), ("account", f"{email}|{ip}" if email else ""), ("email", email))
+    return [(scope, identity, *limits[scope]) for scope, identity in identities if scope in limits and identity]
+
+
+def _known(buckets):
+    """
+    Whether the account identity (email|ip) has logged in successfully lately.
+    """
+    account = [identity for scope, identity, *_ in buckets if scope == "account"]
+    return bool(account) and _cache().get(KNOWN_KEY.format(identity=account[0])) is not None
+
+
+def check_login(request, email):
+    """
+    Returns 0 when a login attempt may proceed, else the Retry-After delay
+    in seconds. Does not charge the attempt; see login_failed().
+    """
+    if not getattr(settings, "LOGIN_RATELIMIT_ENABLED", True):
+        return 0
+    buckets = _buckets(request, email)
+    if _known(buckets):
+        buckets = [bucket for bucket in buckets if bucket[0] != "email"]
+    return max((wait(*bucket) for bucket in buckets), default=0)
+
+
+def login_failed(request, email):
+    """
+    Charge a failed attempt to every bucket.
+    """
+    if getattr(settings, "LOGIN_RATELIMIT_ENABLED", True):
+        for bucket in _buckets(request, email):
+            take(*bucket)
+
+
+def login_succeeded(request, email):
+    """
+    Refill the account bucket and mark the address as known for the email;
+    the IP and email buckets keep their charges.
+    """
+    if getattr(settings, "LOGIN_RATELIMIT_ENABLED", True):
+        for scope, identity, *_ in _buckets(request, email):
+            if scope == "account":
+                reset(scope, identity)
+                _cache().set(KNOWN_KEY.format(identity=identity), 1,
+                             timeout=getattr(settings, "LOGIN_RATELIMIT_KNOWN_SECONDS", KNOWN_SECONDS))
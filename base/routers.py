@@ -0,0 +1,80 @@
+"""
+Read-replica routing for the read-heavy analytics views.
+
+Views wrapped in decorators.read_from_replica run with the replica alias set
+in a context variable, and ReplicaRouter sends their reads of this app's
+models there. Everything else, and every write, goes to the primary.
+
+Replication lag would make a student's just-submitted quiz missing from
+their history, so submit_quiz calls pin_primary(): for REPLICA_PIN_SECONDS
+the session reads from the primary again (read-your-writes). The analytics
+cache does the same for entries it builds in that window (see caching.py).
+
+Migrations only run on the primary; the replica gets its schema through
+replication.
+"""
+import contextvars
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_SESSION_KEY = "db_primary_until"
+
+_read_alias = contextvars.ContextVar("quiz_read_alias", default=None)
+
+
+def replica_alias():
+    alias = getattr(settings, "REPLICA_DB_ALIAS", "replica")
+    return alias if alias in settings.DATABASES else None
+
+
+def pin_primary(request):
+    request.session[PIN_SESSION_KEY] = time.time() + getattr(settings, "REPLICA_PIN_SECONDS", 10)
+
+
+async def apin_primary(request):
+    await request.session.aset(PIN_SESSION_KEY, time.time() + getattr(settings, "REPLICA_PIN_SECONDS", 10))
+
+
+def read_alias_for(request):
+    """
+    The alias this request may read from: the replica unless there is none
+    or the session is pinned to the primary.
+    """
+    alias = replica_alias()
+    if alias and request.session.get(PIN_SESSION_KEY, 0) > time.time():
+        return None
+    return alias
+
+
+async def aread_alias_for(request):
+    alias = replica_alias()
+    if alias and await request.session.aget(PIN_SESSION_KEY, 0) > time.time():
+        return None
+    return alias
+
+
+def set_read_alias(alias):
+    return _read_alias.set(alias)
+
+
+def reset_read_alias(token):
+    _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "base":
+            return _read_alias.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Explicit, so objects read from the replica are still saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
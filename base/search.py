@@ -0,0 +1,195 @@
+"""
+Ranked full-text search over question and option text.
+
+On MySQL this uses the FULLTEXT index created in migration 0016 with
+MATCH ... AGAINST in natural language mode. Other databases (SQLite locally)
+use an inverted index in McqSearchTerm. Each posting stores a term's weighted
+frequency in one question; question text counts double. Results are ranked
+by plain tf-idf: the sum over query terms of weight * idf, with no length
+normalisation or term-frequency saturation (questions are short and of
+similar length). Ingestion paths call index_mcqs() on newly saved questions
+so the index stays current incrementally.
+"""
+import math
+import re
+from collections import Counter
+
+from django.db import connections, transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Mcq, McqSearchTerm
+
+TOKEN_RE = re.compile(r"[a-z0-9_+#]+")
+STOP_WORDS = frozenset(
+    "an and are as at be by for from how in is it of on or that the this to was what when "
+    "where which who why will with".split()
+)
+QUESTION_WEIGHT = 2
+OPTION_WEIGHT = 1
+MAX_TERM_LENGTH = 64
+MAX_WEIGHT = 32767
+SEARCH_LIMIT = 50
+
+
+def tokenize(text):
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall((text or "").lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def uses_fulltext():
+    return connections[Mcq.objects.db].vendor == "mysql"
+
+
+def term_weights(mcq):
+    weights = Counter()
+    for token in tokenize(mcq.question):
+        weights[token] += QUESTION_WEIGHT
+    for option in (mcq.option1, mcq.option2, mcq.option3, mcq.option4):
+        for token in tokenize(option):
+            weights[token] += OPTION_WEIGHT
+    return weights
+
+
+def index_mcqs(mcqs, replace=False, batch_size=5000):
+    """
+    Add postings for saved questions. replace=True first drops their old
+    postings (for edited questions). A no-op when MySQL FULLTEXT is in use.
+    """
+    if uses_fulltext():
+        return 0
+    mcqs = [mcq for mcq in mcqs if mcq.pk is not None]
+    if replace:
+        McqSearchTerm.objects.filter(mcq_id__in=[mcq.pk for mcq in mcqs]).delete()
+
+    postings = [
+        McqSearchTerm(term=term, mcq_id=mcq.pk, weight=min(weight, MAX_WEIGHT))
+        for mcq in mcqs
+        for term, weight in term_weights(mcq).items()
+    ]
+    McqSearchTerm.objects.bulk_create(postings, batch_size=batch_size)
+    return len(postings)
+
+
+def rebuild_search_index(chunk_size=5000):
+    """
+    Recreate every posting. Runs in one transaction, so searches keep
+    seeing the old index until the new one is complete.
+    """
+    if uses_fulltext():
+        return 0
+    indexed = 0
+    batch = []
+    fields = ("id", "question", "option1", "option2", "option3", "option4")
+    with transaction.atomic():
+        McqSearchTerm.objects.all().delete()
+        for mcq in Mcq.objects.only(*fields).iterator(chunk_size=chunk_size):
+            batch.append(mcq)
+            if len(batch) >= chunk_size:
+                index_mcqs(batch)
+                indexed += len(batch)
+                batch = []
+        index_mcqs(batch)
+    return indexed + len(batch)
+
+
+def _ranked_ids_fulltext(query, limit):
+    match = RawSQL(
+        "MATCH (question, option1, option2, option3, option4) AGAINST (%s IN NATURAL LANGUAGE MODE)",
+        (query,),
+    )
+    return list(
+        Mcq.objects.annotate(relevance=match)
+        .filter(relevance__gt=0)
+        .order_by("-relevance")
+        .values_list("id", "relevance")[:limit]
+    )
+
+
+def _ranked_ids_inverted(tokens, limit):
+    from .catalog import get_catalog
+
+    total = max(get_catalog()["total"], 1)
+    doc_freq = dict(
+        McqSearchTerm.objects.filter(term__in=tokens)
+        .values_list("term")
+        .annotate(df=Count("id"))
+        .order_by()
+    )
+    if not doc_freq:
+        return []
+
+    idf = {
+        term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+        for term, df in doc_freq.items()
+    }
+    score = Sum(
+        Case(
+            *[When(term=term, then=F("weight") * Value(weight)) for term, weight in idf.items()],
+            output_field=FloatField(),
+        )
+    )
+    return list(
+        McqSearchTerm.objects.filter(term__in=idf.keys())
+        .values("mcq_id")
+        .annotate(score=score)
+        .order_by("-score", "mcq_id")
+        .values_list("mcq_id", "score")[:limit]
+    )
+
+
+def search_ids(query, limit=SEARCH_LIMIT):
+    """
+    Return [(mcq_id, score), ...] best match first.
+    """
+    tokens = sorted(set(tokenize(query)))
+    if not tokens:
+        return []
+    if uses_fulltext():
+        return _ranked_ids_fulltext(query, limit)
+    return _ranked_ids_inverted(tokens, limit)
+
+
+def catalog_matches(term):
+    """
+    Topics and subtopics whose name contains `term` (case-insensitive),
+    read from the cached catalog instead of scanning Mcq.
+    """
+    from .catalog import get_catalog
+
+    term = term.lower()
+    topics, subtopics = set(), set()
+    for topic in get_catalog()["topics"]:
+        if term in topic["name"].lower():
+            topics.add(topic["name"])
+        subtopics.update(
+            subtopic["name"] for subtopic in topic["subtopics"] if term in subtopic["name"].lower()
+        )
+    return topics, subtopics
+
+
+def search_mcqs(query, limit=SEARCH_LIMIT):
+    """
+    Ranked questions as dicts with their score, for the admin search endpoint.
+    """
+    ranked = search_ids(query, limit)
+    rows = Mcq.objects.in_bulk([mcq_id for mcq_id, _ in ranked])
+    results = []
+    for mcq_id, score in ranked:
+        mcq = rows.get(mcq_id)
+        if mcq is None:
+            continue
+        results.append({
+            "id": mcq.id,
+            "score": round(float(score), 4),
+            "topic": mcq.topic,
+            "subtopic": mcq.subtopic,
+            "difficulty": mcq.difficulty,
+            "question": mcq.question,
+            "options": [mcq.option1, mcq.option2, mcq.option3, mcq.option4],
+            "correct_answer": mcq.correct_answer,
+        })
+    return results
@@ -0,0 +1,79 @@
+"""
+Keep derived tables and indexes in step with changes the views do not go
+through (admin, shell, cascades).
+"""
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .dedup import TEXT_FIELDS, ingest_mode, remove_mcqs, update_mcqs
+from .leaderboard import forget_user
+from .models import Mcq, Registration
+
+_local = threading.local()
+
+
+@receiver(pre_delete, sender=Registration)
+def registration_deleted(sender, instance, **kwargs):
+    # The entries themselves go with the cascade; the score bands do not
+    forget_user(instance.pk)
+
+
+class IndexChanges:
+    """
+    Questions edited or deleted in one transaction. They reach the dedup
+    index in one write when it commits, so deleting a queryset of N
+    questions rewrites the delta once rather than N times.
+    """
+
+    def __init__(self):
+        self.updated = set()
+        self.deleted = set()
+
+    def flush(self):
+        if getattr(_local, "changes", None) is self:
+            _local.changes = None
+        updated = self.updated - self.deleted
+        if updated:
+            update_mcqs(Mcq.objects.filter(pk__in=updated).only(*TEXT_FIELDS))
+        if self.deleted:
+            remove_mcqs(sorted(self.deleted))
+
+
+def index_changes():
+    """
+    The batch for the current transaction. A batch whose transaction rolled
+    back is no longer queued on the connection and is dropped with it.
+    """
+    connection = transaction.get_connection()
+    changes = getattr(_local, "changes", None)
+    if changes is not None and any(func == changes.flush for _, func, _ in connection.run_on_commit):
+        return changes
+    changes = _local.changes = IndexChanges()
+    transaction.on_commit(changes.flush)
+    return changes
+
+
+@receiver(post_save, sender=Mcq)
+def mcq_saved(sender, instance, created, **kwargs):
+    # New questions are picked up in bulk by sync_index() after ingestion.
+    # With screening off the index is not kept; rebuild_dedup_index before
+    # turning it back on.
+    if created or ingest_mode() == "off":
+        return
+    if transaction.get_connection().in_atomic_block:
+        index_changes().updated.add(instance.pk)
+    else:
+        update_mcqs([instance])
+
+
+@receiver(post_delete, sender=Mcq)
+def mcq_deleted(sender, instance, **kwargs):
+    if ingest_mode() == "off":
+        return
+    if transaction.get_connection().in_atomic_block:
+        index_changes().deleted.add(instance.pk)
+    else:
+        remove_mcqs([instance.pk])
@@ -0,0 +1,69 @@
+// Create floating particles
+function createParticles() {
+    const particlesContainer = document.querySelector('.particles');
+    const particleCount = 40;
+    particlesContainer.innerHTML = '';
+
+    for (let i = 0; i < particleCount; i++) {
+        const particle = document.createElement('div');
+        particle.className = 'particle';
+        particle.style.left = Math.random() * 100 + '%';
+        particle.style.top = Math.random() * 100 + '%';
+        particle.style.animationDelay = Math.random() * 6 + 's';
+        particle.style.animationDuration = (Math.random() * 3 + 3) + 's';
+        particlesContainer.appendChild(particle);
+    }
+}
+
+// Change theme
+function changeTheme(theme) {
+    const themes = {
+        home: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+        login: 'linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%)',
+        signup: 'linear-gradient(135deg, #48c6ef 0%, #6f86d6 100%)',
+        creative: 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)'
+    };
+
+    if (themes[theme]) {
+        document.body.style.background = themes[theme];
+        createParticles();
+    }
+}
+
+// Form submission with loading state
+document.getElementById('adminForm').addEventListener('submit', function(e) {
+    const btn = document.getElementById('loginBtn');
+    const btnText = btn.querySelector('.btn-text');
+
+    btn.disabled = true;
+    btnText.innerHTML = '<span class="loading"></span>Authenticating...';
+
+    // Re-enable button after 3 seconds if form doesn't submit
+    setTimeout(() => {
+        btn.disabled = false;
+        btnText.textContent = 'Secure Login';
+    }, 3000);
+});
+
+// Initialize particles
+createParticles();
+
+// Add some interactivity to inputs
+document.addEventListener('DOMContentLoaded', function() {
+    const inputs = document.querySelectorAll('input');
+
+    inputs.forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'scale(1.02)';
+        });
+
+        input.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'scale(1)';
+        });
+    });
+});
+
+// Handle window resize
+window.addEventListener('resize', function() {
+    createParticles();
+});
@@ -0,0 +1,240 @@
+// Create floating particles
+function createParticles() {
+  const particlesContainer = document.querySelector('.particles');
+  const particleCount = 50;
+  particlesContainer.innerHTML = '';
+
+  for (let i = 0; i < particleCount; i++) {
+    const particle = document.createElement('div');
+    particle.className = 'particle';
+    particle.style.left = Math.random() * 100 + '%';
+    particle.style.top = Math.random() * 100 + '%';
+    particle.style.animationDelay = Math.random() * 6 + 's';
+    particle.style.animationDuration = (Math.random() * 3 + 3) + 's';
+    particlesContainer.appendChild(particle);
+  }
+}
+
+function changeTheme(theme) {
+  const themes = {
+    home: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+    login: 'linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%)',
+    signup: 'linear-gradient(135deg, #48c6ef 0%, #6f86d6 100%)',
+    creative: 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)'
+  };
+  document.body.style.background = themes[theme];
+  createParticles();
+}
+
+// 1. Line Chart: Performance over time
+const ctx = document.getElementById("performanceChart").getContext("2d");
+new Chart(ctx, {
+  type: "line",
+  data: {
+    labels: chartDates,
+    datasets: [
+      {
+        label: "Average Score",
+        data: chartScores,
+        borderColor: "rgba(255, 255, 255, 0.8)",
+        backgroundColor: "rgba(255, 255, 255, 0.1)",
+        borderWidth: 3,
+        fill: true,
+        tension: 0.4,
+        pointBackgroundColor: "rgba(255, 255, 255, 1)",
+        pointBorderColor: "rgba(255, 255, 255, 0.8)",
+        pointBorderWidth: 2,
+        pointRadius: 6
+      },
+      {
+        label: "Quizzes Taken",
+        data: chartQuizCounts,
+        borderColor: "rgba(76, 175, 80, 0.8)",
+        backgroundColor: "rgba(76, 175, 80, 0.1)",
+        borderWidth: 3,
+        fill: true,
+        tension: 0.4,
+        pointBackgroundColor: "rgba(76, 175, 80, 1)",
+        pointBorderColor: "rgba(76, 175, 80, 0.8)",
+        pointBorderWidth: 2,
+        pointRadius: 6
+      }
+    ]
+  },
+  options: {
+    responsive: true,
+    plugins: {
+      legend: {
+        labels: {
+          color: 'rgba(255, 255, 255, 0.8)',
+          font: { size: 14 }
+        }
+      }
+    },
+    scales: {
+      y: {
+        beginAtZero: true,
+        ticks: {
+          color: 'rgba(255, 255, 255, 0.7)'
+        },
+        grid: {
+          color: 'rgba(255, 255, 255, 0.1)'
+        }
+      },
+      x: {
+        ticks: {
+          color: 'rgba(255, 255, 255, 0.7)'
+        },
+        grid: {
+          color: 'rgba(255, 255, 255, 0.1)'
+        }
+      }
+    }
+  }
+});
+
+// 2. Pie Chart: Topic-wise average score
+
+new Chart(document.getElementById("topicPieChart"), {
+  type: "doughnut",
+  data: {
+    labels: topicLabels,
+    datasets: [{
+      data: topicScores,
+      backgroundColor: [
+        "rgba(255, 99, 132, 0.8)",
+        "rgba(54, 162, 235, 0.8)",
+        "rgba(255, 205, 86, 0.8)",
+        "rgba(75, 192, 192, 0.8)",
+        "rgba(153, 102, 255, 0.8)",
+        "rgba(255, 159, 64, 0.8)"
+      ],
+      borderColor: "rgba(255, 255, 255, 0.3)",
+      borderWidth: 2
+    }]
+  },
+  options: {
+    responsive: true,
+    plugins: {
+      legend: {
+        position: 'bottom',
+        labels: {
+          color: 'rgba(255, 255, 255, 0.8)',
+          font: { size: 12 },
+          padding: 15
+        }
+      }
+    }
+  }
+});
+
+// 3. Bar Chart: Difficulty-wise performance
+
+new Chart(document.getElementById("difficultyBarChart"), {
+  type: "bar",
+  data: {
+    labels: diffLabels,
+    datasets: [{
+      label: "Average Score (%)",
+      data: diffScores,
+      backgroundColor: [
+        "rgba(76, 175, 80, 0.8)",
+        "rgba(255, 193, 7, 0.8)",
+        "rgba(244, 67, 54, 0.8)"
+      ],
+      borderColor: "rgba(255, 255, 255, 0.3)",
+      borderWidth: 2
+    }]
+  },
+  options: { 
+    responsive: true, 
+    plugins: {
+      legend: {
+        labels: {
+          color: 'rgba(255, 255, 255, 0.8)'
+        }
+      }
+    },
+    scales: { 
+      y: { 
+        beginAtZero: true,
+        ticks: {
+          color: 'rgba(255, 255, 255, 0.7)'
+        },
+        grid: {
+          color: 'rgba(255, 255, 255, 0.1)'
+        }
+      },
+      x: {
+        ticks: {
+          color: 'rgba(255, 255, 255, 0.7)'
+        },
+        grid: {
+          color: 'rgba(255, 255, 255, 0.1)'
+        }
+      }
+    } 
+  }
+});
+
+// 4. Bar Chart: Quizzes per day
+new Chart(document.getElementById("quizCountChart"), {
+  type: "bar",
+  data: {
+    labels: chartDates,
+    datasets: [{
+      label: "Quizzes Taken",
+      data: chartQuizCounts,
+      backgroundColor: "rgba(255, 193, 7, 0.8)",
+      borderColor: "rgba(255, 255, 255, 0.3)",
+      borderWidth: 2
+    }]
+  },
+  options: { 
+    responsive: true,
+    plugins: {
+      legend: {
+        labels: {
+          color: 'rgba(255, 255, 255, 0.8)'
+        }
+      }
+    },
+    scales: { 
+      y: { 
+        beginAtZero: true,
+        ticks: {
+          color: 'rgba(255, 255, 255, 0.7)'
+        },
+        grid: {
+          color: 'rgba(255, 255, 255, 0.1)'
+        }
+      },
+      x: {
+        ticks: {
+          color: 'rgba(255, 255, 255, 0.7)'
+        },
+        grid: {
+          color: 'rgba(255, 255, 255, 0.1)'
+        }
+      }
+    } 
+  }
+});
+
+// Logo click handler
+document.querySelector('.logo').addEventListener('click', function() {
+  window.location.href = '/';
+});
+
+// Initialize particles
+createParticles();
+
+// Add hover effects to cards
+document.querySelectorAll('.card').forEach(card => {
+  card.addEventListener('mouseenter', function() {
+    this.querySelector('h2').style.transform = 'scale(1.1)';
+  });
+  card.addEventListener('mouseleave', function() {
+    this.querySelector('h2').style.transform = 'scale(1)';
+  });
+});
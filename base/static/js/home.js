@@ -0,0 +1,30 @@
+// Create floating particles
+function createParticles() {
+    const particlesContainer = document.querySelector('.particles');
+    const particleCount = 50;
+    for (let i = 0; i < particleCount; i++) {
+        const particle = document.createElement('div');
+        particle.className = 'particle';
+        particle.style.left = Math.random() * 100 + '%';
+        particle.style.top = Math.random() * 100 + '%';
+        particle.style.animationDelay = Math.random() * 6 + 's';
+        particle.style.animationDuration = (Math.random() * 3 + 3) + 's';
+        particlesContainer.appendChild(particle);
+    }
+}
+
+// Change theme
+function changeTheme(theme) {
+    const themes = {
+        home: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+        login: 'linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%)',
+        signup: 'linear-gradient(135deg, #48c6ef 0%, #6f86d6 100%)',
+        creative: 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)'
+    };
+    document.body.style.background = themes[theme];
+    document.querySelector('.particles').innerHTML = '';
+    createParticles();
+}
+
+// Initialize particles on load
+document.addEventListener('DOMContentLoaded', createParticles);
@@ -0,0 +1,52 @@
+// Create floating particles
+function createParticles() {
+    const particlesContainer = document.querySelector('.particles');
+    const particleCount = 50;
+    for (let i = 0; i < particleCount; i++) {
+        const particle = document.createElement('div');
+        particle.className = 'particle';
+        particle.style.left = Math.random() * 100 + '%';
+        particle.style.top = Math.random() * 100 + '%';
+        particle.style.animationDelay = Math.random() * 6 + 's';
+        particle.style.animationDuration = (Math.random() * 3 + 3) + 's';
+        particlesContainer.appendChild(particle);
+    }
+}
+
+function changeTheme(theme) {
+    const themes = {
+        home: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+        login: 'linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%)',
+        signup: 'linear-gradient(135deg, #48c6ef 0%, #6f86d6 100%)',
+        creative: 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)'
+    };
+    document.body.style.background = themes[theme];
+    document.querySelector('.particles').innerHTML = '';
+    createParticles();
+}
+
+// Celebration effect for high scores
+function createCelebration() {
+    const score = parseFloat(document.querySelector('.score-text').textContent);
+    if (score >= 90) {
+        const container = document.querySelector('.result-box');
+        for (let i = 0; i < 20; i++) {
+            setTimeout(() => {
+                const celebration = document.createElement('div');
+                celebration.className = 'celebration';
+                celebration.style.left = Math.random() * 100 + '%';
+                celebration.style.top = Math.random() * 100 + '%';
+                celebration.style.background = ['#ffd700', '#ff69b4', '#00bfff', '#32cd32'][Math.floor(Math.random() * 4)];
+                container.appendChild(celebration);
+
+                setTimeout(() => {
+                    celebration.remove();
+                }, 2000);
+            }, i * 100);
+        }
+    }
+}
+
+// Initialize
+createParticles();
+setTimeout(createCelebration, 1000);
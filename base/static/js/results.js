@@ -0,0 +1,131 @@
+// Create floating particles
+function createParticles() {
+    const particlesContainer = document.querySelector('.particles');
+    const particleCount = 50;
+    particlesContainer.innerHTML = ''; // Clear existing particles
+
+    for (let i = 0; i < particleCount; i++) {
+        const particle = document.createElement('div');
+        particle.className = 'particle';
+        particle.style.left = Math.random() * 100 + '%';
+        particle.style.top = Math.random() * 100 + '%';
+        particle.style.animationDelay = Math.random() * 6 + 's';
+        particle.style.animationDuration = (Math.random() * 3 + 3) + 's';
+        particlesContainer.appendChild(particle);
+    }
+}
+
+function changeTheme(theme) {
+    const themes = {
+        home: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+        login: 'linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%)',
+        signup: 'linear-gradient(135deg, #48c6ef 0%, #6f86d6 100%)',
+        creative: 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)'
+    };
+    document.body.style.background = themes[theme];
+    createParticles();
+}
+
+// Add click animation to table rows
+function addRowClickEffect() {
+    const rows = document.querySelectorAll('table tbody tr');
+    rows.forEach(row => {
+        row.addEventListener('click', function() {
+            this.style.transform = 'scale(1.02)';
+            setTimeout(() => {
+                this.style.transform = '';
+            }, 200);
+        });
+    });
+}
+
+// Initialize animations and effects
+function initializeEffects() {
+    createParticles();
+    addRowClickEffect();
+
+    // Add staggered animation to table rows
+    const rows = document.querySelectorAll('table tbody tr');
+    rows.forEach((row, index) => {
+        row.style.animationDelay = (index * 0.1) + 's';
+    });
+}
+
+// Infinite scroll: fetch the next keyset page as JSON and append rows
+function scoreGradient(score) {
+    if (score >= 90) return '#2ecc71, #27ae60';
+    if (score >= 70) return '#f39c12, #e67e22';
+    return '#e74c3c, #c0392b';
+}
+
+function appendResultRow(tbody, r) {
+    const row = document.createElement('tr');
+    const date = new Date(r.date_attempted).toLocaleString(undefined, {
+        day: '2-digit', month: 'short', year: 'numeric', hour: '2-digit', minute: '2-digit'
+    });
+    const cells = [
+        ['Date', date], ['Topic', r.topic], ['Subtopic', r.subtopic],
+        ['Difficulty', r.difficulty], ['Total', r.total_questions],
+        ['Correct', r.correct_questions], ['Wrong', r.wrong_questions]
+    ];
+    cells.forEach(([label, value]) => {
+        const td = document.createElement('td');
+        td.dataset.label = label;
+        td.textContent = value;
+        row.appendChild(td);
+    });
+    const scoreCell = document.createElement('td');
+    scoreCell.dataset.label = 'Score';
+    const badge = document.createElement('span');
+    badge.className = 'score-badge';
+    badge.style.background = 'linear-gradient(135deg, ' + scoreGradient(r.score) + ')';
+    badge.textContent = r.score.toFixed(2) + '%';
+    scoreCell.appendChild(badge);
+    row.appendChild(scoreCell);
+    tbody.appendChild(row);
+}
+
+function initializeInfiniteScroll() {
+    const loadMore = document.getElementById('load-more');
+    if (!loadMore || !('IntersectionObserver' in window)) return;
+    const tbody = document.querySelector('table tbody');
+    let loading = false;
+
+    async function loadNextPage() {
+        if (loading || !loadMore.dataset.cursor) return;
+        loading = true;
+        try {
+            const response = await fetch(loadMore.dataset.api + '?cursor=' + encodeURIComponent(loadMore.dataset.cursor));
+            if (!response.ok) return;
+            const data = await response.json();
+            data.results.forEach(r => appendResultRow(tbody, r));
+            if (data.next_cursor) {
+                loadMore.dataset.cursor = data.next_cursor;
+                loadMore.href = '?cursor=' + data.next_cursor;
+            } else {
+                observer.disconnect();
+                loadMore.remove();
+            }
+        } finally {
+            loading = false;
+        }
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) loadNextPage();
+    });
+    observer.observe(loadMore);
+    loadMore.addEventListener('click', event => {
+        event.preventDefault();
+        loadNextPage();
+    });
+}
+
+// Initialize when page loads
+document.addEventListener('DOMContentLoaded', initializeEffects);
+document.addEventListener('DOMContentLoaded', initializeInfiniteScroll);
+
+// Logo click to home
+document.querySelector('.logo').addEventListener('click', function() {
+    window.location.href = '/';
+});
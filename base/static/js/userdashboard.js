@@ -0,0 +1,69 @@
+// Create floating particles
+function createParticles() {
+    const particlesContainer = document.querySelector('.particles');
+    const particleCount = 50;
+    particlesContainer.innerHTML = '';
+    for (let i = 0; i < particleCount; i++) {
+        const particle = document.createElement('div');
+        particle.className = 'particle';
+        particle.style.left = Math.random() * 100 + '%';
+        particle.style.top = Math.random() * 100 + '%';
+        particle.style.animationDelay = Math.random() * 6 + 's';
+        particle.style.animationDuration = (Math.random() * 3 + 3) + 's';
+        particlesContainer.appendChild(particle);
+    }
+}
+
+function changeTheme(theme) {
+    const themes = {
+        home: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+        login: 'linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%)',
+        signup: 'linear-gradient(135deg, #48c6ef 0%, #6f86d6 100%)',
+        creative: 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)'
+    };
+    document.body.style.background = themes[theme];
+    createParticles();
+}
+
+// Dependent dropdowns: only offer subtopics/difficulties that have questions
+function fillSelect(select, items, label) {
+    const current = select.value;
+    select.innerHTML = '';
+    items.forEach(item => {
+        const option = document.createElement('option');
+        option.value = item.name;
+        option.textContent = label(item) + ' (' + item.count + ')';
+        select.appendChild(option);
+    });
+    if (items.some(item => item.name === current)) select.value = current;
+}
+
+function initializeCatalogDropdowns() {
+    const catalogData = document.getElementById('quiz-catalog');
+    if (!catalogData) return;
+    const catalog = JSON.parse(catalogData.textContent);
+    const topicSelect = document.getElementById('quiz-topic');
+    const subtopicSelect = document.getElementById('quiz-subtopic');
+    const difficultySelect = document.getElementById('quiz-difficulty');
+    const title = item => item.name.charAt(0).toUpperCase() + item.name.slice(1);
+
+    function onSubtopicChange() {
+        const topic = catalog.topics.find(t => t.name === topicSelect.value);
+        const subtopic = topic && topic.subtopics.find(s => s.name === subtopicSelect.value);
+        fillSelect(difficultySelect, subtopic ? subtopic.difficulties : [], title);
+    }
+
+    function onTopicChange() {
+        const topic = catalog.topics.find(t => t.name === topicSelect.value);
+        fillSelect(subtopicSelect, topic ? topic.subtopics : [], item => item.name);
+        onSubtopicChange();
+    }
+
+    topicSelect.addEventListener('change', onTopicChange);
+    subtopicSelect.addEventListener('change', onSubtopicChange);
+    onTopicChange();
+}
+
+// Initialize particles
+createParticles();
+initializeCatalogDropdowns();
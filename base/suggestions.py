@@ -0,0 +1,196 @@
+"""
+Declarative suggestion rules evaluated against precomputed per-user stats.
+
+Each user's per-difficulty quiz count and average score live on
+UserSuggestions together with the suggestions they produce. submit_quiz
+folds the new score in (record_result), so userdashboard and
+suggestions_view only read one row. The compute_suggestions management
+command rebuilds every row in chunked, set-based passes.
+"""
+from django.db import transaction
+from django.db.models import Avg, Count
+
+from .models import QuizResult, UserSuggestions
+
+DEFAULT_HEADLINE = "💪 Keep practicing! Complete more quizzes  to unlock new suggestions."
+
+# A rule matches when its difficulty has stats satisfying every bound given.
+# difficulty=None makes the bounds apply to the user's total quiz count.
+# Rules with a "headline" also feed the single dashboard suggestion; the first
+# matching one wins.
+SUGGESTION_RULES = [
+    {
+        "difficulty": "easy",
+        "min_quizzes": 5,
+        "min_avg": 80,
+        "headline": "🎯 Great job! Try moving up to <b>Medium level</b> quizzes.",
+        "title": "Ready for Medium Level!",
+        "emoji": "🎯",
+        "desc": "You’ve completed {quizzes_taken} easy quizzes with "
+                "{avg_score:.1f}% accuracy. Time to level up!",
+        "action_text": "🚀 Try Medium Quiz",
+        "action_url": "/start-quiz/?difficulty=medium",
+        "badge": "⬆️ Level Up",
+    },
+    {
+        "difficulty": "medium",
+        "min_quizzes": 5,
+        "min_avg": 75,
+        "headline": "🚀 Awesome! You’re ready for <b>Hard level</b> quizzes.",
+        "title": "Hard Level Unlocked!",
+        "emoji": "🔥",
+        "desc": "You’ve mastered medium quizzes with {avg_score:.1f}% accuracy. "
+                "Now go for the ultimate challenge!",
+        "action_text": "🏆 Try Hard Quiz",
+        "action_url": "/start-quiz/?difficulty=hard",
+        "badge": "💪 Pro Mode",
+    },
+    {
+        "difficulty": "hard",
+        "min_quizzes": 3,
+        "min_avg": 80,
+        "headline": "🔥 Excellent work! Move on to the <b>next topic</b>.",
+        "title": "Topic Mastery Achieved!",
+        "emoji": "🏆",
+        "desc": "Amazing! You’ve conquered hard quizzes in this topic. Time to explore a new one!",
+        "action_text": "🌟 Explore New Topic",
+        "action_url": "/userdashboard/",
+        "badge": "🎓 Master",
+    },
+    {
+        "difficulty": "easy",
+        "max_avg": 50,
+        "title": "Focus on Basics",
+        "emoji": "📘",
+        "desc": "Your average score in Easy quizzes is only {avg_score:.1f}%. "
+                "Revise fundamentals before moving ahead.",
+        "action_text": "📖 Review Easy Quizzes",
+        "action_url": "/start-quiz/?difficulty=easy",
+        "badge": "🛠 Improve Basics",
+    },
+    {
+        "difficulty": None,
+        "max_quizzes": 3,
+        "title": "Start Your Journey!",
+        "emoji": "🚀",
+        "desc": "You haven’t attempted enough quizzes yet. Take more to unlock personalized suggestions!",
+        "action_text": "🎯 Take First Quiz",
+        "action_url": "/userdashboard/",
+        "badge": "🚀 Get Started",
+    },
+]
+
+CARD_FIELDS = ("title", "emoji", "desc", "action_text", "action_url", "badge")
+
+
+def _rule_matches(rule, difficulty_stats):
+    if rule["difficulty"] is None:
+        stat = {
+            "quizzes_taken": sum(s["quizzes_taken"] for s in difficulty_stats.values()),
+            "avg_score": None,
+        }
+    elif rule["difficulty"] in difficulty_stats:
+        stat = difficulty_stats[rule["difficulty"]]
+    else:
+        return None
+
+    # min_* bounds are inclusive, max_* bounds exclusive
+    if "min_quizzes" in rule and stat["quizzes_taken"] < rule["min_quizzes"]:
+        return None
+    if "max_quizzes" in rule and stat["quizzes_taken"] >= rule["max_quizzes"]:
+        return None
+    if "min_avg" in rule and stat["avg_score"] < rule["min_avg"]:
+        return None
+    if "max_avg" in rule and stat["avg_score"] >= rule["max_avg"]:
+        return None
+    return stat
+
+
+def evaluate_rules(difficulty_stats):
+    """
+    Return (headline, suggestion cards) for {difficulty: {quizzes_taken, avg_score}}.
+    """
+    headline = None
+    cards = []
+    for rule in SUGGESTION_RULES:
+        stat = _rule_matches(rule, difficulty_stats)
+        if stat is None:
+            continue
+        card = {field: rule[field] for field in CARD_FIELDS}
+        card["desc"] = card["desc"].format(**stat)
+        cards.append(card)
+        if headline is None and "headline" in rule:
+            headline = rule["headline"]
+    return headline or DEFAULT_HEADLINE, cards
+
+
+def _stats_rows(user_ids):
+    return (
+        QuizResult.objects.filter(user_id__in=user_ids)
+        .values("user_id", "difficulty")
+        .annotate(quizzes_taken=Count("id"), avg_score=Avg("score"))
+        .order_by()
+    )
+
+
+def _build(user_id, difficulty_stats):
+    headline, cards = evaluate_rules(difficulty_stats)
+    return UserSuggestions(
+        user_id=user_id,
+        difficulty_stats=difficulty_stats,
+        headline=headline,
+        suggestions=cards,
+    )
+
+
+def compute_for_users(user_ids):
+    """
+    Recompute and store suggestions for a batch of users with one grouped query
+    and one upsert.
+    """
+    stats = {user_id: {} for user_id in user_ids}
+    for row in _stats_rows(user_ids):
+        stats[row["user_id"]][row["difficulty"]] = {
+            "quizzes_taken": row["quizzes_taken"],
+            "avg_score": float(row["avg_score"] or 0),
+        }
+
+    rows = [_build(user_id, difficulty_stats) for user_id, difficulty_stats in stats.items()]
+    UserSuggestions.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["difficulty_stats", "headline", "suggestions", "updated_at"],
+    )
+    return rows
+
+
+def get_user_suggestions(user_id):
+    """
+    Stored suggestions for a user, computed on first access.
+    """
+    try:
+        return UserSuggestions.objects.get(user_id=user_id)
+    except UserSuggestions.DoesNotExist:
+        return compute_for_users([user_id])[0]
+
+
+def record_result(user_id, difficulty, score):
+    """
+    Fold one new quiz score into the user's stored stats and re-run the rules.
+    """
+    with transaction.atomic():
+        row = UserSuggestions.objects.select_for_update().filter(user_id=user_id).first()
+        if row is None:
+            # The new QuizResult is already saved, so a full recompute includes it
+            compute_for_users([user_id])
+            return
+
+        stat = row.difficulty_stats.get(difficulty, {"quizzes_taken": 0, "avg_score": 0.0})
+        taken = stat["quizzes_taken"] + 1
+        row.difficulty_stats[difficulty] = {
+            "quizzes_taken": taken,
+            "avg_score": stat["avg_score"] + (score - stat["avg_score"]) / taken,
+        }
+        row.headline, row.suggestions = evaluate_rules(row.difficulty_stats)
+        row.save()
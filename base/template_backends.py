@@ -0,0 +1,32 @@
+"""
+Django template backend that records render time per template name in the
+quiz_template_render_seconds histogram (see metrics.py). settings only
+selects it when METRICS_ENABLED is on.
+"""
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .metrics import TEMPLATE_RENDER
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            name = self.template.origin.template_name or "<string>"
+            TEMPLATE_RENDER.observe((name,), time.perf_counter() - started)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,1683 @@
+"""
+Behaviour tests for the performance features: each checks what a feature
+returns, not just that its route answers. The query and latency budgets
+for every route are in tests.py.
+
+Run against SQLite:
+    QUIZ_DB_PROFILE=sqlite python manage.py test base
+"""
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock, skipUnless
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.messages import get_messages
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.templatetags.static import static
+from django.test import AsyncClient, Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import dedup, ratelimit, views
+from .caching import cache_stats, get_or_build
+from .catalog import dropdown_options, get_catalog, refresh_catalog
+from .checks import check_metrics_token
+from .cohort import compute_cohort_analytics, refresh_cohort_analytics
+from .dbstats import connection_stats, record_connect, reset_connection_stats
+from .dedup import Screener, get_index, mcq_signature, rebuild_index, store_clusters, sync_index
+from .exports import RESULT_FIELDS, export_queryset, export_stream
+from .imports import ImportInterrupted, import_mcqs, open_text
+from .itemstats import compute_item_stats
+from .leaderboard import RANK_ORDER, rebuild_leaderboards, record_score, top_entries, user_rank
+from .management.commands.loadtest import Command as LoadTestCommand, PASSWORD as LOADTEST_PASSWORD, StepStats
+from .management.commands.page_weight import ASSET_RE, PAGES, Command as PageWeightCommand
+from .metrics import render_metrics
+from .middleware import QuizUserMiddleware, forget_quiz_user
+from .models import (
+    LeaderboardEntry, LeaderboardScoreBin, LeaderboardScoreGroup, Mcq, McqStats, QuestionResponse, QuizResult,
+    Registration, SlowRequest,
+)
+from .profiling import ProfilingMiddleware, make_profile_token, toggle_until
+from .routers import PIN_SESSION_KEY, ReplicaRouter, read_alias_for, reset_read_alias, set_read_alias
+from .search import catalog_matches, rebuild_search_index, search_ids
+from .suggestions import DEFAULT_HEADLINE, compute_for_users, evaluate_rules, get_user_suggestions, record_result
+
+PASSWORD = "feature-Password-1"
+PDF_FIXTURE = Path(__file__).resolve().parent / "testdata" / "mcqs.pdf"
+
+
+def make_student(n):
+    return Registration.objects.create(
+        first_name=f"Student{n}", last_name="Test", email=f"student{n}@example.com",
+        password=make_password(PASSWORD), contact="0000000000", gender="other",
+    )
+
+
+def make_mcq(question, topic="Python", subtopic="Basics", difficulty="easy", options=None, answer="1"):
+    options = options or [f"{question} a", f"{question} b", f"{question} c", f"{question} d"]
+    return Mcq.objects.create(
+        topic=topic, subtopic=subtopic, difficulty=difficulty, question_no=1, question=question,
+        option1=options[0], option2=options[1], option3=options[2], option4=options[3],
+        correct_answer=answer,
+    )
+
+
+def make_bank(count, topic="Python", subtopic="Basics", difficulty="easy"):
+    Mcq.objects.bulk_create([
+        Mcq(topic=topic, subtopic=subtopic, difficulty=difficulty, question_no=i + 1,
+            question=f"Bank question number {i} on {topic} {subtopic}",
+            option1=f"first {i}", option2=f"second {i}", option3=f"third {i}", option4=f"fourth {i}",
+            correct_answer="1")
+        for i in range(count)
+    ])
+
+
+def make_results(student, count, start=None, per_stamp=1):
+    """
+    `count` results for `student`, `per_stamp` of them sharing each timestamp.
+    """
+    start = start or timezone.now() - timedelta(days=30)
+    QuizResult.objects.bulk_create([
+        QuizResult(user=student, topic="Python", subtopic="Basics", difficulty="easy",
+                   date_attempted=start + timedelta(hours=i // per_stamp),
+                   total_questions=10, correct_questions=i % 11, wrong_questions=10 - i % 11,
+                   score=10.0 * (i % 11))
+        for i in range(count)
+    ])
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    STORAGES={
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+    # Never touch the developer's file cache
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "feature-tests"},
+        "ratelimit": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "feature-ratelimit"},
+    },
+    LOGIN_RATELIMIT_ENABLED=False,
+    DEDUP_ON_INGEST="flag",
+)
+class FeatureTestCase(TestCase):
+    """
+    Fresh caches, dedup index and cohort report for every test.
+    """
+
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        paths = override_settings(
+            DEDUP_INDEX_PATH=os.path.join(tmp.name, "dedup_index"),
+            COHORT_REPORT_PATH=os.path.join(tmp.name, "cohort_report.json"),
+        )
+        paths.enable()
+        self.addCleanup(paths.disable)
+
+    def client_for(self, student=None, admin=False):
+        client = Client()
+        session = client.session
+        if student:
+            session["user_id"] = student.id
+            session["user_email"] = student.email
+        if admin:
+            session["is_admin"] = True
+        session.save()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        return client
+
+    def take_quiz(self, client, bucket=("Python", "Basics", "easy"), num_questions=5, answer="1"):
+        topic, subtopic, difficulty = bucket
+        response = client.post("/start-quiz/", {
+            "topic": topic, "subtopic": subtopic, "difficulty": difficulty, "num_questions": num_questions,
+        })
+        self.assertEqual(response.status_code, 200)
+        answers = {f"question_{mcq_id}": answer for mcq_id in client.session["quiz_questions"]}
+        response = client.post("/submit-quiz/", answers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def messages_of(self, response):
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+
+class AnalyticsCacheTests(FeatureTestCase):
+    """
+    Per-user analytics cache and its submit-driven invalidation (026).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+        make_bank(10)
+        make_results(cls.student, 30)
+
+    def test_repeat_views_hit_until_a_submit(self):
+        client = self.client_for(self.student)
+        client.get("/history/")
+        client.get("/history/")
+        self.assertEqual(cache_stats(("history",))["history"], {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+        self.take_quiz(client)
+        response = client.get("/history/")
+        self.assertEqual(cache_stats(("history",))["history"]["misses"], 2)
+        self.assertEqual(response.context["quiz_summary"][0]["quizzes_taken"], 31)
+
+    def test_only_the_first_results_page_is_cached(self):
+        client = self.client_for(self.student)
+        next_cursor = client.get("/results/").context["next_cursor"]
+        for cursor in ("garbage", "Zm9vfGJhcg==", "x" * 500):
+            response = client.get("/results/", {"cursor": cursor})
+            self.assertTrue(response.context["is_first_page"])
+            client.get("/api/results/", {"cursor": cursor})
+        self.assertEqual(cache_stats(("results",))["results"], {"hits": 6, "misses": 1, "hit_rate": 0.8571})
+
+        # Later pages are read directly and leave the cache alone
+        client.get("/results/", {"cursor": next_cursor})
+        client.get("/api/results/", {"cursor": next_cursor})
+        stats = cache_stats(("results",))["results"]
+        self.assertEqual((stats["hits"], stats["misses"]), (6, 1))
+
+
+class ResultsEtagTests(FeatureTestCase):
+    """
+    Conditional GETs on the per-user result pages (027).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+        cls.other = make_student(2)
+        make_bank(10)
+        make_results(cls.student, 30)
+
+    def test_unchanged_results_answer_304(self):
+        client = self.client_for(self.student)
+        for path in ("/results/", "/history/", "/api/results/"):
+            with self.subTest(path=path):
+                response = client.get(path)
+                self.assertEqual(response.status_code, 200)
+                etag = response["ETag"]
+                response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+
+    def test_etag_changes_after_a_quiz_and_per_user(self):
+        client = self.client_for(self.student)
+        etag = client.get("/results/")["ETag"]
+
+        other = self.client_for(self.other)
+        self.assertEqual(other.get("/results/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.take_quiz(client)
+        response = client.get("/results/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_changes_with_release(self):
+        client = self.client_for(self.student)
+        etag = client.get("/api/results/")["ETag"]
+        with override_settings(RESULTS_ETAG_VERSION="next-release"):
+            response = client.get("/api/results/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class ResultsCursorTests(FeatureTestCase):
+    """
+    Keyset pagination of results, newest first (028).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+        # Three results share each timestamp, so pages must break ties by id
+        make_results(cls.student, 60, per_stamp=3)
+
+    def newest_first(self):
+        return list(
+            QuizResult.objects.filter(user=self.student).order_by("-date_attempted", "-id").values_list("id", flat=True)
+        )
+
+    def test_cursor_walks_every_result_once_newest_first(self):
+        client = self.client_for(self.student)
+        seen, sizes, cursor = [], [], ""
+        while True:
+            data = client.get("/api/results/", {"cursor": cursor} if cursor else {}).json()
+            sizes.append(len(data["results"]))
+            seen += [row["id"] for row in data["results"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, self.newest_first())
+        self.assertEqual(sizes, [25, 25, 10])
+
+    def test_html_pages_link_older_and_newest(self):
+        client = self.client_for(self.student)
+        first = client.get("/results/")
+        self.assertTrue(first.context["is_first_page"])
+        self.assertNotContains(first, "Newest Results")
+        self.assertContains(first, "Older Results")
+
+        second = client.get("/results/", {"cursor": first.context["next_cursor"]})
+        self.assertFalse(second.context["is_first_page"])
+        self.assertContains(second, "Newest Results")
+        self.assertEqual([r.id for r in second.context["results"]], self.newest_first()[25:50])
+
+    def test_malformed_cursor_starts_from_newest(self):
+        client = self.client_for(self.student)
+        newest = client.get("/api/results/").json()["results"]
+        self.assertEqual(client.get("/api/results/", {"cursor": "not-a-cursor"}).json()["results"], newest)
+
+
+class CatalogTests(FeatureTestCase):
+    """
+    Cached topic/subtopic/difficulty catalog with counts (029).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        make_bank(3, "Python", "Basics", "easy")
+        make_bank(2, "Python", "Basics", "hard")
+        make_bank(4, "Python", "Loops", "medium")
+        make_bank(1, "SQL", "Joins", "easy")
+
+    def test_tree_counts_each_bucket(self):
+        catalog = get_catalog()
+        self.assertEqual(catalog["total"], 10)
+        python, sql = catalog["topics"]
+        self.assertEqual((python["name"], python["count"], sql["name"], sql["count"]), ("Python", 9, "SQL", 1))
+        basics, loops = python["subtopics"]
+        self.assertEqual(basics["difficulties"], [{"name": "easy", "count": 3}, {"name": "hard", "count": 2}])
+        self.assertEqual((loops["name"], loops["count"]), ("Loops", 4))
+        self.assertEqual(dropdown_options(catalog), {
+            "topics": ["Python", "SQL"], "subtopics": ["Basics", "Joins", "Loops"],
+            "difficulties": ["easy", "hard", "medium"],
+        })
+
+    def test_served_from_cache_until_ingest_refreshes_it(self):
+        client = Client()
+        self.assertEqual(client.get("/api/catalog/").json()["total"], 10)
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get("/api/catalog/").json()["total"], 10)
+
+        csv_data = "question_no,question,option1,option2,option3,option4,correct_answer\n1,What is a JOIN?,a,b,c,d,A\n"
+        self.client_for(admin=True).post("/import-mcq/", {
+            "topic_name": "SQL", "sub_topic_name": "Joins", "difficulty_level": "easy",
+            "document": SimpleUploadedFile("bank.csv", csv_data.encode()),
+        })
+        self.assertEqual(client.get("/api/catalog/").json()["total"], 11)
+
+
+class QuestionBankBrowserTests(FeatureTestCase):
+    """
+    Aggregated, keyset-paginated question-bank browser (030).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        make_bank(70, "Python", "Basics", "easy")
+        make_bank(5, "Python", "Basics", "hard")
+        make_bank(8, "SQL", "Joins", "easy")
+        make_mcq("Long " + "word " * 60, topic="SQL", subtopic="Joins", difficulty="medium")
+
+    def test_stats_follow_the_filters(self):
+        client = self.client_for(admin=True)
+        response = client.get("/database/")
+        self.assertEqual(response.context["total_mcqs"], 84)
+        self.assertEqual(response.context["difficulty_stats"], {"easy": 78, "hard": 5, "medium": 1})
+
+        response = client.get("/database/", {"topic": "Python", "difficulty": "easy"})
+        self.assertEqual(response.context["total_mcqs"], 70)
+        self.assertEqual({row["topic"] for row in response.context["mcqs"]}, {"Python"})
+        self.assertContains(response, "?topic=Python&amp;difficulty=easy&after=")
+
+    def test_pages_walk_the_bank_newest_first(self):
+        client = self.client_for(admin=True)
+        seen, after = [], ""
+        while True:
+            response = client.get("/database/", {"after": after} if after else {})
+            seen += [row["id"] for row in response.context["mcqs"]]
+            after = response.context["next_after"]
+            if not after:
+                break
+        self.assertEqual(seen, list(Mcq.objects.order_by("-id").values_list("id", flat=True)))
+        self.assertEqual(len(seen), 84)
+
+    def test_only_a_preview_of_the_question_is_loaded(self):
+        row = self.client_for(admin=True).get("/database/", {"difficulty": "medium"}).context["mcqs"][0]
+        self.assertEqual(len(row["question_preview"]), 120)
+        self.assertNotIn("option1", row)
+
+
+def legacy_suggestions(difficulty_stats):
+    """
+    The if/elif chains the rule engine replaced (user-031), kept verbatim in
+    behaviour so the rules can be checked against them.
+    """
+    easy, medium, hard = (difficulty_stats.get(d) for d in ("easy", "medium", "hard"))
+    if easy and easy["quizzes_taken"] >= 5 and easy["avg_score"] >= 80:
+        headline = "🎯 Great job! Try moving up to <b>Medium level</b> quizzes."
+    elif medium and medium["quizzes_taken"] >= 5 and medium["avg_score"] >= 75:
+        headline = "🚀 Awesome! You’re ready for <b>Hard level</b> quizzes."
+    elif hard and hard["quizzes_taken"] >= 3 and hard["avg_score"] >= 80:
+        headline = "🔥 Excellent work! Move on to the <b>next topic</b>."
+    else:
+        headline = DEFAULT_HEADLINE
+
+    titles = []
+    if easy and easy["quizzes_taken"] >= 5 and easy["avg_score"] >= 80:
+        titles.append("Ready for Medium Level!")
+    if medium and medium["quizzes_taken"] >= 5 and medium["avg_score"] >= 75:
+        titles.append("Hard Level Unlocked!")
+    if hard and hard["quizzes_taken"] >= 3 and hard["avg_score"] >= 80:
+        titles.append("Topic Mastery Achieved!")
+    if easy and easy["avg_score"] < 50:
+        titles.append("Focus on Basics")
+    if sum(stat["quizzes_taken"] for stat in difficulty_stats.values()) < 3:
+        titles.append("Start Your Journey!")
+    return headline, titles
+
+
+class SuggestionRulesTests(FeatureTestCase):
+    """
+    The declarative rules (031) give what the old hand-written logic gave.
+    """
+
+    def test_rules_match_legacy_logic_on_boundaries(self):
+        counts = (0, 1, 2, 3, 4, 5, 8)
+        scores = (0.0, 49.99, 50.0, 74.99, 75.0, 79.99, 80.0, 100.0)
+        rng = random.Random(31)
+        cases = [{}]
+        for difficulty in ("easy", "medium", "hard"):
+            cases += [{difficulty: {"quizzes_taken": n, "avg_score": s}} for n in counts if n for s in scores]
+        for _ in range(500):
+            cases.append({
+                d: {"quizzes_taken": rng.choice(counts[1:]), "avg_score": rng.choice(scores)}
+                for d in ("easy", "medium", "hard") if rng.random() < 0.7
+            })
+        for stats in cases:
+            with self.subTest(stats=stats):
+                headline, cards = evaluate_rules(stats)
+                self.assertEqual((headline, [card["title"] for card in cards]), legacy_suggestions(stats))
+
+    def test_card_text_is_filled_from_stats(self):
+        _, cards = evaluate_rules({"easy": {"quizzes_taken": 6, "avg_score": 83.25}})
+        self.assertEqual(cards[0]["desc"], "You’ve completed 6 easy quizzes with 83.2% accuracy. Time to level up!")
+
+    def test_incremental_update_matches_full_recompute(self):
+        student = make_student(1)
+        rng = random.Random(7)
+        for _ in range(12):
+            difficulty = rng.choice(["easy", "medium", "hard"])
+            score = rng.choice([40.0, 60.0, 80.0, 100.0])
+            QuizResult.objects.create(user=student, topic="Python", subtopic="Basics", difficulty=difficulty,
+                                      total_questions=5, correct_questions=0, wrong_questions=5, score=score)
+            record_result(student.id, difficulty, score)
+        incremental = get_user_suggestions(student.id)
+        recomputed = compute_for_users([student.id])[0]
+        self.assertEqual(incremental.headline, recomputed.headline)
+        self.assertEqual(incremental.suggestions, recomputed.suggestions)
+        for difficulty, stat in recomputed.difficulty_stats.items():
+            self.assertEqual(incremental.difficulty_stats[difficulty]["quizzes_taken"], stat["quizzes_taken"])
+            self.assertAlmostEqual(incremental.difficulty_stats[difficulty]["avg_score"], stat["avg_score"])
+
+
+class LeaderboardRankTests(FeatureTestCase):
+    """
+    Ranks from the score-band and tie-group counts (032) agree with the full
+    ordering; students tied on average and attempts share a rank.
+    """
+
+    BUCKET = ("Python", "easy")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [make_student(n) for n in range(6)]
+
+    def submit(self, student, score, bucket=BUCKET):
+        QuizResult.objects.create(user=student, topic=bucket[0], subtopic="Basics", difficulty=bucket[1],
+                                  total_questions=10, correct_questions=0, wrong_questions=10, score=score)
+        record_score(student.id, *bucket, score)
+
+    def ordering(self, bucket):
+        return list(
+            LeaderboardEntry.objects.filter(topic=bucket[0], difficulty=bucket[1])
+            .order_by(*RANK_ORDER).values_list("user_id", "avg_score", "attempts")
+        )
+
+    def assert_consistent(self, bucket):
+        rows = self.ordering(bucket)
+        for user_id, avg_score, attempts in rows:
+            ahead = sum(1 for _, a, n in rows if (a, n) > (avg_score, attempts))
+            self.assertEqual(user_rank(user_id, *bucket)[0], ahead + 1, f"user {user_id} in {bucket}")
+        entries = LeaderboardEntry.objects.filter(topic=bucket[0], difficulty=bucket[1])
+        for row in LeaderboardScoreBin.objects.filter(topic=bucket[0], difficulty=bucket[1]):
+            self.assertEqual(entries.filter(score_bin=row.score_bin).count(), row.entries)
+        groups = LeaderboardScoreGroup.objects.filter(topic=bucket[0], difficulty=bucket[1])
+        self.assertEqual(
+            {(g.avg_score, g.attempts): g.entries for g in groups},
+            {(a, n): sum(1 for _, a2, n2 in rows if (a2, n2) == (a, n)) for _, a, n in rows},
+        )
+
+    def seed(self):
+        s = self.students
+        self.submit(s[0], 90.0)
+        self.submit(s[1], 80.0)
+        self.submit(s[1], 100.0)    # 90 over two attempts: ahead of s0
+        self.submit(s[2], 90.0)     # ties s0 on score and attempts: shares its rank
+        self.submit(s[3], 90.05)    # same 0.1-point band as 90.0, but higher
+        self.submit(s[4], 50.0)
+        self.submit(s[5], 89.99)    # the band just below
+
+    def test_ties_share_a_rank_and_list_by_user_id(self):
+        self.seed()
+        s = self.students
+        rows = top_entries(*self.BUCKET)
+        self.assertEqual([row["user_id"] for row in rows], [s[3].id, s[1].id, s[0].id, s[2].id, s[5].id, s[4].id])
+        self.assertEqual([row["rank"] for row in rows], [1, 2, 3, 3, 5, 6])
+        self.assertEqual([user_rank(row["user_id"], *self.BUCKET)[0] for row in rows], [1, 2, 3, 3, 5, 6])
+        self.assert_consistent(self.BUCKET)
+        self.assert_consistent(("", ""))
+
+    def test_ranks_follow_band_moves(self):
+        self.seed()
+        s = self.students
+        for _ in range(9):
+            self.submit(s[4], 100.0)   # 50 -> 95 average
+        self.assertEqual(user_rank(s[4].id, *self.BUCKET)[0], 1)
+        self.submit(s[3], 0.0)         # 90.05 -> 45.025 average
+        self.assertEqual(user_rank(s[3].id, *self.BUCKET)[0], 6)
+        self.assert_consistent(self.BUCKET)
+        self.assert_consistent(("", ""))
+
+    def test_emptied_tie_groups_are_deleted(self):
+        self.seed()
+        for _ in range(5):
+            self.submit(self.students[0], 70.0)
+        self.assertEqual(
+            LeaderboardScoreGroup.objects.filter(topic="Python", difficulty="easy").count(),
+            len({(a, n) for _, a, n in self.ordering(self.BUCKET)}),
+        )
+
+    def test_rebuild_matches_incremental(self):
+        self.seed()
+        self.submit(self.students[2], 70.0, bucket=("Java", "hard"))
+        before = {bucket: self.ordering(bucket) for bucket in (self.BUCKET, ("Java", "hard"), ("", ""))}
+        rebuild_leaderboards()
+        for bucket, ordering in before.items():
+            self.assertEqual(self.ordering(bucket), ordering)
+            self.assert_consistent(bucket)
+
+    def test_deleted_student_leaves_the_bands(self):
+        self.seed()
+        self.students[3].delete()
+        self.assertEqual(user_rank(self.students[1].id, *self.BUCKET)[0], 1)
+        self.assert_consistent(self.BUCKET)
+        self.assert_consistent(("", ""))
+
+    def test_leaderboard_json_reports_my_rank(self):
+        self.seed()
+        data = self.client_for(self.students[2]).get(
+            "/api/leaderboard/", {"topic": "Python", "difficulty": "easy"}
+        ).json()
+        self.assertEqual(data["my_rank"], 3)
+        self.assertEqual([row["rank"] for row in data["entries"]], [1, 2, 3, 3, 5, 6])
+
+    def test_rank_cost_does_not_depend_on_ties(self):
+        students = [make_student(n) for n in range(100, 400)]
+        QuizResult.objects.bulk_create([
+            QuizResult(user=student, topic="Python", subtopic="Basics", difficulty="easy",
+                       total_questions=10, correct_questions=10, wrong_questions=0,
+                       score=100.0 if n % 10 else 90.0)
+            for n, student in enumerate(students)
+        ])
+        rebuild_leaderboards()
+        last_tied = students[-1]
+        with CaptureQueriesContext(connection) as queries:
+            rank, entry = user_rank(last_tied.id, *self.BUCKET)
+        self.assertEqual(rank, 1)
+        self.assertEqual(user_rank(students[0].id, *self.BUCKET)[0], 271)
+        # One lookup of the user's own entry; every other read sums counter
+        # rows, so nothing scans the 270 tied entries
+        self.assertEqual(len(queries), 3)
+        entry_queries = [q["sql"] for q in queries if "base_leaderboardentry" in q["sql"]]
+        self.assertEqual(len(entry_queries), 1)
+        self.assertIn(f"user_id\" = {last_tied.id}", entry_queries[0].replace("`", '"'))
+        self.assertNotIn("COUNT(", " ".join(q["sql"] for q in queries))
+
+
+class CohortAnalyticsTests(FeatureTestCase):
+    """
+    Histogram percentiles and aggregates (033) against direct computation.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        student = make_student(1)
+        rng = random.Random(33)
+        # Half-point scores fall exactly on histogram bins
+        cls.scores = [rng.randrange(0, 201) / 2 for _ in range(487)] + [0.0, 100.0, 60.0]
+        cls.topics = [rng.choice(["Python", "SQL", "Web"]) for _ in cls.scores]
+        start = datetime(2026, 3, 2, 12, tzinfo=dt_timezone.utc)  # a Monday
+        QuizResult.objects.bulk_create([
+            QuizResult(user=student, topic=topic, subtopic="Basics", difficulty="easy",
+                       date_attempted=start + timedelta(days=i % 21), total_questions=10,
+                       correct_questions=0, wrong_questions=10, score=score)
+            for i, (topic, score) in enumerate(zip(cls.topics, cls.scores))
+        ])
+
+    def test_percentiles_are_nearest_rank(self):
+        report = compute_cohort_analytics(chunk_size=37)
+        ordered = sorted(self.scores)
+        n = len(ordered)
+        for q in (10, 25, 50, 75, 90, 99):
+            rank = -(-q * n // 100)  # ceil(q * n / 100)
+            self.assertEqual(report["percentiles"][f"p{q}"], ordered[rank - 1], f"p{q}")
+
+    def test_aggregates(self):
+        report = compute_cohort_analytics(chunk_size=37)
+        scores = np.array(self.scores)
+        self.assertEqual(report["total_results"], len(self.scores))
+        self.assertEqual(report["mean_score"], round(float(scores.mean()), 2))
+        self.assertEqual(report["std_score"], round(float(scores.std()), 2))
+        deciles = [0] * 10
+        for score in self.scores:
+            deciles[min(int(score // 10), 9)] += 1
+        self.assertEqual([row["count"] for row in report["score_distribution"]], deciles)
+
+        for row in report["topics"]:
+            topic_scores = [s for s, t in zip(self.scores, self.topics) if t == row["topic"]]
+            self.assertEqual(row["attempts"], len(topic_scores))
+            self.assertEqual(row["avg_score"], round(sum(topic_scores) / len(topic_scores), 2))
+            self.assertEqual(row["pass_rate"], round(100 * sum(s >= 60 for s in topic_scores) / len(topic_scores), 2))
+        self.assertEqual([row["week_start"] for row in report["weekly"]], ["2026-03-02", "2026-03-09", "2026-03-16"])
+        self.assertEqual(sum(row["attempts"] for row in report["weekly"]), len(self.scores))
+
+    def test_each_chunk_is_one_bounded_query(self):
+        # 490 rows in chunks of 37: 13 full chunks and a short last one
+        with CaptureQueriesContext(connection) as queries:
+            compute_cohort_analytics(chunk_size=37)
+        self.assertEqual(len(queries), 14)
+        self.assertTrue(all("LIMIT 37" in q["sql"] for q in queries))
+
+    def test_chunking_does_not_change_the_report(self):
+        small, large = compute_cohort_analytics(chunk_size=7), compute_cohort_analytics(chunk_size=10_000)
+        for key in ("total_results", "mean_score", "std_score", "percentiles", "score_distribution", "topics", "weekly"):
+            self.assertEqual(small[key], large[key], key)
+
+    def test_view_serves_the_stored_report(self):
+        client = self.client_for(admin=True)
+        self.assertEqual(client.get("/cohort-analytics/", {"format": "json"}).status_code, 404)
+        self.assertContains(client.get("/cohort-analytics/"), "python manage.py cohort_analytics")
+        # Never recomputed inside a request
+        self.assertEqual(client.post("/cohort-analytics/").status_code, 405)
+        self.assertEqual(client.get("/cohort-analytics/", {"format": "json"}).status_code, 404)
+
+        stored = refresh_cohort_analytics()
+        response = client.get("/cohort-analytics/", {"format": "json"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["percentiles"], stored["percentiles"])
+
+
+class ItemStatsTests(FeatureTestCase):
+    """
+    p-values, point-biserial discrimination and option counts (034).
+    """
+
+    def test_point_biserial_matches_hand_computed_value(self):
+        student = make_student(1)
+        item, easy_item = make_mcq("Which item discriminates?"), make_mcq("Which item everyone gets?")
+        # (item correct, option chosen, quiz correct out of 3) for four quizzes.
+        # Rest-of-quiz scores: correct group 100 and 50, wrong group 50 and 0.
+        # M1 = 75, M0 = 25, population s = sqrt(1250), p = q = 1/2, so
+        # r = (75 - 25) / sqrt(1250) * sqrt(1/4) = 1 / sqrt(2).
+        attempts = [(True, "1", 3), (True, "1", 2), (False, "2", 1), (False, "", 0)]
+        for is_correct, chosen, quiz_correct in attempts:
+            result = QuizResult.objects.create(
+                user=student, topic="Python", subtopic="Basics", difficulty="easy",
+                total_questions=3, correct_questions=quiz_correct, wrong_questions=3 - quiz_correct,
+                score=100 * quiz_correct / 3,
+            )
+            QuestionResponse.objects.create(result=result, mcq=item, selected_option=chosen, is_correct=is_correct)
+            QuestionResponse.objects.create(result=result, mcq=easy_item, selected_option="1", is_correct=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(compute_item_stats(chunk_size=3), 2)
+        # Eight responses in chunks of three: one LIMITed query per chunk
+        reads = [q["sql"] for q in queries if 'FROM "base_questionresponse"' in q["sql"]]
+        self.assertEqual(len(reads), 3)
+        self.assertTrue(all("LIMIT 3" in sql for sql in reads))
+        stats = McqStats.objects.get(mcq=item)
+        self.assertEqual(stats.responses, 4)
+        self.assertEqual(stats.p_value, 0.5)
+        self.assertAlmostEqual(stats.discrimination, 1 / math.sqrt(2), places=4)
+        self.assertEqual(
+            (stats.unanswered_count, stats.option1_count, stats.option2_count, stats.option3_count, stats.option4_count),
+            (1, 2, 1, 0, 0),
+        )
+        # Everyone answered correctly: the correlation is undefined
+        easy_stats = McqStats.objects.get(mcq=easy_item)
+        self.assertEqual(easy_stats.p_value, 1.0)
+        self.assertIsNone(easy_stats.discrimination)
+
+
+class ExportTests(FeatureTestCase):
+    """
+    Filtered, optionally gzipped CSV/JSONL exports (035).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student, other = make_student(1), make_student(2)
+        rows = []
+        for day in range(1, 31):
+            for user in (cls.student, other):
+                for topic in ("Python", "SQL"):
+                    rows.append(QuizResult(
+                        user=user, topic=topic, subtopic="Basics", difficulty="easy",
+                        date_attempted=datetime(2026, 1, day, 12, tzinfo=dt_timezone.utc),
+                        total_questions=4, correct_questions=day % 5, wrong_questions=4 - day % 5,
+                        score=25.0 * (day % 5),
+                    ))
+        QuizResult.objects.bulk_create(rows)
+
+    def expected_ids(self):
+        return [str(pk) for pk in QuizResult.objects.filter(
+            user=self.student, topic="Python",
+            date_attempted__gte=datetime(2026, 1, 10, tzinfo=dt_timezone.utc),
+            date_attempted__lt=datetime(2026, 1, 21, tzinfo=dt_timezone.utc),
+        ).order_by("id").values_list("id", flat=True)]
+
+    def export(self, **params):
+        client = self.client_for(admin=True)
+        query = {"topic": "Python", "date_from": "2026-01-10", "date_to": "2026-01-20", "user": self.student.email}
+        return client.get("/export/results/", {**query, **params})
+
+    def test_csv_applies_every_filter(self):
+        response = self.export(format="csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="results.csv"')
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(tuple(rows[0]), RESULT_FIELDS)
+        self.assertEqual([row[0] for row in rows[1:]], self.expected_ids())
+        self.assertEqual({row[2] for row in rows[1:]}, {self.student.email})
+
+    def test_user_filter_takes_an_id(self):
+        by_email = b"".join(self.export().streaming_content)
+        by_id = b"".join(self.export(user=str(self.student.id)).streaming_content)
+        self.assertEqual(by_email, by_id)
+
+    def test_gzip_holds_the_same_export(self):
+        plain = b"".join(self.export(format="jsonl").streaming_content)
+        response = self.export(format="jsonl", gzip="1")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="results.jsonl.gz"')
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), plain)
+        rows = [json.loads(line) for line in plain.decode().splitlines()]
+        self.assertEqual([str(row["id"]) for row in rows], self.expected_ids())
+        self.assertEqual(set(rows[0]), set(RESULT_FIELDS))
+
+    def test_bad_requests(self):
+        client = self.client_for(admin=True)
+        for path, params in (
+            ("/export/results/", {"date_from": "2026-13-01"}),
+            ("/export/results/", {"format": "xml"}),
+            ("/export/questions/", {"user": "1"}),
+            ("/export/everything/", {}),
+        ):
+            with self.subTest(path=path, params=params):
+                response = client.get(path, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+        self.assertEqual(self.client_for(self.student).get("/export/results/").status_code, 403)
+
+    def test_each_batch_is_one_bounded_query(self):
+        queryset, fields = export_queryset("results", topic="Python")
+        with CaptureQueriesContext(connection) as queries:
+            data = b"".join(export_stream(queryset, fields, "jsonl", chunk_size=7))
+        # 60 rows in batches of seven: eight full batches and a short last one
+        self.assertEqual(len(data.splitlines()), 60)
+        self.assertEqual(len(queries), 9)
+        self.assertTrue(all("LIMIT 7" in q["sql"] for q in queries))
+
+
+
+class ImportTests(FeatureTestCase):
+    """
+    Row validation, error reporting and partial imports (036).
+    """
+
+    CSV = (
+        "question_no,question,option1,option2,option3,option4,correct_answer,difficulty\n"
+        "1,What is a list comprehension?,a,b,c,d,B,easy\n"
+        "2,Which answer is out of range?,a,b,c,d,E,easy\n"
+        "3,,a,b,c,d,A,easy\n"
+        "4,What does zip() return?,a,b,c,d,3,MEDIUM\n"
+        "5,Which difficulty is unknown?,a,b,c,d,A,expert\n"
+    )
+
+    def test_rows_are_validated_and_errors_reported_by_line(self):
+        report = import_mcqs(io.StringIO(self.CSV), "csv", {"topic": "Python", "subtopic": "Imports"})
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["error_count"], 3)
+        self.assertEqual([line for line, _ in report["errors"]], [3, 4, 6])
+        self.assertTrue(report["errors"][0][1].startswith("correct_answer:"))
+        self.assertTrue(report["errors"][1][1].startswith("question:"))
+        self.assertTrue(report["errors"][2][1].startswith("difficulty:"))
+        saved = dict(Mcq.objects.filter(subtopic="Imports").values_list("question_no", "correct_answer"))
+        self.assertEqual(saved, {1: "2", 4: "3"})
+        self.assertEqual(Mcq.objects.get(question_no=4, subtopic="Imports").difficulty, "medium")
+
+    def test_jsonl_reports_malformed_lines(self):
+        lines = [
+            json.dumps({"question": "What is PEP 8?", "option1": "a", "option2": "b", "option3": "c",
+                        "option4": "d", "correct_answer": "1", "question_no": 1}),
+            "{not json",
+            "[1, 2]",
+            "",
+            json.dumps({"question": "What is GIL?", "option1": "a", "option2": "b", "option3": "c",
+                        "option4": "d", "correct_answer": "D", "question_no": 2}),
+        ]
+        report = import_mcqs(io.StringIO("\n".join(lines)), "jsonl",
+                             {"topic": "Python", "subtopic": "Jsonl", "difficulty": "hard"})
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([line for line, _ in report["errors"]], [2, 3])
+        self.assertTrue(report["errors"][0][1].startswith("Invalid JSON"))
+        self.assertEqual(report["errors"][1][1], "Expected a JSON object.")
+
+    def test_view_reports_counts_and_first_errors(self):
+        client = self.client_for(admin=True)
+        response = client.post("/import-mcq/", {
+            "topic_name": "Python", "sub_topic_name": "Imports", "difficulty_level": "",
+            "document": SimpleUploadedFile("bank.csv", self.CSV.encode()),
+        })
+        self.assertRedirects(response, "/admindashboard/", fetch_redirect_response=False)
+        messages = self.messages_of(response)
+        self.assertIn("Imported 2 MCQs.", messages)
+        self.assertTrue(any(m.startswith("3 rows rejected. line 3: correct_answer:") for m in messages), messages)
+        self.assertEqual(get_catalog()["total"], 2)
+
+    def test_interrupted_import_keeps_and_reports_saved_rows(self):
+        rows = "".join(f"{i},Streamed question number {i}?,a,b,c,d,A,easy\n" for i in range(3000))
+        data = gzip.compress(("question_no,question,option1,option2,option3,option4,correct_answer,difficulty\n"
+                              + rows).encode())
+        truncated = io.BytesIO(data[: len(data) // 2])
+        with self.assertRaises(ImportInterrupted) as caught:
+            import_mcqs(open_text(truncated, gzipped=True), "csv",
+                        {"topic": "Python", "subtopic": "Stream"}, batch_size=100)
+        kept = Mcq.objects.filter(subtopic="Stream").count()
+        self.assertGreater(kept, 0)
+        self.assertEqual(caught.exception.report["created"], kept)
+
+    def test_unsupported_file_type_is_refused(self):
+        client = self.client_for(admin=True)
+        response = client.post("/import-mcq/", {"document": SimpleUploadedFile("bank.xlsx", b"PK")})
+        self.assertRedirects(response, "/admindashboard/", fetch_redirect_response=False)
+        self.assertIn("Only .csv and .jsonl files (optionally .gz) are supported.", self.messages_of(response))
+        self.assertEqual(Mcq.objects.count(), 0)
+
+
+class SearchRankingTests(FeatureTestCase):
+    """
+    tf-idf ranking over the inverted index (037).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        make_bank(20, topic="Databases", subtopic="Joins")
+        cls.twice = make_mcq("Closure closure scope rules", options=["one", "two", "three", "four"])
+        cls.once = make_mcq("Closure basics", options=["one", "two", "three", "four"])
+        cls.decorated = make_mcq("Decorator closure", options=["one", "two", "three", "four"])
+        cls.option_only = make_mcq("Scope basics", options=["closure", "two", "three", "four"])
+        rebuild_search_index()
+
+    def setUp(self):
+        super().setUp()
+        refresh_catalog()
+
+    def test_question_text_and_frequency_rank_higher(self):
+        ranked = [mcq_id for mcq_id, _ in search_ids("closure")]
+        # once and decorated tie on weight and fall back to id order
+        self.assertEqual(ranked, [self.twice.id, self.once.id, self.decorated.id, self.option_only.id])
+
+    def test_rare_terms_outweigh_common_ones(self):
+        ranked = [mcq_id for mcq_id, _ in search_ids("decorator closure")]
+        self.assertEqual(ranked[:2], [self.decorated.id, self.twice.id])
+
+    def test_search_endpoint(self):
+        client = self.client_for(admin=True)
+        data = client.get("/api/search/", {"q": "Closure", "limit": 2}).json()
+        self.assertEqual(data["count"], 2)
+        self.assertEqual([row["id"] for row in data["results"]], [self.twice.id, self.once.id])
+        self.assertGreater(data["results"][0]["score"], data["results"][1]["score"])
+        self.assertEqual(client.get("/api/search/", {"q": "the"}).json()["count"], 0)
+        self.assertEqual(client.get("/api/search/").status_code, 400)
+        self.assertEqual(self.client_for().get("/api/search/", {"q": "closure"}).status_code, 403)
+
+    def test_topic_names_match_by_substring(self):
+        self.assertEqual(catalog_matches("data"), ({"Databases"}, set()))
+        self.assertEqual(catalog_matches("OIN"), (set(), {"Joins"}))
+
+    def test_scores_are_weight_times_idf(self):
+        total = get_catalog()["total"]
+        idf = math.log(1 + (total - 4 + 0.5) / (4 + 0.5))  # "closure" is in four questions
+        scores = dict(search_ids("closure"))
+        self.assertAlmostEqual(scores[self.twice.id], 4 * idf)
+        self.assertAlmostEqual(scores[self.option_only.id], 1 * idf)
+
+
+
+class NearDuplicateTests(FeatureTestCase):
+    """
+    MinHash LSH screening, index upkeep and clusters (038).
+    """
+
+    QUESTION = "Which built-in function returns the number of items in a list, tuple or string in Python"
+    OPTIONS = ["len", "size", "count", "length"]
+
+    def setUp(self):
+        super().setUp()
+        make_bank(30)
+        self.original = make_mcq(self.QUESTION, options=self.OPTIONS)
+        rebuild_index()
+
+    def candidate(self, question, options=None):
+        options = options or self.OPTIONS
+        return Mcq(topic="Python", subtopic="Basics", difficulty="easy", question_no=1, question=question,
+                   option1=options[0], option2=options[1], option3=options[2], option4=options[3],
+                   correct_answer="1")
+
+    def test_near_duplicates_are_found(self):
+        screener = Screener("flag")
+        reworded = self.candidate(self.QUESTION.upper() + "?")
+        self.assertEqual(screener.check(reworded), (self.original.id, 1.0))
+        extended = self.candidate(self.QUESTION + " 3")
+        match = screener.check(extended)
+        self.assertEqual(match[0], self.original.id)
+        self.assertGreaterEqual(match[1], 0.8)
+        self.assertIsNone(screener.check(self.candidate("How do you open a file for appending?",
+                                                        ["open(f, 'a')", "append(f)", "file(f)", "io(f)"])))
+        self.assertEqual(screener.flagged_count, 2)
+
+    def test_rows_of_one_upload_are_compared(self):
+        screener = Screener("flag")
+        question = self.candidate("What does the walrus operator assign inside an expression",
+                                  [":=", "==", "->", "=>"])
+        self.assertIsNone(screener.check(question, "Q1"))
+        self.assertEqual(screener.check(question, "Q2"), ("row Q1", 1.0))
+
+    def test_skip_mode_drops_duplicates(self):
+        screener = Screener("skip")
+        self.assertFalse(screener.keep(self.candidate(self.QUESTION)))
+        self.assertTrue(Screener("off").keep(self.candidate(self.QUESTION)))
+
+    def test_edits_and_deletes_update_the_index(self):
+        old_signature = mcq_signature(self.original)
+        self.original.question = "Which statement leaves a loop before it finishes"
+        self.original.option1, self.original.option2 = "break", "continue"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.original.save()
+        index = get_index()
+        self.assertNotIn(self.original.id, [mcq_id for mcq_id, _ in index.find(old_signature)])
+        self.assertIn(self.original.id, [mcq_id for mcq_id, _ in index.find(mcq_signature(self.original))])
+
+        new_signature = mcq_signature(self.original)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.original.delete()
+        self.assertEqual(get_index().find(new_signature), [])
+
+    def test_queryset_delete_writes_the_delta_once(self):
+        doomed = list(Mcq.objects.filter(question__startswith="Bank question")[:20])
+        signatures = [mcq_signature(mcq) for mcq in doomed]
+        with mock.patch.object(dedup, "_write_delta", wraps=dedup._write_delta) as write_delta:
+            with self.captureOnCommitCallbacks(execute=True):
+                Mcq.objects.filter(pk__in=[mcq.pk for mcq in doomed]).delete()
+        self.assertEqual(write_delta.call_count, 1)
+        index = get_index()
+        for mcq, signature in zip(doomed, signatures):
+            self.assertNotIn(mcq.pk, [mcq_id for mcq_id, _ in index.find(signature)])
+
+    def test_edits_in_one_transaction_are_written_once(self):
+        with mock.patch.object(dedup, "_write_delta", wraps=dedup._write_delta) as write_delta:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for mcq in Mcq.objects.filter(question__startswith="Bank question")[:5]:
+                        mcq.option4 = "none of these"
+                        mcq.save()
+        self.assertEqual(write_delta.call_count, 1)
+
+    def test_rolled_back_changes_are_dropped(self):
+        edited = Mcq.objects.filter(question__startswith="Bank question").first()
+        with mock.patch.object(dedup, "_write_delta", wraps=dedup._write_delta) as write_delta:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        edited.delete()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                self.original.option4 = "none of these"
+                self.original.save()
+        self.assertEqual(write_delta.call_count, 1)
+        self.assertEqual(write_delta.call_args.args[2], {self.original.pk})
+
+    def test_large_deltas_are_compacted(self):
+        version = get_index().version
+        with mock.patch.object(dedup, "DELTA_LIMIT", 3):
+            with self.captureOnCommitCallbacks(execute=True):
+                Mcq.objects.filter(question__in=[f"Bank question number {i} on Python Basics" for i in range(5)]).delete()
+        index = get_index()
+        self.assertNotEqual(index.version, version)
+        self.assertEqual((len(index.delta), len(index.removed)), (0, 0))
+        self.assertEqual(len(index.ids), Mcq.objects.count())
+
+    @override_settings(DEDUP_ON_INGEST="off")
+    def test_screening_off_leaves_the_index_alone(self):
+        with mock.patch.object(dedup, "_write_delta") as write_delta:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.original.option4 = "none of these"
+                self.original.save()
+                self.original.delete()
+        self.assertEqual(callbacks, [])
+        write_delta.assert_not_called()
+
+    def test_sync_adds_new_questions(self):
+        added = make_mcq("How are default argument values evaluated in Python functions",
+                         options=["once", "per call", "lazily", "never"])
+        self.assertEqual(sync_index(), 1)
+        self.assertEqual(get_index().find(mcq_signature(added))[0], (added.id, 1.0))
+        self.assertEqual(sync_index(), 0)
+
+    def test_clusters_are_precomputed_for_the_report(self):
+        copies = [make_mcq(self.QUESTION + suffix, options=self.OPTIONS) for suffix in ("", "?", " 3")]
+        client = self.client_for(admin=True)
+        self.assertContains(client.get("/duplicates/"), "rebuild_dedup_index")
+
+        rebuild_index()
+        report = store_clusters()
+        self.assertEqual(report["clusters"], [[self.original.id] + [copy.id for copy in copies]])
+        response = client.get("/duplicates/")
+        self.assertEqual(response.context["cluster_count"], 1)
+        self.assertEqual([mcq.id for mcq in response.context["clusters"][0]],
+                         [self.original.id] + [copy.id for copy in copies])
+
+
+class PdfUploadTests(FeatureTestCase):
+    """
+    upload_mcq with a real PDF: parsed, saved, indexed and screened.
+    """
+
+    def upload(self, client, name="mcqs.pdf", content=None):
+        return client.post("/upload-mcq/", {
+            "topic_name": "Python", "sub_topic_name": "Pdf", "difficulty_level": "easy",
+            "document": SimpleUploadedFile(name, content or PDF_FIXTURE.read_bytes(), "application/pdf"),
+        })
+
+    def test_pdf_questions_are_saved(self):
+        client = self.client_for(admin=True)
+        response = self.upload(client)
+        self.assertRedirects(response, "/database/", fetch_redirect_response=False)
+        saved = list(Mcq.objects.filter(subtopic="Pdf").order_by("question_no").values_list(
+            "question_no", "question", "option2", "correct_answer"))
+        self.assertEqual(saved, [
+            (1, "Which keyword defines a function in Python?", "def", "2"),
+            (2, "What does len([1, 2, 3]) return?", "3", "2"),
+            (3, "Which of these types is immutable?", "dict", "4"),
+        ])
+        self.assertEqual(get_catalog()["total"], 3)
+        immutable = Mcq.objects.get(subtopic="Pdf", question_no=3)
+        self.assertEqual(search_ids("immutable")[0][0], immutable.id)
+
+    def test_repeat_upload_is_skipped_as_duplicates(self):
+        client = self.client_for(admin=True)
+        self.upload(client)
+        with override_settings(DEDUP_ON_INGEST="skip"):
+            response = self.upload(client)
+        self.assertRedirects(response, "/database/", fetch_redirect_response=False)
+        self.assertEqual(Mcq.objects.filter(subtopic="Pdf").count(), 3)
+
+    def test_non_pdf_is_rejected(self):
+        response = self.upload(self.client_for(admin=True), name="mcqs.txt", content=b"Q1. text")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Mcq.objects.count(), 0)
+
+
+class AdminUserListTests(FeatureTestCase):
+    """
+    Keyset-paginated admin user list with per-user activity (039).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [make_student(n) for n in range(30)]
+        make_results(cls.students[-1], 4)
+        make_results(cls.students[-2], 1)
+
+    def test_pages_carry_activity_from_one_query(self):
+        client = self.client_for(admin=True)
+        response = client.get("/admindashboard/")
+        users = response.context["users"]
+        self.assertEqual(response.context["total_users"], 30)
+        self.assertEqual([u.id for u in users], [s.id for s in reversed(self.students)][:25])
+        newest = users[0]
+        scores = QuizResult.objects.filter(user=self.students[-1]).values_list("score", flat=True)
+        self.assertEqual(newest.attempts, 4)
+        self.assertAlmostEqual(newest.avg_score, sum(scores) / 4)
+        latest = QuizResult.objects.filter(user=self.students[-1]).latest("date_attempted")
+        self.assertEqual(newest.last_attempt, latest.date_attempted)
+        self.assertEqual((users[2].attempts, users[2].avg_score), (0, None))
+
+        second = client.get("/admindashboard/", {"after": response.context["next_after"]})
+        self.assertEqual([u.id for u in second.context["users"]], [s.id for s in reversed(self.students)][25:])
+        self.assertIsNone(second.context["next_after"])
+
+    def test_prefix_search(self):
+        client = self.client_for(admin=True)
+        response = client.get("/admindashboard/", {"q": "student2"})
+        self.assertEqual(response.context["total_users"], 11)  # student2 and student20..29
+        self.assertTrue(all(u.email.startswith("student2") for u in response.context["users"]))
+        self.assertEqual(client.get("/admindashboard/", {"q": "tudent"}).context["total_users"], 0)
+
+
+class QuizUserMiddlewareTests(FeatureTestCase):
+    """
+    Lazy, request-scoped loading of the logged-in student (040).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+
+    def run_middleware(self, view, user_id=None, asynchronous=False):
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        if user_id:
+            request.session["user_id"] = user_id
+        if asynchronous:
+            async def get_response(request):
+                return await view(request)
+            return async_to_sync(QuizUserMiddleware(get_response))(request)
+        return QuizUserMiddleware(view)(request)
+
+    def test_untouched_user_costs_nothing(self):
+        with self.assertNumQueries(0):
+            self.run_middleware(lambda request: "ok", self.student.id)
+
+    def test_user_is_loaded_once_per_request(self):
+        def view(request):
+            return request.quiz_user, request.quiz_user.first_name, request.quiz_user.email
+
+        with self.assertNumQueries(1):
+            user, first_name, email = self.run_middleware(view, self.student.id)
+        self.assertEqual((user.pk, first_name, email), (self.student.id, "Student1", self.student.email))
+
+        with self.assertNumQueries(0):
+            self.assertFalse(self.run_middleware(lambda request: bool(request.quiz_user)))
+        with self.assertNumQueries(1):
+            self.assertFalse(self.run_middleware(lambda request: bool(request.quiz_user), user_id=999999))
+
+    def test_async_views_share_one_load(self):
+        async def view(request):
+            return [await request.aquiz_user(), await request.aquiz_user()]
+
+        with self.assertNumQueries(1):
+            first, second = self.run_middleware(view, self.student.id, asynchronous=True)
+        self.assertIs(first, second)
+        self.assertEqual(first.email, self.student.email)
+
+    @override_settings(QUIZ_USER_CACHE_TIMEOUT=60)
+    def test_cached_profile_defers_the_password(self):
+        self.run_middleware(lambda request: request.quiz_user.email, self.student.id)
+        with self.assertNumQueries(0):
+            user = self.run_middleware(lambda request: request.quiz_user._wrapped if request.quiz_user else None,
+                                       self.student.id)
+            self.assertEqual(user.email, self.student.email)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.password, self.student.password)
+
+        forget_quiz_user(self.student.id)
+        with self.assertNumQueries(1):
+            self.run_middleware(lambda request: request.quiz_user.email, self.student.id)
+
+
+@override_settings(LOGIN_RATELIMIT_ENABLED=True)
+class LoginRateLimitTests(FeatureTestCase):
+    """
+    Failed logins are limited; successful ones are not charged (041).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+
+    def login(self, password, ip="198.51.100.1", email=None):
+        return Client().post("/login/", {"email": email or self.student.email, "password": password},
+                             REMOTE_ADDR=ip)
+
+    def test_failures_lock_out_then_answer_429(self):
+        for _ in range(5):
+            self.assertEqual(self.login("wrong").status_code, 200)
+        response = self.login("wrong")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(int(response["Retry-After"]), 60)
+        # Refused before the password is even checked
+        self.assertEqual(self.login(PASSWORD).status_code, 429)
+
+    def test_success_resets_the_account_bucket(self):
+        for _ in range(4):
+            self.login("wrong")
+        self.assertEqual(self.login(PASSWORD).status_code, 302)
+        for _ in range(5):
+            self.assertEqual(self.login("wrong").status_code, 200)
+        self.assertEqual(self.login("wrong").status_code, 429)
+
+    def test_successful_logins_are_not_charged(self):
+        for _ in range(30):
+            self.assertEqual(self.login(PASSWORD).status_code, 302)
+
+    def test_lockout_is_per_address(self):
+        for _ in range(6):
+            self.login("wrong")
+        self.assertEqual(self.login(PASSWORD, ip="203.0.113.9").status_code, 302)
+
+    @override_settings(LOGIN_RATE_LIMITS={"email": (3, 3 / 3600)})
+    def test_email_bucket_spans_addresses(self):
+        for n in range(3):
+            self.assertEqual(self.login("wrong", ip=f"203.0.113.{n}").status_code, 200)
+        self.assertEqual(self.login(PASSWORD, ip="203.0.113.200").status_code, 429)
+
+    @override_settings(LOGIN_RATE_LIMITS={"ip": (2, 2 / 60)})
+    def test_ip_bucket_spans_emails(self):
+        for n in range(2):
+            self.assertEqual(self.login("wrong", email=f"nobody{n}@example.com").status_code, 200)
+        self.assertEqual(self.login(PASSWORD).status_code, 429)
+
+    def test_buckets_refill_over_time(self):
+        capacity, rate = ratelimit.DEFAULT_LIMITS["account"]
+        for _ in range(capacity):
+            ratelimit.take("account", "refill", capacity, rate, now=1000.0)
+        self.assertAlmostEqual(ratelimit.wait("account", "refill", capacity, rate, now=1000.0), 1 / rate)
+        self.assertAlmostEqual(ratelimit.wait("account", "refill", capacity, rate, now=1030.0), 0.5 / rate)
+        self.assertEqual(ratelimit.wait("account", "refill", capacity, rate, now=1000.0 + 1 / rate), 0)
+
+    @override_settings(LOGIN_RATE_LIMITS={"email": (3, 3 / 3600)})
+    def test_known_address_is_not_locked_out_by_guessing_elsewhere(self):
+        home = "198.51.100.7"
+        self.assertEqual(self.login(PASSWORD, ip=home).status_code, 302)
+        for n in range(3):
+            self.login("wrong", ip=f"203.0.113.{n}")
+        # The email bucket is empty: a new address is refused, the owner's is not
+        self.assertEqual(self.login(PASSWORD, ip="203.0.113.200").status_code, 429)
+        self.assertEqual(self.login(PASSWORD, ip=home).status_code, 302)
+        # The known address still has its own account bucket
+        for _ in range(5):
+            self.assertEqual(self.login("wrong", ip=home).status_code, 200)
+        self.assertEqual(self.login(PASSWORD, ip=home).status_code, 429)
+
+    @override_settings(LOGIN_RATE_LIMITS={"email": (3, 3 / 3600)}, LOGIN_RATELIMIT_KNOWN_SECONDS=0)
+    def test_known_address_expires(self):
+        self.login(PASSWORD, ip="198.51.100.7")
+        for n in range(3):
+            self.login("wrong", ip=f"203.0.113.{n}")
+        self.assertEqual(self.login(PASSWORD, ip="198.51.100.7").status_code, 429)
+
+
+class DatabaseProfileTests(FeatureTestCase):
+    """
+    Timed connection opens, the SQLite profile and the dashboard's daily chart (042).
+    """
+
+    def test_new_connections_are_counted_per_alias(self):
+        reset_connection_stats()
+        for _ in range(2):
+            connection.get_new_connection(connection.get_connection_params()).close()
+        stats = connection_stats()["aliases"]
+        self.assertEqual(list(stats), [connection.alias])
+        self.assertEqual(stats[connection.alias]["opens"], 2)
+        self.assertGreater(stats[connection.alias]["open_seconds"], 0)
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite profile")
+    def test_sqlite_profile_runs_in_wal_mode(self):
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+        with tempfile.TemporaryDirectory() as tmp:
+            params = {**connection.get_connection_params(), "database": os.path.join(tmp, "wal.sqlite3")}
+            conn = connection.get_new_connection(params)
+            try:
+                self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                # 1 is NORMAL
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            finally:
+                conn.close()
+
+    def test_stats_endpoint_is_admin_only_and_resets_on_post(self):
+        record_connect("default", 0.002)
+        self.assertEqual(self.client_for(make_student(1)).get("/db-stats/").status_code, 403)
+
+        admin = self.client_for(admin=True)
+        stats = admin.get("/db-stats/").json()["aliases"]["default"]
+        self.assertGreaterEqual(stats["opens"], 1)
+        self.assertEqual(admin.post("/db-stats/").json()["aliases"], {})
+
+    def test_daily_chart_groups_by_date(self):
+        student = make_student(1)
+        today = timezone.localtime().replace(hour=9, minute=0, second=0, microsecond=0)
+        days = [today - timedelta(days=3), today - timedelta(days=1)]
+        for day in days:
+            make_results(student, 3, start=day)
+
+        response = self.client_for(student).get("/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.context["chart_dates"]), [day.strftime("%Y-%m-%d") for day in days])
+        self.assertEqual(json.loads(response.context["chart_quiz_counts"]), [3, 3])
+
+
+@override_settings(REPLICA_DB_ALIAS="default")
+class ReplicaPinningTests(FeatureTestCase):
+    """
+    Reads go to the replica alias unless a recent write pinned them (043).
+    The default alias stands in for the replica here.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+        make_bank(10)
+
+    def request_with(self, client):
+        request = RequestFactory().get("/results/")
+        request.session = client.session
+        return request
+
+    def test_submit_pins_the_session_to_the_primary(self):
+        client = self.client_for(self.student)
+        self.assertEqual(read_alias_for(self.request_with(client)), "default")
+        self.take_quiz(client)
+        self.assertGreater(client.session[PIN_SESSION_KEY], time.time())
+        self.assertIsNone(read_alias_for(self.request_with(client)))
+        with override_settings(REPLICA_PIN_SECONDS=0):
+            self.take_quiz(client)
+        self.assertEqual(read_alias_for(self.request_with(client)), "default")
+
+    def test_cache_entries_after_a_submit_are_built_from_the_primary(self):
+        def build():
+            return ReplicaRouter().db_for_read(QuizResult)
+
+        token = set_read_alias("default")
+        try:
+            self.assertEqual(get_or_build(self.student.id, "probe", build), "default")
+            # A submit from another session bumps the version
+            self.take_quiz(self.client_for(self.student))
+            self.assertIsNone(get_or_build(self.student.id, "probe", build))
+        finally:
+            reset_read_alias(token)
+
+    def test_only_the_primary_is_migrated(self):
+        self.assertTrue(ReplicaRouter().allow_migrate("default", "base"))
+        self.assertFalse(ReplicaRouter().allow_migrate("replica", "base"))
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN="")
+class MetricsTests(FeatureTestCase):
+    """
+    Prometheus text output of the request metrics (044).
+    """
+
+    def sample(self, text, name, **labels):
+        pattern = re.escape(name) + r"\{" + ",".join(
+            f'{key}="{re.escape(str(value))}"' for key, value in labels.items()
+        ) + r"\} (\S+)"
+        match = re.search(pattern, text)
+        return float(match.group(1)) if match else 0.0
+
+    def test_requests_are_counted_by_view_and_status(self):
+        client = Client()
+        before = render_metrics()
+        for _ in range(3):
+            self.assertEqual(client.get("/").status_code, 200)
+        self.assertEqual(client.get("/history/").status_code, 302)
+        after = self.client_for(admin=True).get("/metrics")
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        text = after.content.decode()
+
+        def grew(name, **labels):
+            return self.sample(text, name, **labels) - self.sample(before, name, **labels)
+
+        self.assertEqual(grew("quiz_requests_total", view="home", method="GET", status="200"), 3)
+        self.assertEqual(grew("quiz_requests_total", view="history", method="GET", status="302"), 1)
+        self.assertEqual(grew("quiz_request_duration_seconds_count", view="home", method="GET"), 3)
+        self.assertEqual(grew("quiz_request_duration_seconds_bucket", view="home", method="GET", le="+Inf"), 3)
+        # The home page runs no SQL
+        self.assertEqual(grew("quiz_db_queries_per_request_bucket", view="home", method="GET", le="0"), 3)
+        self.assertEqual(grew("quiz_response_size_bytes_count", view="home", method="GET"), 3)
+
+    def test_histogram_buckets_are_cumulative(self):
+        record_connect("default", 0.001)
+        Client().get("/")
+        text = render_metrics()
+        buckets = [
+            float(value) for value in re.findall(
+                r'quiz_request_duration_seconds_bucket\{view="home",method="GET",le="[^"]+"\} (\S+)', text
+            )
+        ]
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertEqual(buckets[-1], self.sample(text, "quiz_request_duration_seconds_count", view="home", method="GET"))
+        self.assertIn("# TYPE quiz_requests_total counter", text)
+        self.assertIn("# TYPE quiz_request_duration_seconds histogram", text)
+        self.assertIn('quiz_db_connections_opened_total{alias="default"}', text)
+
+    def test_token_and_switch(self):
+        with override_settings(METRICS_TOKEN="s3cret"):
+            self.assertEqual(Client().get("/metrics").status_code, 403)
+            self.assertEqual(self.client_for(admin=True).get("/metrics").status_code, 403)
+            self.assertEqual(Client().get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
+        with override_settings(METRICS_ENABLED=False):
+            self.assertEqual(self.client_for(admin=True).get("/metrics").status_code, 404)
+
+    def test_without_a_token_only_admins_can_read(self):
+        self.assertEqual(Client().get("/metrics").status_code, 403)
+        self.assertEqual(self.client_for(make_student(1)).get("/metrics").status_code, 403)
+        self.assertEqual(self.client_for(admin=True).get("/metrics").status_code, 200)
+
+    def test_missing_token_is_reported_by_the_system_checks(self):
+        self.assertEqual([warning.id for warning in check_metrics_token(None)], ["base.W002"])
+        with override_settings(METRICS_TOKEN="s3cret"):
+            self.assertEqual(check_metrics_token(None), [])
+        with override_settings(METRICS_ENABLED=False):
+            self.assertEqual(check_metrics_token(None), [])
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0, PROFILING_SLOW_MS=60_000)
+class ProfilingTests(FeatureTestCase):
+    """
+    Requests are profiled only when sampled, signed or toggled on by an admin (045).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+        make_results(cls.student, 3)
+
+    def test_untriggered_requests_are_not_profiled(self):
+        client = self.client_for(self.student)
+        self.assertEqual(client.get("/history/").status_code, 200)
+        self.assertEqual(client.get("/history/", HTTP_X_QUIZ_PROFILE="forged:token").status_code, 200)
+        self.assertFalse(SlowRequest.objects.exists())
+
+    def test_signed_header_is_always_stored(self):
+        response = self.client_for(self.student).get("/history/", HTTP_X_QUIZ_PROFILE=make_profile_token())
+        self.assertEqual(response.status_code, 200)
+        slow = SlowRequest.objects.get()
+        self.assertEqual((slow.trigger, slow.view_name, slow.path, slow.status_code),
+                         ("header", "history", "/history/", 200))
+        self.assertEqual(slow.query_count, len(slow.queries))
+        # Statements are kept without their parameters
+        results_sql = [query["sql"] for query in slow.queries if "base_quizresult" in query["sql"]]
+        self.assertTrue(results_sql)
+        self.assertTrue(all("%s" in sql for sql in results_sql))
+        self.assertIn("ncalls", slow.profile)
+
+    @override_settings(PROFILING_TOKEN_MAX_AGE=-1)
+    def test_expired_tokens_are_ignored(self):
+        self.client_for(self.student).get("/history/", HTTP_X_QUIZ_PROFILE=make_profile_token())
+        self.assertFalse(SlowRequest.objects.exists())
+
+    def test_only_admins_switch_on_the_toggle(self):
+        response = self.client_for(self.student).post("/slow-requests/", {"minutes": "5"})
+        self.assertRedirects(response, "/adminlogin/", fetch_redirect_response=False)
+        self.assertEqual(toggle_until(), 0)
+
+        self.client_for(admin=True).post("/slow-requests/", {"minutes": "5"})
+        self.assertGreater(toggle_until(), time.time() + 4 * 60)
+        client = self.client_for(self.student)
+        # Toggled requests are stored only when slow
+        client.get("/history/")
+        self.assertFalse(SlowRequest.objects.exists())
+        with override_settings(PROFILING_SLOW_MS=0):
+            client.get("/history/")
+        self.assertEqual(SlowRequest.objects.get().trigger, "toggle")
+
+        self.client_for(admin=True).post("/slow-requests/", {"minutes": "0"})
+        self.assertEqual(toggle_until(), 0)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_SLOW_MS=0)
+    def test_sampled_slow_requests_are_stored(self):
+        self.client_for(self.student).get("/history/")
+        self.assertEqual(SlowRequest.objects.get().trigger, "sample")
+
+    def test_switched_off_middleware_removes_itself(self):
+        with override_settings(PROFILING_ENABLED=False), self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+
+class LoadTestCommandTests(FeatureTestCase):
+    """
+    Argument checks, setup and the report of the loadtest command (047).
+    """
+
+    def test_bad_arguments_are_refused(self):
+        for options, message in [
+            ({"students": 0}, "must be positive"),
+            ({"url": "http://example.com:8000"}, "must point at localhost"),
+            ({"url": "http://127.0.0.1:8000", "server": "both"}, "drop --url"),
+            ({"num_questions": 10}, "No topic/subtopic/difficulty has 10 questions"),
+        ]:
+            with self.subTest(options=options), self.assertRaisesMessage(CommandError, message):
+                call_command("loadtest", stdout=io.StringIO(), stderr=io.StringIO(), **options)
+
+    def test_external_server_warns_about_ignored_options(self):
+        stderr = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("loadtest", url="http://127.0.0.1:8000", iterations=1000, ratelimit=True,
+                         stdout=io.StringIO(), stderr=stderr)
+        self.assertIn("--iterations 1000 only applies to the stored password hashes", stderr.getvalue())
+        self.assertIn("--ratelimit has no effect with --url", stderr.getvalue())
+
+    def test_students_share_one_hash_and_buckets_need_enough_questions(self):
+        make_bank(10)
+        make_bank(4, subtopic="Loops")
+        command = LoadTestCommand()
+        self.assertEqual(command.quiz_buckets(5), [("Python", "Basics", "easy")])
+        emails = command.create_users(3)
+        passwords = set(Registration.objects.filter(email__in=emails).values_list("password", flat=True))
+        self.assertEqual(len(passwords), 1)
+        self.assertTrue(check_password(LOADTEST_PASSWORD, passwords.pop()))
+
+    def test_report_counts_errors_and_percentiles_per_step(self):
+        stats = StepStats()
+        for ms in range(1, 101):
+            stats.record("login", ms / 1000, 302, True)
+        stats.record("start_quiz", 0.5, 500, False)
+        stats.record("start_quiz", 0.1, 200, True)
+        stdout = io.StringIO()
+        command = LoadTestCommand(stdout=stdout)
+        summary = command.report(stats, 1, 2.0, {"students": 2, "concurrency": None, "quizzes": 1}, "wsgi")
+
+        steps = {row["step"]: row for row in summary["steps"]}
+        self.assertEqual((steps["login"]["p50_ms"], steps["login"]["p95_ms"], steps["login"]["p99_ms"]),
+                         (51.0, 96.0, 100.0))
+        self.assertEqual(steps["start_quiz"]["error_rate"], 0.5)
+        self.assertEqual(steps["start_quiz"]["outcomes"], {"200": 1, "500": 1})
+        self.assertEqual((summary["requests"], summary["errors"], summary["requests_per_s"]), (102, 1, 51.0))
+        self.assertIn("outcomes: 200=1, 500=1", stdout.getvalue())
+
+
+class SeedScaleTests(FeatureTestCase):
+    """
+    Synthetic data from the seed_scale command (048).
+    """
+
+    def seed(self, *args):
+        call_command("seed_scale", "--mcqs=30", "--users=12", "--results=200", "--days=30",
+                     "--until=2026-03-02", "--batch-size=7", *args, stdout=io.StringIO())
+
+    def test_row_counts_and_consistent_results(self):
+        self.seed("--seed=7")
+        self.assertEqual(Mcq.objects.count(), 30)
+        students = Registration.objects.filter(email__startswith="scale7-")
+        self.assertEqual(students.count(), 12)
+        self.assertEqual(QuizResult.objects.count(), 200)
+        self.assertFalse(QuizResult.objects.exclude(user__in=students).exists())
+
+        results = list(QuizResult.objects.values_list(
+            "total_questions", "correct_questions", "wrong_questions", "score", "date_attempted"))
+        for total, correct, wrong, score, attempted in results:
+            self.assertEqual(correct + wrong, total)
+            self.assertAlmostEqual(score, round(correct * 100 / total, 2))
+            self.assertTrue(datetime(2026, 1, 31, tzinfo=dt_timezone.utc) <= attempted
+                            < datetime(2026, 3, 2, tzinfo=dt_timezone.utc))
+        # Students share one hash
+        passwords = set(students.values_list("password", flat=True))
+        self.assertEqual(len(passwords), 1)
+        self.assertTrue(check_password("scale-Password-123", passwords.pop()))
+
+    def test_same_seed_gives_the_same_data_and_is_not_seeded_twice(self):
+        self.seed("--seed=3")
+        first = list(QuizResult.objects.order_by("id").values_list("topic", "difficulty", "score", "date_attempted"))
+        with self.assertRaisesMessage(CommandError, "Data for seed 3 already exists"):
+            self.seed("--seed=3")
+        QuizResult.objects.all().delete()
+        Registration.objects.all().delete()
+        self.seed("--seed=3", "--batch-size=50")
+        self.assertEqual(
+            list(QuizResult.objects.order_by("id").values_list("topic", "difficulty", "score", "date_attempted")),
+            first,
+        )
+
+    def test_bad_counts_are_refused(self):
+        with self.assertRaisesMessage(CommandError, "must not be negative"):
+            self.seed("--mcqs=-1")
+        with self.assertRaisesMessage(CommandError, "need at least one user"):
+            self.seed("--users=0")
+
+
+class AsyncQuizTests(FeatureTestCase):
+    """
+    The async quiz hot path and its input checks (049).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+        make_bank(8)
+
+    def start(self, client, num_questions):
+        return client.post("/start-quiz/", {
+            "topic": "Python", "subtopic": "Basics", "difficulty": "easy", "num_questions": num_questions,
+        })
+
+    def test_hot_path_views_are_async(self):
+        for view in (views.start_quiz, views.submit_quiz, views.results_json, views.catalog_json,
+                     views.leaderboard_json):
+            with self.subTest(view=view.__name__):
+                self.assertTrue(iscoroutinefunction(view))
+
+    def test_bad_question_counts_go_back_to_the_dashboard(self):
+        for num_questions in ("0", "51", "abc", "-3"):
+            with self.subTest(num_questions=num_questions):
+                client = self.client_for(self.student)
+                response = self.start(client, num_questions)
+                self.assertRedirects(response, "/userdashboard/", fetch_redirect_response=False)
+                self.assertEqual(self.messages_of(response), ["Choose between 1 and 50 questions."])
+                self.assertNotIn("quiz_questions", client.session)
+
+    def test_only_the_sampled_questions_are_loaded(self):
+        client = self.client_for(self.student)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.start(client, 20)
+        self.assertEqual(response.status_code, 200)
+        # Fewer questions than asked for: the quiz gets all there are
+        self.assertEqual(len(client.session["quiz_questions"]), 8)
+        self.assertEqual(client.session["quiz_meta"]["num_questions"], 8)
+        mcq_reads = [query["sql"] for query in queries if 'FROM "base_mcq"' in query["sql"]]
+        self.assertEqual(len(mcq_reads), 2)
+        self.assertNotIn("correct_answer", mcq_reads[1])
+
+    async def test_quiz_round_trip_on_the_async_client(self):
+        client = AsyncClient()
+        client.cookies = (await sync_to_async(self.client_for)(self.student)).cookies
+        response = await client.post("/start-quiz/", {
+            "topic": "Python", "subtopic": "Basics", "difficulty": "easy", "num_questions": "3",
+        })
+        self.assertEqual(response.status_code, 200)
+        session = await client.asession()
+        answers = {f"question_{mcq_id}": "1" for mcq_id in await session.aget("quiz_questions")}
+        response = await client.post("/submit-quiz/", answers)
+        self.assertEqual(response.status_code, 200)
+        result = await QuizResult.objects.aget(user=self.student)
+        self.assertEqual((result.total_questions, result.correct_questions, result.score), (3, 3, 100.0))
+
+
+class StaticAssetTests(FeatureTestCase):
+    """
+    Page CSS/JS as hashed, precompressed static files served by WhiteNoise (050).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_student(1)
+        make_bank(12)
+        make_results(cls.student, 5)
+
+    def test_pages_link_their_assets_instead_of_inlining_them(self):
+        command = PageWeightCommand()
+        inline_scripts = set()
+        for name, (kind, method, path) in PAGES.items():
+            with self.subTest(page=name):
+                client = command.client_for(kind, self.student)
+                data = command.quiz_params() if name == "quiz" else None
+                response = getattr(client, method)(path, data) if data else getattr(client, method)(path)
+                self.assertEqual(response.status_code, 200)
+                html = response.content.decode()
+                self.assertNotIn("<style", html)
+                if re.search(r"<script>", html):
+                    inline_scripts.add(name)
+                local = [url for url in ASSET_RE.findall(html) if url.startswith(settings.STATIC_URL)]
+                self.assertTrue(local)
+                for url in local:
+                    self.assertIsNotNone(command.asset_bytes(url), url)
+        # Only the chart data the dashboard script reads stays in the page
+        self.assertEqual(inline_scripts, {"dashboard"})
+
+    def test_collected_assets_are_hashed_compressed_and_immutable(self):
+        with tempfile.TemporaryDirectory() as static_root, override_settings(
+            STATIC_ROOT=static_root,
+            STORAGES={**settings.STORAGES, "staticfiles": {
+                "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+            }},
+        ):
+            # The Django admin's files only slow the test down
+            call_command("collectstatic", interactive=False, verbosity=0, ignore_patterns=["admin"])
+            url = static("css/home.css")
+            self.assertRegex(url, r"^/static/css/home\.[0-9a-f]{12}\.css$")
+            self.assertTrue(os.path.exists(os.path.join(static_root, url[len("/static/"):] + ".gz")))
+
+            client = Client()
+            self.assertIn(url, client.get("/").content.decode())
+            response = client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertIn("immutable", response["Cache-Control"])
+            response.close()
@@ -1,3 +1,326 @@
-from django.test import TestCase
+"""
+Query-budget regression tests.
 
-# Create your tests here.
+Seeds a realistic volume of data (thousands of questions, hundreds of
+students, tens of thousands of results), requests every route in
+base/urls.py with a cold cache and fails if a view issues more SQL queries
+or takes longer than its budget or answers with an unexpected status. Query
+counts must not grow with the data: the main views are measured again after
+the data is multiplied, so an N+1 fails the suite. A JSON report of every measurement
+is written to QUERY_BUDGET_REPORT (default query_budget_report.json in the
+project root). Feature behaviour is tested in test_features.py.
+
+Run against SQLite:
+    QUIZ_DB_PROFILE=sqlite python manage.py test base
+"""
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver
+from django.utils import timezone
+
+from .catalog import refresh_catalog
+from .cohort import refresh_cohort_analytics
+from .dedup import rebuild_index, store_clusters
+from .leaderboard import rebuild_leaderboards
+from .models import Mcq, QuizResult, Registration
+from .search import rebuild_search_index
+from .suggestions import compute_for_users
+
+SEED = 46
+TOPICS = {
+    "Python": ["Basics", "Loops", "Functions", "OOP"],
+    "Java": ["Basics", "Collections", "Streams", "Generics"],
+    "SQL": ["Joins", "Indexes", "Aggregation", "Transactions"],
+    "DSA": ["Arrays", "Trees", "Graphs", "Sorting"],
+    "Web": ["HTTP", "HTML", "CSS", "JavaScript"],
+    "OS": ["Processes", "Memory", "Scheduling", "Files"],
+}
+DIFFICULTIES = ["easy", "medium", "hard"]
+MCQ_COUNT = 3000
+USER_COUNT = 300
+RESULT_COUNT = 20000
+PASSWORD = "budget-Password-1"
+PDF_FIXTURE = Path(__file__).resolve().parent / "testdata" / "mcqs.pdf"
+# Routes whose query count must stay the same when the data grows. export_data
+# is left out: it runs one bounded query per exports.CHUNK_SIZE rows by design.
+SCALE_ROUTES = (
+    "userdashboard", "admindashboard", "database", "history", "results", "results_json",
+    "search_json", "leaderboard", "leaderboard_json", "dashboard", "suggestions",
+)
+
+# url name: (client, method, path, data, expected status, max queries, max ms)
+# Query budgets are the current counts on a cold cache, so any new query
+# fails here until its budget is raised on purpose. Latency budgets are
+# loose enough for CI.
+ROUTES = {
+    "home": ("anon", "get", "/", None, 200, 0, 500),
+    "register": ("anon", "get", "/register/", None, 200, 0, 500),
+    "login": ("anon", "post", "/login/", {"email": "student0@example.com", "password": PASSWORD}, 302, 5, 1000),
+    "success": ("anon", "get", "/success/", None, 200, 0, 500),
+    "userdashboard": ("student", "get", "/userdashboard/", None, 200, 4, 1000),
+    "userlogout": ("student", "get", "/logout/", None, 302, 2, 500),
+    "admin_login": ("anon", "get", "/adminlogin/", None, 200, 0, 500),
+    "admindashboard": ("admin", "get", "/admindashboard/", None, 200, 3, 1000),
+    "admin_logout": ("admin", "get", "/adminlogout/", None, 302, 4, 500),
+    "upload_mcq": ("admin", "post", "/upload-mcq/", "pdf", 302, 6, 3000),
+    "import_mcqs": ("admin", "post", "/import-mcq/", "import", 302, 6, 3000),
+    "database": ("admin", "get", "/database/", None, 200, 4, 1000),
+    "cohort_analytics": ("admin", "get", "/cohort-analytics/", None, 200, 1, 1000),
+    # One query per 2000-row chunk of the 20000 results, plus the session
+    "export_data": ("admin", "get", "/export/results/?format=csv", None, 200, 12, 5000),
+    "start_quiz": (
+        "student", "post", "/start-quiz/",
+        {"topic": "Python", "subtopic": "Basics", "difficulty": "easy", "num_questions": 10}, 200, 6, 1000,
+    ),
+    # Worst case: both leaderboard entries move into score bands and tie
+    # groups that do not exist yet (the questions, and so the score, vary)
+    "submit_quiz": ("student", "post", "/submit-quiz/", "answers", 200, 40, 1000),
+    "accounts_login": ("anon", "get", "/accounts/login/", None, 200, 0, 500),
+    "history": ("student", "get", "/history/", None, 200, 3, 1000),
+    "results": ("student", "get", "/results/", None, 200, 3, 1000),
+    "results_json": ("student", "get", "/api/results/", None, 200, 3, 1000),
+    "catalog_json": ("anon", "get", "/api/catalog/", None, 200, 1, 1000),
+    "search_json": ("admin", "get", "/api/search/?q=closure+scope", None, 200, 5, 2000),
+    "duplicates": ("admin", "get", "/duplicates/", None, 200, 1, 5000),
+    "leaderboard": ("student", "get", "/leaderboard/?topic=Python&difficulty=easy", None, 200, 6, 1000),
+    "leaderboard_json": ("student", "get", "/api/leaderboard/?topic=Python&difficulty=easy", None, 200, 5, 1000),
+    "dashboard": ("student", "get", "/dashboard/", None, 200, 13, 2000),
+    "suggestions": ("student", "get", "/suggestions/", None, 200, 4, 1000),
+    "analytics_cache_stats": ("admin", "get", "/analytics-cache/stats/", None, 200, 1, 500),
+    "db_connection_stats": ("admin", "get", "/db-stats/", None, 200, 1, 500),
+    "metrics": ("admin", "get", "/metrics", None, 200, 1, 500),
+    "slow_requests": ("admin", "get", "/slow-requests/", None, 200, 2, 1000),
+}
+
+
+def seed_data(rng):
+    buckets = [
+        (topic, subtopic, difficulty)
+        for topic, subtopics in TOPICS.items()
+        for subtopic in subtopics
+        for difficulty in DIFFICULTIES
+    ]
+    words = "value list loop scope closure class index query join thread memory cache stack heap".split()
+    mcqs = []
+    for i in range(MCQ_COUNT):
+        topic, subtopic, difficulty = buckets[i % len(buckets)]
+        mcqs.append(Mcq(
+            topic=topic, subtopic=subtopic, difficulty=difficulty, question_no=i + 1,
+            question=f"Question {i}: what does {' '.join(rng.sample(words, 4))} do?",
+            option1=f"{rng.choice(words)} {i}", option2=f"{rng.choice(words)} {i + 1}",
+            option3=f"{rng.choice(words)} {i + 2}", option4=f"{rng.choice(words)} {i + 3}",
+            correct_answer=str(rng.randint(1, 4)),
+        ))
+    Mcq.objects.bulk_create(mcqs, batch_size=1000)
+
+    password = make_password(PASSWORD)
+    Registration.objects.bulk_create([
+        Registration(first_name=f"Student{i}", last_name="Budget", email=f"student{i}@example.com",
+                     password=password, contact="0000000000", gender=rng.choice(["male", "female", "other"]))
+        for i in range(USER_COUNT)
+    ])
+    user_ids = list(Registration.objects.values_list("id", flat=True))
+
+    now = timezone.now()
+    results = []
+    for _ in range(RESULT_COUNT):
+        topic, subtopic, difficulty = rng.choice(buckets)
+        total = rng.choice([5, 10, 15, 20])
+        correct = min(total, max(0, round(rng.gauss(0.65, 0.2) * total)))
+        results.append(QuizResult(
+            user_id=rng.choice(user_ids), topic=topic, subtopic=subtopic, difficulty=difficulty,
+            date_attempted=now - timedelta(minutes=rng.randint(0, 120 * 24 * 60)),
+            total_questions=total, correct_questions=correct, wrong_questions=total - correct,
+            score=round(100 * correct / total, 2),
+        ))
+    QuizResult.objects.bulk_create(results, batch_size=2000)
+
+    refresh_derived(user_ids)
+
+
+def grow_data(rng, student):
+    """
+    Multiply the seeded data: more questions, students and results, and a
+    much longer history for the measured student.
+    """
+    Mcq.objects.bulk_create([
+        Mcq(topic="Python", subtopic="Basics", difficulty="easy", question_no=MCQ_COUNT + i,
+            question=f"Extra question {i} about closure scope?", option1="a", option2="b", option3="c",
+            option4="d", correct_answer="1")
+        for i in range(MCQ_COUNT)
+    ], batch_size=1000)
+    password = make_password(PASSWORD)
+    Registration.objects.bulk_create([
+        Registration(first_name=f"Extra{i}", last_name="Budget", email=f"extra{i}@example.com",
+                     password=password, contact="0000000000", gender="other")
+        for i in range(USER_COUNT)
+    ])
+    user_ids = list(Registration.objects.values_list("id", flat=True))
+    now = timezone.now()
+    QuizResult.objects.bulk_create([
+        QuizResult(
+            user_id=student.id if i % 4 == 0 else rng.choice(user_ids), topic="Python", subtopic="Basics",
+            difficulty=rng.choice(DIFFICULTIES), date_attempted=now - timedelta(minutes=rng.randint(0, 10_000)),
+            total_questions=10, correct_questions=i % 11, wrong_questions=10 - i % 11, score=10.0 * (i % 11),
+        )
+        for i in range(RESULT_COUNT)
+    ], batch_size=2000)
+    refresh_derived(user_ids)
+
+
+def refresh_derived(user_ids):
+    compute_for_users(user_ids)
+    rebuild_leaderboards()
+    rebuild_search_index()
+    refresh_catalog()
+
+
+def route_names():
+    names = set()
+    for pattern in get_resolver().url_patterns:
+        if isinstance(pattern, URLPattern) and pattern.callback.__module__ == "base.views":
+            names.add(pattern.name or str(pattern.pattern).strip("/").replace("/", "_"))
+    return names
+
+
+@override_settings(
+    # Keep the benchmark about queries and view code, not PBKDF2 cost
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    # The manifest storage needs collectstatic first; tests render unhashed names
+    STORAGES={
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+    # Never touch the developer's file cache
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "budget-tests"},
+        "ratelimit": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "budget-ratelimit"},
+    },
+    LOGIN_RATELIMIT_ENABLED=False,
+    METRICS_ENABLED=True,
+    METRICS_TOKEN="",
+)
+class QueryBudgetTests(TestCase):
+    report = []
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index_dir = tempfile.TemporaryDirectory()
+        cls.settings_override = override_settings(
+            DEDUP_INDEX_PATH=os.path.join(cls.index_dir.name, "dedup_index"),
+            COHORT_REPORT_PATH=os.path.join(cls.index_dir.name, "cohort_report.json"),
+        )
+        cls.settings_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings_override.disable()
+        cls.index_dir.cleanup()
+        path = os.environ.get("QUERY_BUDGET_REPORT", str(settings.BASE_DIR / "query_budget_report.json"))
+        with open(path, "w") as fh:
+            json.dump({
+                "generated_at": timezone.now().isoformat(),
+                "database": connections["default"].vendor,
+                "data": {"mcqs": MCQ_COUNT, "users": USER_COUNT, "results": RESULT_COUNT},
+                "routes": sorted(cls.report, key=lambda row: row["route"]),
+            }, fh, indent=2)
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_data(random.Random(SEED))
+        rebuild_index()
+        store_clusters()
+        refresh_cohort_analytics()
+        cls.student = Registration.objects.get(email="student0@example.com")
+
+    def client_for(self, kind):
+        client = Client()
+        if kind != "anon":
+            session = client.session
+            if kind == "student":
+                session["user_id"] = self.student.id
+                session["user_email"] = self.student.email
+            else:
+                session["is_admin"] = True
+            session.save()
+            client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        return client
+
+    def request_data(self, client, data):
+        if data == "pdf":
+            return {"topic_name": "Uploaded", "sub_topic_name": "Budget", "difficulty_level": "easy",
+                    "document": SimpleUploadedFile("mcqs.pdf", PDF_FIXTURE.read_bytes(), "application/pdf")}
+        if data == "import":
+            csv_data = (
+                "question_no,question,option1,option2,option3,option4,correct_answer\n"
+                + "".join(
+                    f"{i},Budget import question {i} about closures?,a{i},b{i},c{i},d{i},A\n" for i in range(50)
+                )
+            )
+            return {"topic_name": "Imported", "sub_topic_name": "Budget", "difficulty_level": "easy",
+                    "document": SimpleUploadedFile("budget.csv", csv_data.encode())}
+        if data == "answers":
+            client.post("/start-quiz/", ROUTES["start_quiz"][3])
+            return {f"question_{mcq_id}": "1" for mcq_id in client.session["quiz_questions"]}
+        return data
+
+    def measure(self, name, record=True):
+        kind, method, path, data, status, max_queries, max_ms = ROUTES[name]
+        client = self.client_for(kind)
+        data = self.request_data(client, data)
+        for alias in caches:
+            caches[alias].clear()
+
+        with CaptureQueriesContext(connections["default"]) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data) if data is not None else getattr(client, method)(path)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        row = {
+            "route": name, "method": method.upper(), "path": path,
+            "status": response.status_code, "expected_status": status,
+            "queries": len(queries), "max_queries": max_queries,
+            "ms": round(elapsed_ms, 2), "max_ms": max_ms,
+        }
+        if record:
+            self.report.append(row)
+        return row, response
+
+    def test_every_route_has_a_budget(self):
+        self.assertEqual(route_names() - set(ROUTES), set())
+
+    def test_routes_within_budget(self):
+        for name in ROUTES:
+            with self.subTest(route=name):
+                row, response = self.measure(name)
+                self.assertEqual(response.status_code, row["expected_status"], f"{name} status")
+                self.assertLessEqual(row["queries"], row["max_queries"], f"{name} query budget")
+                self.assertLessEqual(row["ms"], row["max_ms"], f"{name} latency budget")
+
+    def test_query_counts_do_not_grow_with_data(self):
+        before = {name: self.measure(name, record=False)[0]["queries"] for name in SCALE_ROUTES}
+        grow_data(random.Random(SEED + 1), self.student)
+        rebuild_search_index()
+        refresh_catalog()
+        for name in SCALE_ROUTES:
+            with self.subTest(route=name):
+                row, response = self.measure(name, record=False)
+                self.assertEqual(response.status_code, row["expected_status"])
+                self.assertEqual(row["queries"], before[name], f"{name} queries grew with the data")
@@ -12,14 +12,27 @@ urlpatterns = [
     path('admindashboard/', views.admindashboard, name='admindashboard'),
     path('adminlogout/', views.admin_logout, name='admin_logout'),
     path('upload-mcq/', views.upload_mcq_pdf, name='upload_mcq'),
+    path('import-mcq/', views.import_mcqs, name='import_mcqs'),
     path('database/', views.database_view, name='database'),
+    path('cohort-analytics/', views.cohort_analytics, name='cohort_analytics'),
+    path('export/<str:kind>/', views.export_data, name='export_data'),
     path("start-quiz/", views.start_quiz, name="start_quiz"),  # 🔑 This must exist
     path("submit-quiz/", views.submit_quiz, name="submit_quiz"),
     path('accounts/login/', views.login), 
     path("history/", views.history, name="history"),
     path("results/", views.results, name="results"),
+    path("api/results/", views.results_json, name="results_json"),
+    path("api/catalog/", views.catalog_json, name="catalog_json"),
+    path("api/search/", views.search_json, name="search_json"),
+    path("duplicates/", views.duplicates_report, name="duplicates"),
+    path("leaderboard/", views.leaderboard, name="leaderboard"),
+    path("api/leaderboard/", views.leaderboard_json, name="leaderboard_json"),
     path("dashboard/", views.analytics_dashboard, name="dashboard"),
     path("suggestions/", views.suggestions_view, name="suggestions"),
+    path("analytics-cache/stats/", views.analytics_cache_stats, name="analytics_cache_stats"),
+    path("db-stats/", views.db_connection_stats, name="db_connection_stats"),
+    path("metrics", views.metrics, name="metrics"),
+    path("slow-requests/", views.slow_requests, name="slow_requests"),
 
 
 
@@ -1,19 +1,50 @@
+import math
 import random
 import logging
+import time
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.hashers import make_password, check_password
 from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
 from django.utils import timezone
+from django.db.models.functions import Left, TruncDate
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import urlencode
 
-from .forms import RegistrationForm, LoginForm, MCQUploadForm
-from .models import Registration, Mcq, QuizResult
+from .forms import RegistrationForm, LoginForm, MCQUploadForm, MCQImportForm
+from .models import Registration, Mcq, QuizResult, QuestionResponse, SlowRequest
 from .utils import extract_mcqs_from_pdf
+from .caching import get_or_build, aget_or_build, abump_user_version, cache_stats
+from .pagination import keyset_page, akeyset_page, decode_cursor, RESULTS_PAGE_SIZE
+from .catalog import get_catalog, aget_catalog, refresh_catalog, dropdown_options
+from .suggestions import get_user_suggestions, record_result
+from .leaderboard import record_score, top_entries, atop_entries, user_rank, auser_rank
+from .exports import export_queryset, export_stream
+from .imports import ImportInterrupted, detect_format, import_mcqs as import_mcq_rows, open_text
+from .search import index_mcqs, search_mcqs, SEARCH_LIMIT
+from .dedup import Screener, sync_index, duplicate_clusters
+from .ratelimit import check_login, login_failed, login_succeeded
+from .dbstats import connection_stats, reset_connection_stats
+from .routers import apin_primary
+from .metrics import metrics_enabled, render_metrics
+from .profiling import PROFILE_HEADER, make_profile_token, set_toggle, toggle_until
 
 logger = logging.getLogger(__name__)
 
+DASHBOARD_DAYS = (7, 30, 90)
+DEFAULT_DASHBOARD_DAYS = 30
+DEFAULT_QUIZ_QUESTIONS = 5
+MAX_QUIZ_QUESTIONS = 50
+
 # ---------- Home ----------
 def home(request):
     return render(request, "home.html")
@@ -47,16 +78,34 @@ def login(request):
         if form.is_valid():
             email = form.cleaned_data["email"]
             password = form.cleaned_data["password"]
+
+            # Refuse over-limit attempts before any lookup or hashing work
+            retry_after = check_login(request, email)
+            if retry_after:
+                messages.error(request, "Too many login attempts. Please try again later.")
+                response = render(request, "login.html", {"form": form}, status=429)
+                response["Retry-After"] = str(math.ceil(retry_after))
+                return response
+
             try:
                 user = Registration.objects.get(email=email)
-                if check_password(password, user.password):
+
+                def rehash(raw_password):
+                    # Upgrades hashes made with an older hasher or iteration count
+                    user.password = make_password(raw_password)
+                    user.save(update_fields=["password"])
+
+                if check_password(password, user.password, setter=rehash):
+                    login_succeeded(request, email)
                     request.session["user_id"] = user.id
                     request.session["user_email"] = user.email
                     messages.success(request, "Login successful!")
                     return redirect("userdashboard")
                 else:
+                    login_failed(request, email)
                     messages.error(request, "Invalid Email or Password.")
             except Registration.DoesNotExist:
+                login_failed(request, email)
                 messages.error(request, "Invalid Email or Password.")
         else:
             messages.error(request, "Please correct the errors below.")
@@ -68,38 +117,24 @@ def login(request):
 def success(request):
     return render(request, "success.html")
 
-from functools import wraps
-from django.shortcuts import redirect
-from django.contrib import messages
-
-def custom_login_required(view_func):
-    @wraps(view_func)
-    def wrapper(request, *args, **kwargs):
-        if not request.session.get("user_id"):
-            messages.warning(request, "Please log in first.")
-            return redirect("login")  # your custom login page
-        return view_func(request, *args, **kwargs)
-    return wrapper
-
 # ---------- views.py ----------
 from django.shortcuts import render, redirect
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Max, Q
 from .models import Registration, Mcq, QuizResult
-from .decorators import custom_login_required
+from .decorators import custom_login_required, read_from_replica
 
 
 # ---------- User Dashboard ----------
 @custom_login_required
 def userdashboard(request):
-    user = Registration.objects.get(id=request.session["user_id"])
+    user = request.quiz_user
 
-    # Distinct lists for dropdowns
-    topics = Mcq.objects.values_list("topic", flat=True).distinct().order_by("topic")
-    subtopics = Mcq.objects.values_list("subtopic", flat=True).distinct().order_by("subtopic")
-    difficulties = Mcq.objects.values_list("difficulty", flat=True).distinct().order_by("difficulty")
+    # Dropdowns come from the cached catalog; the template narrows them per topic
+    catalog = get_catalog()
+    options = dropdown_options(catalog)
 
-    # User’s quiz history
-    results = QuizResult.objects.filter(user=user).order_by("-date_attempted")
+    # User’s most recent quizzes (the full list is paginated on the results page)
+    results = QuizResult.objects.filter(user=user).order_by("-date_attempted", "-id")[:RESULTS_PAGE_SIZE]
 
     # Quiz summary (per topic & subtopic)
     quiz_summary = (
@@ -113,153 +148,24 @@ def userdashboard(request):
     )
 
     # ---------- Suggestion Logic ----------
-    suggestion = None
-
-    # Count quizzes per difficulty with average score
-    difficulty_summary = (
-        QuizResult.objects.filter(user=user)
-        .values("difficulty")
-        .annotate(
-            quizzes_taken=Count("id"),
-            avg_score=Avg("score"),
-        )
-    )
-
-    # Convert to dict for quick lookup
-    difficulty_stats = {row["difficulty"]: row for row in difficulty_summary}
-
-    # Easy → Medium
-    if (
-        "easy" in difficulty_stats
-        and difficulty_stats["easy"]["quizzes_taken"] >= 5
-        and difficulty_stats["easy"]["avg_score"] >= 80
-    ):
-        suggestion = "🎯 Great job! Try moving up to <b>Medium level</b> quizzes."
-
-    # Medium → Hard
-    elif (
-        "medium" in difficulty_stats
-        and difficulty_stats["medium"]["quizzes_taken"] >= 5
-        and difficulty_stats["medium"]["avg_score"] >= 75
-    ):
-        suggestion = "🚀 Awesome! You’re ready for <b>Hard level</b> quizzes."
-
-    # Hard → Next Topic
-    elif (
-        "hard" in difficulty_stats
-        and difficulty_stats["hard"]["quizzes_taken"] >= 3
-        and difficulty_stats["hard"]["avg_score"] >= 80
-    ):
-        suggestion = "🔥 Excellent work! Move on to the <b>next topic</b>."
-
-    else:
-        suggestion = "💪 Keep practicing! Complete more quizzes  to unlock new suggestions."
+    # Precomputed on submission, see suggestions.py
+    suggestion = get_user_suggestions(user.id).headline
 
     # ---------- Context ----------
     context = {
         "user": user,
         "results": results,
         "quiz_summary": quiz_summary,
-        "topics": list(topics),
-        "subtopics": list(subtopics),
-        "difficulties": list(difficulties),
+        "topics": options["topics"],
+        "subtopics": options["subtopics"],
+        "difficulties": options["difficulties"],
+        "catalog": catalog,
         "suggestion": suggestion,  # ✅ AI suggestion passed to template
     }
 
     return render(request, "userdashboard.html", context)
 
 
-# ---------- Start Quiz ----------
-# @login_required
-def start_quiz(request):
-    if request.method == "POST":
-        topic = request.POST.get("topic")
-        subtopic = request.POST.get("subtopic")
-        difficulty = request.POST.get("difficulty")
-        num_questions = int(request.POST.get("num_questions", 5))
-
-        questions = list(Mcq.objects.filter(
-            topic=topic,
-            subtopic=subtopic,
-            difficulty=difficulty
-        ))
-
-        if len(questions) < num_questions:
-            num_questions = len(questions)
-
-        if not questions:
-            messages.warning(request, "No questions available for this selection.")
-            return redirect("userdashboard")
-
-        selected_questions = random.sample(questions, num_questions)
-
-        request.session['quiz_questions'] = [q.id for q in selected_questions]
-        request.session['quiz_meta'] = {
-            "topic": topic,
-            "subtopic": subtopic,
-            "difficulty": difficulty,
-            "num_questions": num_questions,
-        }
-
-        context = {
-            "questions": selected_questions,
-            "num_questions": num_questions,
-        }
-        return render(request, "quiz.html", context)
-    else:
-        return redirect("userdashboard")
-
-# ---------- Submit Quiz ----------
-# @login_required
-def submit_quiz(request):
-    if request.method == "POST":
-        user = Registration.objects.get(id=request.session["user_id"])
-
-        quiz_question_ids = request.session.get('quiz_questions', [])
-        quiz_meta = request.session.get('quiz_meta', {})
-        if not quiz_question_ids or not quiz_meta:
-            messages.error(request, "Quiz session expired.")
-            return redirect("userdashboard")
-
-        questions = Mcq.objects.filter(id__in=quiz_question_ids)
-
-        total_questions = len(quiz_question_ids)
-        correct = 0
-        wrong = 0
-
-        for q in questions:
-            selected = request.POST.get(f"question_{q.id}")
-            if selected == q.correct_answer:
-                correct += 1
-            else:
-                wrong += 1
-
-        score = (correct / total_questions) * 100 if total_questions else 0
-
-        QuizResult.objects.create(
-            user=user,
-            topic=quiz_meta.get("topic", ""),
-            subtopic=quiz_meta.get("subtopic", ""),
-            difficulty=quiz_meta.get("difficulty", ""),
-            date_attempted=timezone.now(),
-            total_questions=total_questions,
-            correct_questions=correct,
-            wrong_questions=wrong,
-            score=score,
-        )
-
-        request.session.pop('quiz_questions', None)
-        request.session.pop('quiz_meta', None)
-
-        return render(request, "result.html", {
-            "total": total_questions,
-            "correct": correct,
-            "wrong": wrong,
-            "score": round(score, 2),
-        })
-    else:
-        return redirect("userdashboard")
-
 # ---------- Logout ----------
 def userlogout(request):
     try:
@@ -290,6 +196,9 @@ def admin_login(request):
     return render(request, "admin.html")
 
 # ---------- Admin Dashboard ----------
+USERS_PAGE_SIZE = 25
+
+
 def admindashboard(request):
     if not request.session.get("is_admin"):
         messages.warning(request, "Admin access required.")
@@ -313,9 +222,10 @@ def admindashboard(request):
                     pdf_file.seek(0)
                     mcqs = extract_mcqs_from_pdf_simple_fallback(pdf_file, topic, subtopic, difficulty)
 
-                created_count = 0
+                screener = Screener()
+                created = []
                 for mcq in mcqs:
-                    Mcq.objects.create(
+                    obj = Mcq(
                         topic=topic,
                         subtopic=subtopic,
                         difficulty=difficulty,
@@ -327,21 +237,108 @@ def admindashboard(request):
                         option4=mcq.get('option4'),
                         correct_answer=mcq.get('correct_answer'),
                     )
-                    created_count += 1
-
-                messages.success(request, f"Successfully uploaded {created_count} MCQs.")
+                    if screener.keep(obj, f"Q{obj.question_no}"):
+                        obj.save()
+                        created.append(obj)
+
+                index_mcqs(created)
+                sync_index()
+                refresh_catalog()
+                messages.success(request, f"Successfully uploaded {len(created)} MCQs.")
+                if screener.flagged_count:
+                    messages.warning(request, screener.summary())
             except Exception as e:
                 logger.error(f"MCQ upload error: {str(e)}")
                 messages.error(request, "Error processing PDF.")
+        # Post/Redirect/Get: the upload response does not render the user table
+        return redirect("admindashboard")
+
+    query = request.GET.get("q", "").strip()
+    after = request.GET.get("after", "")
+    users = Registration.objects.all()
+    if query:
+        # Prefix matches can use the email index instead of a LIKE '%...%' scan
+        users = users.filter(
+            Q(email__istartswith=query) | Q(first_name__istartswith=query) | Q(last_name__istartswith=query)
+        )
+    total_users = users.count()
+
+    # Keyset page on id with per-user activity from one LEFT JOIN ... GROUP BY
+    page = users.order_by("-id")
+    if after.isdigit():
+        page = page.filter(id__lt=int(after))
+    page_users = list(
+        page.annotate(
+            attempts=Count("quizresult"),
+            avg_score=Avg("quizresult__score"),
+            last_attempt=Max("quizresult__date_attempted"),
+        ).only("id", "first_name", "last_name", "email", "contact")[: USERS_PAGE_SIZE + 1]
+    )
+    next_after = page_users[USERS_PAGE_SIZE - 1].id if len(page_users) > USERS_PAGE_SIZE else None
 
-    users = Registration.objects.all().order_by("-id")
     form = MCQUploadForm()
     return render(request, "admindashboard.html", {
-        "users": users,
+        "users": page_users[:USERS_PAGE_SIZE],
+        "total_users": total_users,
+        "query": query,
+        "next_after": next_after,
         "form": form,
         "admin_username": request.session.get("admin_username", "Admin")
     })
 
+# ---------- Bulk Question Import ----------
+IMPORT_ERRORS_SHOWN = 10
+
+
+@require_POST
+def import_mcqs(request):
+    if not request.session.get("is_admin"):
+        messages.warning(request, "Admin access required.")
+        return redirect("admin_login")
+
+    form = MCQImportForm(request.POST, request.FILES)
+    if not form.is_valid():
+        messages.error(request, "Please choose a CSV or JSONL file to import.")
+        return redirect("admindashboard")
+
+    upload = form.cleaned_data["document"]
+    try:
+        fmt, gzipped = detect_format(upload.name)
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect("admindashboard")
+
+    defaults = {
+        "topic": form.cleaned_data["topic_name"].strip(),
+        "subtopic": form.cleaned_data["sub_topic_name"].strip(),
+        "difficulty": form.cleaned_data["difficulty_level"].strip(),
+    }
+    try:
+        report = import_mcq_rows(
+            open_text(upload.file, gzipped), fmt, {k: v for k, v in defaults.items() if v}
+        )
+    except ImportInterrupted as e:
+        logger.error(f"MCQ import error: {e} ({e.__cause__!r})")
+        messages.error(
+            request,
+            f"Error reading the import file after line {e.line_no}. "
+            f"{e.report['created']} MCQs saved before the error were kept.",
+        )
+        return redirect("admindashboard")
+    finally:
+        # Runs after partial imports too: their committed rows are in the bank
+        refresh_catalog()
+
+    messages.success(request, f"Imported {report['created']} MCQs.")
+    if report["error_count"]:
+        shown = "; ".join(
+            f"line {line_no}: {message}" for line_no, message in report["errors"][:IMPORT_ERRORS_SHOWN]
+        )
+        messages.warning(request, f"{report['error_count']} rows rejected. {shown}")
+    if report["duplicates"]:
+        messages.warning(request, report["duplicates"])
+    return redirect("admindashboard")
+
 # ---------- Admin Logout ----------
 def admin_logout(request):
     request.session.pop("is_admin", None)
@@ -361,28 +358,315 @@ def check_session(request):
         })
     return JsonResponse({"error": "Method not allowed"}, status=405)
 
+# ---------- Leaderboard ----------
+LEADERBOARD_SIZE = 10
+
+
+def leaderboard_bucket(request):
+    topic = request.GET.get("topic", "").strip()
+    difficulty = request.GET.get("difficulty", "").strip()
+    if not (topic and difficulty):
+        topic = difficulty = ""  # overall board
+    return topic, difficulty
+
+
+def leaderboard_context(request):
+    topic, difficulty = leaderboard_bucket(request)
+
+    context = {
+        "topic": topic,
+        "difficulty": difficulty,
+        "entries": top_entries(topic, difficulty, LEADERBOARD_SIZE),
+        "my_rank": None,
+        "my_entry": None,
+    }
+    user_id = request.session.get("user_id")
+    if user_id:
+        context["my_rank"], context["my_entry"] = user_rank(user_id, topic, difficulty)
+    return context
+
+
+def leaderboard(request):
+    if not (request.session.get("user_id") or request.session.get("is_admin")):
+        messages.warning(request, "Please log in first.")
+        return redirect("login")
+
+    context = leaderboard_context(request)
+    context["options"] = dropdown_options(get_catalog())
+    return render(request, "leaderboard.html", context)
+
+
+async def leaderboard_json(request):
+    user_id = await request.session.aget("user_id")
+    if not (user_id or await request.session.aget("is_admin")):
+        return JsonResponse({"error": "Login required"}, status=401)
+
+    topic, difficulty = leaderboard_bucket(request)
+    entries = await atop_entries(topic, difficulty, LEADERBOARD_SIZE)
+    my_rank, my_entry = await auser_rank(user_id, topic, difficulty) if user_id else (None, None)
+    return JsonResponse({
+        "topic": topic,
+        "difficulty": difficulty,
+        "entries": [
+            {
+                "rank": e["rank"],
+                "user_id": e["user_id"],
+                "name": f"{e['user__first_name']} {e['user__last_name']}",
+                "attempts": e["attempts"],
+                "avg_score": round(e["avg_score"], 2),
+            }
+            for e in entries
+        ],
+        "my_rank": my_rank,
+        "my_avg_score": round(my_entry.avg_score, 2) if my_entry else None,
+    })
+
+# ---------- Question Catalog ----------
+async def catalog_json(request):
+    """
+    Topic -> subtopic -> difficulty tree with question counts, for dependent dropdowns.
+    """
+    return JsonResponse(await aget_catalog())
+
+# ---------- Near-Duplicate Report ----------
+DUPLICATE_CLUSTERS_SHOWN = 100
+
+
+def duplicates_report(request):
+    if not request.session.get("is_admin"):
+        messages.warning(request, "Admin access required.")
+        return redirect("admin_login")
+
+    report = duplicate_clusters()
+    if report is None:
+        return render(request, "duplicates.html", {"report": None})
+    clusters = report["clusters"]
+    shown = clusters[:DUPLICATE_CLUSTERS_SHOWN]
+    rows = Mcq.objects.only(
+        "id", "topic", "subtopic", "difficulty", "question", "created_at"
+    ).in_bulk([mcq_id for cluster in shown for mcq_id in cluster])
+    groups = []
+    for cluster in shown:
+        # Questions deleted since the index was built drop out of the report
+        members = [rows[mcq_id] for mcq_id in cluster if mcq_id in rows]
+        if len(members) > 1:
+            groups.append(members)
+
+    return render(request, "duplicates.html", {
+        "report": report,
+        "computed_at": parse_datetime(report["computed_at"]),
+        "clusters": groups,
+        "cluster_count": len(clusters),
+        "duplicate_count": sum(len(cluster) - 1 for cluster in clusters),
+        "shown": DUPLICATE_CLUSTERS_SHOWN,
+    })
+
+# ---------- Question Search ----------
+def search_json(request):
+    """
+    Ranked full-text search over question and option text, for admins.
+    """
+    if not request.session.get("is_admin"):
+        return JsonResponse({"error": "Admin access required."}, status=403)
+
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "Missing search query 'q'."}, status=400)
+    try:
+        limit = min(max(int(request.GET.get("limit", SEARCH_LIMIT)), 1), 200)
+    except ValueError:
+        return JsonResponse({"error": "Invalid limit."}, status=400)
+
+    results = search_mcqs(query, limit)
+    return JsonResponse({"query": query, "count": len(results), "results": results})
+
+# ---------- Cohort Analytics ----------
+@require_GET
+def cohort_analytics(request):
+    """
+    Show the stored cohort report. It is computed out of band by the
+    cohort_analytics management command, never inside a request.
+    """
+    if not request.session.get("is_admin"):
+        messages.warning(request, "Admin access required.")
+        return redirect("admin_login")
+
+    # NumPy is only needed by the admin analytics, so import it lazily
+    from .cohort import get_cohort_analytics
+
+    report = get_cohort_analytics()
+    if report is None:
+        if request.GET.get("format") == "json":
+            return JsonResponse({"error": "Cohort analytics have not been computed yet."}, status=404)
+        return render(request, "cohort_analytics.html", {"report": None})
+    if request.GET.get("format") == "json":
+        return JsonResponse(report)
+
+    peak = max((row["count"] for row in report["score_distribution"]), default=0)
+    for row in report["score_distribution"]:
+        row["width"] = round(100 * row["count"] / peak) if peak else 0
+
+    return render(request, "cohort_analytics.html", {
+        "report": report,
+        "computed_at": datetime.fromisoformat(report["computed_at"]),
+    })
+
+# ---------- Data Export ----------
+def export_data(request, kind):
+    """
+    Stream results or questions as CSV/JSONL. Filters: topic, date_from,
+    date_to (YYYY-MM-DD) and user (id or email, results only); gzip=1
+    compresses on the fly.
+    """
+    if not request.session.get("is_admin"):
+        return JsonResponse({"error": "Admin access required"}, status=403)
+
+    fmt = request.GET.get("format", "csv")
+    compress = request.GET.get("gzip") == "1"
+    try:
+        queryset, fields = export_queryset(
+            kind,
+            topic=request.GET.get("topic", "").strip(),
+            date_from=request.GET.get("date_from", "").strip(),
+            date_to=request.GET.get("date_to", "").strip(),
+            user=request.GET.get("user", "").strip(),
+        )
+        stream = export_stream(queryset, fields, fmt, compress)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    filename = f"{kind}.{fmt}" + (".gz" if compress else "")
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    response = StreamingHttpResponse(
+        stream, content_type="application/gzip" if compress else f"{content_type}; charset=utf-8"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+# ---------- Slow Requests ----------
+SLOW_REQUESTS_SHOWN = 100
+
+
+def slow_requests(request):
+    if not request.session.get("is_admin"):
+        messages.warning(request, "Admin access required.")
+        return redirect("admin_login")
+
+    if request.method == "POST":
+        try:
+            minutes = max(int(request.POST.get("minutes", "0")), 0)
+        except ValueError:
+            minutes = 0
+        set_toggle(minutes)
+        if minutes:
+            messages.success(request, f"Profiling every request for {minutes} minutes.")
+        else:
+            messages.success(request, "Profiling toggle switched off.")
+        return redirect("slow_requests")
+
+    selected = None
+    if request.GET.get("id", "").isdigit():
+        selected = SlowRequest.objects.filter(id=int(request.GET["id"])).first()
+
+    captured = SlowRequest.objects.defer("profile", "queries").order_by("-created_at")[:SLOW_REQUESTS_SHOWN]
+    until = toggle_until()
+    return render(request, "slow_requests.html", {
+        "captured": captured,
+        "selected": selected,
+        "profiling_enabled": getattr(settings, "PROFILING_ENABLED", False),
+        "toggle_until": datetime.fromtimestamp(until, tz=dt_timezone.utc) if until > time.time() else None,
+        "slow_ms": getattr(settings, "PROFILING_SLOW_MS", 500),
+        "profile_header": PROFILE_HEADER,
+        "profile_token": make_profile_token(),
+    })
+
+# ---------- Metrics ----------
+def metrics(request):
+    """
+    Prometheus scrape endpoint for this process's request metrics. Without
+    METRICS_TOKEN only admin sessions may read it.
+    """
+    if not metrics_enabled():
+        return JsonResponse({"error": "Metrics are disabled."}, status=404)
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        if not request.session.get("is_admin"):
+            return JsonResponse({"error": "Admin access required."}, status=403)
+    elif not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return JsonResponse({"error": "Invalid metrics token."}, status=403)
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+# ---------- Database Connection Stats ----------
+def db_connection_stats(request):
+    """
+    Per-process connection-open counts and time, per database alias.
+    """
+    if not request.session.get("is_admin"):
+        return JsonResponse({"error": "Admin access required."}, status=403)
+    if request.method == "POST":
+        reset_connection_stats()
+    return JsonResponse(connection_stats())
+
+# ---------- Analytics Cache Stats ----------
+def analytics_cache_stats(request):
+    if not request.session.get("is_admin"):
+        return JsonResponse({"error": "Admin access required"}, status=403)
+    return JsonResponse(cache_stats())
+
 # ---------- Database View ----------
+BANK_PAGE_SIZE = 50
+
+
+@read_from_replica
 def database_view(request):
+    if not request.session.get("is_admin"):
+        messages.warning(request, "Admin access required.")
+        return redirect("admin_login")
+
+    filters = {
+        field: request.GET.get(field, "").strip()
+        for field in ("topic", "subtopic", "difficulty")
+        if request.GET.get(field, "").strip()
+    }
+    after = request.GET.get("after", "")
+
     try:
-        mcqs = Mcq.objects.all().order_by("-id")[:100]
-        total_mcqs = Mcq.objects.count()
+        bank = Mcq.objects.filter(**filters)
 
-        difficulty_stats = {}
-        for mcq in Mcq.objects.all():
-            diff = mcq.difficulty
-            difficulty_stats[diff] = difficulty_stats.get(diff, 0) + 1
+        # One GROUP BY gives both the per-difficulty stats and the total
+        difficulty_stats = dict(
+            bank.values_list("difficulty").annotate(count=Count("id")).order_by("difficulty")
+        )
+        total_mcqs = sum(difficulty_stats.values())
+
+        # Keyset page on id, fetching only the columns the table shows
+        page = bank.order_by("-id")
+        if after.isdigit():
+            page = page.filter(id__lt=int(after))
+        mcqs = list(
+            page.annotate(question_preview=Left("question", 120))
+            .values("id", "topic", "subtopic", "difficulty", "question_no",
+                    "question_preview", "correct_answer")[: BANK_PAGE_SIZE + 1]
+        )
+        next_after = mcqs[BANK_PAGE_SIZE - 1]["id"] if len(mcqs) > BANK_PAGE_SIZE else None
+        mcqs = mcqs[:BANK_PAGE_SIZE]
 
     except Exception as e:
         logger.error(f"Database view error: {str(e)}")
         mcqs = []
         total_mcqs = 0
         difficulty_stats = {}
+        next_after = None
         messages.error(request, "Error loading database.")
 
     return render(request, "database.html", {
         "mcqs": mcqs,
         "total_mcqs": total_mcqs,
-        "difficulty_stats": difficulty_stats
+        "difficulty_stats": difficulty_stats,
+        "filters": filters,
+        "filter_query": urlencode(filters),
+        "next_after": next_after,
+        "options": dropdown_options(get_catalog()),
     })
 
 from django.views.decorators.http import require_POST
@@ -405,8 +689,10 @@ def upload_mcq_pdf(request):
 
     try:
         mcqs = extract_mcqs_from_pdf(pdf_file, topic, subtopic, difficulty)
+        screener = Screener()
+        created = []
         for mcq in mcqs:
-            Mcq.objects.create(
+            obj = Mcq(
                 topic=topic,
                 subtopic=subtopic,
                 difficulty=difficulty,
@@ -418,6 +704,12 @@ def upload_mcq_pdf(request):
                 option4=mcq.get('option4'),
                 correct_answer=mcq.get('correct_answer'),
             )
+            if screener.keep(obj, f"Q{obj.question_no}"):
+                obj.save()
+                created.append(obj)
+        index_mcqs(created)
+        sync_index()
+        refresh_catalog()
         return redirect("database")  # Replace with your actual URL name
     except Exception as e:
         logger.error(f"upload_mcq_pdf error: {str(e)}")
@@ -425,36 +717,49 @@ def upload_mcq_pdf(request):
 
 
 # ---------- Start Quiz ----------
-# @login_required
-def start_quiz(request):
+# Async: under ASGI a worker keeps many quizzes in flight instead of one
+# thread per request. Sessions, cache and ORM go through their async APIs.
+async def start_quiz(request):
     if request.method == "POST":
         topic = request.POST.get("topic")
         subtopic = request.POST.get("subtopic")
         difficulty = request.POST.get("difficulty")
-        num_questions = int(request.POST.get("num_questions", 5))
+        try:
+            num_questions = int(request.POST.get("num_questions", DEFAULT_QUIZ_QUESTIONS))
+        except ValueError:
+            num_questions = 0
+        if not 1 <= num_questions <= MAX_QUIZ_QUESTIONS:
+            messages.error(request, f"Choose between 1 and {MAX_QUIZ_QUESTIONS} questions.")
+            return redirect("userdashboard")
 
-        questions = list(Mcq.objects.filter(
+        # Sample ids, then load only the chosen questions
+        question_ids = [q_id async for q_id in Mcq.objects.filter(
             topic=topic,
             subtopic=subtopic,
             difficulty=difficulty
-        ))
+        ).values_list("id", flat=True)]
 
-        if len(questions) < num_questions:
-            num_questions = len(questions)
+        if len(question_ids) < num_questions:
+            num_questions = len(question_ids)
 
-        if not questions:
+        if not question_ids:
             messages.warning(request, "No questions available for this selection.")
             return redirect("userdashboard")
 
-        selected_questions = random.sample(questions, num_questions)
+        selected_ids = random.sample(question_ids, num_questions)
+        rows = await Mcq.objects.only(
+            "id", "question", "option1", "option2", "option3", "option4"
+        ).ain_bulk(selected_ids)
+        selected_questions = [rows[q_id] for q_id in selected_ids if q_id in rows]
+        num_questions = len(selected_questions)
 
-        request.session['quiz_questions'] = [q.id for q in selected_questions]
-        request.session['quiz_meta'] = {
+        await request.session.aset('quiz_questions', [q.id for q in selected_questions])
+        await request.session.aset('quiz_meta', {
             "topic": topic,
             "subtopic": subtopic,
             "difficulty": difficulty,
             "num_questions": num_questions,
-        }
+        })
 
         context = {
             "questions": selected_questions,
@@ -466,12 +771,15 @@ def start_quiz(request):
 
 # ---------- Submit Quiz ----------
 # @login_required
-def submit_quiz(request):
+async def submit_quiz(request):
     if request.method == "POST":
-        user = Registration.objects.get(id=request.session["user_id"])
+        user = await request.aquiz_user()
+        if not user:
+            messages.warning(request, "Please log in first.")
+            return redirect("login")
 
-        quiz_question_ids = request.session.get('quiz_questions', [])
-        quiz_meta = request.session.get('quiz_meta', {})
+        quiz_question_ids = await request.session.aget('quiz_questions', [])
+        quiz_meta = await request.session.aget('quiz_meta', {})
         if not quiz_question_ids or not quiz_meta:
             messages.error(request, "Quiz session expired.")
             return redirect("userdashboard")
@@ -481,17 +789,23 @@ def submit_quiz(request):
         total_questions = len(quiz_question_ids)
         correct = 0
         wrong = 0
+        responses = []
 
-        for q in questions:
+        async for q in questions:
             selected = request.POST.get(f"question_{q.id}")
             if selected == q.correct_answer:
                 correct += 1
             else:
                 wrong += 1
+            responses.append(QuestionResponse(
+                mcq_id=q.id,
+                selected_option=selected if selected in ("1", "2", "3", "4") else "",
+                is_correct=selected == q.correct_answer,
+            ))
 
         score = (correct / total_questions) * 100 if total_questions else 0
 
-        QuizResult.objects.create(
+        result = await QuizResult.objects.acreate(
             user=user,
             topic=quiz_meta.get("topic", ""),
             subtopic=quiz_meta.get("subtopic", ""),
@@ -502,9 +816,17 @@ def submit_quiz(request):
             wrong_questions=wrong,
             score=score,
         )
-
-        request.session.pop('quiz_questions', None)
-        request.session.pop('quiz_meta', None)
+        for response in responses:
+            response.result = result
+        await QuestionResponse.objects.abulk_create(responses)
+        # These use transactions and row locks, which the async ORM lacks
+        await sync_to_async(record_result)(user.id, quiz_meta.get("difficulty", ""), score)
+        await sync_to_async(record_score)(user.id, quiz_meta.get("topic", ""), quiz_meta.get("difficulty", ""), score)
+        await abump_user_version(user.id)
+        await apin_primary(request)
+
+        await request.session.apop('quiz_questions', None)
+        await request.session.apop('quiz_meta', None)
 
         return render(request, "result.html", {
             "total": total_questions,
@@ -516,14 +838,51 @@ def submit_quiz(request):
         return redirect("userdashboard")
 
 from django.db.models import Count, Avg
+from django.views.decorators.http import condition
+from django.views.decorators.cache import cache_control
+
+
+def _results_etag(user_id, last_result_id):
+    """
+    Cheap validator for the per-user result pages: they only change when the
+    user submits a quiz, i.e. when their latest QuizResult id changes. The
+    date is included because the dashboard's "last N days" window moves, and
+    RESULTS_ETAG_VERSION so a deploy with new templates invalidates old tags.
+    """
+    return (
+        f"{getattr(settings, 'RESULTS_ETAG_VERSION', '1')}-{user_id}-"
+        f"{last_result_id or 0}-{timezone.now().date().isoformat()}"
+    )
+
+
+def _last_result_ids(user_id):
+    return QuizResult.objects.filter(user_id=user_id).order_by("-id").values_list("id", flat=True)
+
+
+def results_etag(request, *args, **kwargs):
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return None
+    return _results_etag(user_id, _last_result_ids(user_id).first())
+
+
+async def aresults_etag(request):
+    user_id = await request.session.aget("user_id")
+    if not user_id:
+        return None
+    return _results_etag(user_id, await _last_result_ids(user_id).afirst())
 
+
+@read_from_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=results_etag)
 def history(request):
     user_id = request.session.get("user_id")
     if not user_id:
         messages.error(request, "Please login to view history.")
         return redirect("login")
 
-    quiz_summary = (
+    quiz_summary = get_or_build(user_id, "history", lambda: list(
         QuizResult.objects.filter(user_id=user_id)
         .values("topic", "subtopic")
         .annotate(
@@ -531,19 +890,80 @@ def history(request):
             avg_score=Avg("score"),
         )
         .order_by("-quizzes_taken")
-    )
+    ))
 
     return render(request, "history.html", {"quiz_summary": quiz_summary})
 
+@read_from_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=results_etag)
 def results(request):
     user_id = request.session.get("user_id")
     if not user_id:
         messages.error(request, "Please login to view results.")
         return redirect("login")
 
-    results = QuizResult.objects.filter(user_id=user_id).order_by("-date_attempted")
+    # Only the first page is cached: cursors are client-supplied, and any
+    # number of distinct ones would each create a cache entry
+    cursor = request.GET.get("cursor", "")
+    if decode_cursor(cursor) is None:
+        cursor = ""
+        results, next_cursor = get_or_build(
+            user_id, "results", lambda: keyset_page(QuizResult.objects.filter(user_id=user_id))
+        )
+    else:
+        results, next_cursor = keyset_page(QuizResult.objects.filter(user_id=user_id), cursor)
+
+    return render(request, "results.html", {
+        "results": results,
+        "next_cursor": next_cursor,
+        "is_first_page": not cursor,
+    })
+
 
-    return render(request, "results.html", {"results": results})
+@read_from_replica
+@cache_control(private=True, no_cache=True)
+async def results_json(request):
+    """
+    JSON variant of the results list for infinite scroll: ?cursor=<next_cursor>.
+    """
+    user_id = await request.session.aget("user_id")
+    if not user_id:
+        return JsonResponse({"error": "Login required"}, status=401)
+
+    # condition() would call the etag function synchronously
+    etag = quote_etag(await aresults_etag(request))
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    cursor = request.GET.get("cursor", "")
+    if decode_cursor(cursor) is None:
+        results, next_cursor = await aget_or_build(
+            user_id, "results", lambda: akeyset_page(QuizResult.objects.filter(user_id=user_id))
+        )
+    else:
+        results, next_cursor = await akeyset_page(QuizResult.objects.filter(user_id=user_id), cursor)
+
+    response = JsonResponse({
+        "results": [
+            {
+                "id": r.id,
+                "date_attempted": r.date_attempted.isoformat(),
+                "topic": r.topic,
+                "subtopic": r.subtopic,
+                "difficulty": r.difficulty,
+                "total_questions": r.total_questions,
+                "correct_questions": r.correct_questions,
+                "wrong_questions": r.wrong_questions,
+                "score": round(r.score, 2),
+            }
+            for r in results
+        ],
+        "next_cursor": next_cursor,
+    })
+    response.headers.setdefault("ETag", etag)
+    return response
 
 # views.py - Analytics Dashboard
 from django.shortcuts import render, redirect
@@ -563,14 +983,9 @@ def get_logged_in_user(request):
     """
     Helper to fetch the logged-in user from session
     (since you are using Registration model, not Django's default User).
+    Memoized per request by QuizUserMiddleware.
     """
-    user_id = request.session.get("user_id")
-    if not user_id:
-        return None
-    try:
-        return Registration.objects.get(id=user_id)
-    except Registration.DoesNotExist:
-        return None
+    return request.quiz_user or None
 def login_view(request):
     """
     Custom login view for Registration model.
@@ -602,16 +1017,10 @@ def logout_view(request):
     return redirect("login")
 
 
-def analytics_dashboard(request):
+def build_dashboard_context(user, days):
     """
-    Main analytics dashboard view with comprehensive quiz analytics
+    Compute the analytics dashboard context for a user over the last `days` days.
     """
-    user = get_logged_in_user(request)
-    if not user:
-        return redirect("login")  # redirect if not logged in
-
-    # Date range filter (default last 30 days)
-    days = int(request.GET.get("days", 30))
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
 
@@ -638,7 +1047,7 @@ def analytics_dashboard(request):
     recent_average_score = recent_results.aggregate(avg=Avg("score"))["avg"] or 0
 
     # Performance by Topic
-    topic_performance = (
+    topic_performance = list(
         QuizResult.objects.filter(user=user)
         .values("topic")
         .annotate(
@@ -651,7 +1060,7 @@ def analytics_dashboard(request):
     )
 
     # Performance by Difficulty
-    difficulty_performance = (
+    difficulty_performance = list(
         QuizResult.objects.filter(user=user)
         .values("difficulty")
         .annotate(
@@ -666,7 +1075,7 @@ def analytics_dashboard(request):
     # Daily Performance (for chart)
     daily_performance = (
         QuizResult.objects.filter(user=user, date_attempted__gte=start_date)
-        .extra(select={"day": "date(date_attempted)"})
+        .annotate(day=TruncDate("date_attempted"))
         .values("day")
         .annotate(
             quiz_count=Count("id"),
@@ -684,11 +1093,11 @@ def analytics_dashboard(request):
     chart_quiz_counts = [item["quiz_count"] for item in daily_performance]
 
     # Best and Worst Topics
-    best_topic = topic_performance.first() if topic_performance else None
-    worst_topic = topic_performance.last() if topic_performance else None
+    best_topic = topic_performance[0] if topic_performance else None
+    worst_topic = topic_performance[-1] if topic_performance else None
 
     # Recent Activity
-    recent_activity = QuizResult.objects.filter(user=user).order_by("-date_attempted")[:10]
+    recent_activity = list(QuizResult.objects.filter(user=user).order_by("-date_attempted")[:10])
 
     context = {
         "total_quizzes": total_quizzes,
@@ -711,6 +1120,32 @@ def analytics_dashboard(request):
         "chart_quiz_counts": json.dumps(chart_quiz_counts),
     }
 
+    return context
+
+
+@read_from_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=results_etag)
+def analytics_dashboard(request):
+    """
+    Main analytics dashboard view with comprehensive quiz analytics
+    """
+    user = get_logged_in_user(request)
+    if not user:
+        return redirect("login")  # redirect if not logged in
+
+    # Date range filter (default last 30 days); only a few ranges, so cache
+    # entries per user stay bounded
+    try:
+        days = int(request.GET.get("days", DEFAULT_DASHBOARD_DAYS))
+    except ValueError:
+        days = DEFAULT_DASHBOARD_DAYS
+    if days not in DASHBOARD_DAYS:
+        days = DEFAULT_DASHBOARD_DAYS
+    context = get_or_build(
+        user.id, "dashboard", lambda: build_dashboard_context(user, days), days=days
+    )
+
     return render(request, "dashboard.html", context)
 
 
@@ -723,105 +1158,21 @@ from .decorators import custom_login_required
 
 def get_enhanced_suggestions(user):
     """
-    Generate personalized AI quiz suggestions based on user performance.
-    Multiple suggestions will be returned instead of just one.
+    Personalized AI quiz suggestions based on user performance.
+    Multiple suggestions are returned; they are precomputed (see suggestions.py).
     """
-    difficulty_summary = (
-        QuizResult.objects.filter(user=user)
-        .values("difficulty")
-        .annotate(
-            quizzes_taken=Count("id"),
-            avg_score=Avg("score"),
-        )
-    )
-
-    difficulty_stats = {row["difficulty"]: row for row in difficulty_summary}
-    suggestions = []
-
-    # ✅ Suggestion 1: Easy → Medium
-    if (
-        "easy" in difficulty_stats
-        and difficulty_stats["easy"]["quizzes_taken"] >= 5
-        and difficulty_stats["easy"]["avg_score"] >= 80
-    ):
-        suggestions.append({
-            "title": "Ready for Medium Level!",
-            "emoji": "🎯",
-            "desc": f"You’ve completed {difficulty_stats['easy']['quizzes_taken']} easy quizzes with "
-                    f"{difficulty_stats['easy']['avg_score']:.1f}% accuracy. Time to level up!",
-            "action_text": "🚀 Try Medium Quiz",
-            "action_url": "/start-quiz/?difficulty=medium",
-            "badge": "⬆️ Level Up"
-        })
-
-    # ✅ Suggestion 2: Medium → Hard
-    if (
-        "medium" in difficulty_stats
-        and difficulty_stats["medium"]["quizzes_taken"] >= 5
-        and difficulty_stats["medium"]["avg_score"] >= 75
-    ):
-        suggestions.append({
-            "title": "Hard Level Unlocked!",
-            "emoji": "🔥",
-            "desc": f"You’ve mastered medium quizzes with {difficulty_stats['medium']['avg_score']:.1f}% accuracy. "
-                    f"Now go for the ultimate challenge!",
-            "action_text": "🏆 Try Hard Quiz",
-            "action_url": "/start-quiz/?difficulty=hard",
-            "badge": "💪 Pro Mode"
-        })
-
-    # ✅ Suggestion 3: Hard → New Topic
-    if (
-        "hard" in difficulty_stats
-        and difficulty_stats["hard"]["quizzes_taken"] >= 3
-        and difficulty_stats["hard"]["avg_score"] >= 80
-    ):
-        suggestions.append({
-            "title": "Topic Mastery Achieved!",
-            "emoji": "🏆",
-            "desc": "Amazing! You’ve conquered hard quizzes in this topic. Time to explore a new one!",
-            "action_text": "🌟 Explore New Topic",
-            "action_url": "/userdashboard/",
-            "badge": "🎓 Master"
-        })
-
-    # ✅ Suggestion 4: Low accuracy improvement
-    if (
-        "easy" in difficulty_stats
-        and difficulty_stats["easy"]["avg_score"] < 50
-    ):
-        suggestions.append({
-            "title": "Focus on Basics",
-            "emoji": "📘",
-            "desc": f"Your average score in Easy quizzes is only {difficulty_stats['easy']['avg_score']:.1f}%. "
-                    f"Revise fundamentals before moving ahead.",
-            "action_text": "📖 Review Easy Quizzes",
-            "action_url": "/start-quiz/?difficulty=easy",
-            "badge": "🛠 Improve Basics"
-        })
-
-    # ✅ Suggestion 5: General motivation (if few quizzes taken)
-    total_quizzes = sum(stat["quizzes_taken"] for stat in difficulty_stats.values()) if difficulty_stats else 0
-    if total_quizzes < 3:
-        suggestions.append({
-            "title": "Start Your Journey!",
-            "emoji": "🚀",
-            "desc": "You haven’t attempted enough quizzes yet. Take more to unlock personalized suggestions!",
-            "action_text": "🎯 Take First Quiz",
-            "action_url": "/userdashboard/",
-            "badge": "🚀 Get Started"
-        })
-
-    return suggestions
+    return get_user_suggestions(user.id).suggestions
 
 
 @custom_login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=results_etag)
 def suggestions_view(request):
     """
     Page to render AI suggestions for the logged-in user
     """
-    user = Registration.objects.get(id=request.session["user_id"])
-    suggestions = get_enhanced_suggestions(user)
+    user = request.quiz_user
+    suggestions = get_or_build(user.id, "suggestions", lambda: get_enhanced_suggestions(user))
 
     context = {
         "user": user,
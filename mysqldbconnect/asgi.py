@@ -3,6 +3,12 @@ ASGI config for mysqldbconnect project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Persistent database connections are turned off here: async views run their
+queries on sync_to_async worker threads, and connections opened there are
+not closed at the end of the request, so CONN_MAX_AGE > 0 leaks them. Put a
+pooler (e.g. ProxySQL, or PgBouncer on PostgreSQL) in front of the database
+if connection setup cost matters under ASGI.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +18,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysqldbconnect.settings')
+os.environ['QUIZ_DB_CONN_MAX_AGE'] = '0'
 
 application = get_asgi_application()
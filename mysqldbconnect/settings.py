@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 LOGIN_URL = '/login/'
@@ -42,13 +43,31 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles','base',
 ]
 
+# Request metrics for /metrics (base/metrics.py); off unless QUIZ_METRICS=1.
+# When off the middleware removes itself and templates use the stock backend.
+METRICS_ENABLED = os.environ.get("QUIZ_METRICS", "0") == "1"
+# If set, /metrics requires "Authorization: Bearer <token>"; if not, only
+# admin sessions can read it (check base.W002 warns about this).
+METRICS_TOKEN = os.environ.get("QUIZ_METRICS_TOKEN", "")
+
+# Request profiling (base/profiling.py); off unless QUIZ_PROFILING=1.
+PROFILING_ENABLED = os.environ.get("QUIZ_PROFILING", "0") == "1"
+PROFILING_SAMPLE_RATE = float(os.environ.get("QUIZ_PROFILING_SAMPLE_RATE", "0"))
+PROFILING_SLOW_MS = int(os.environ.get("QUIZ_PROFILING_SLOW_MS", "500"))
+PROFILING_TOP_FUNCTIONS = 30
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+
 MIDDLEWARE = [
+    'base.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'base.middleware.QuizUserMiddleware',
+    'base.profiling.ProfilingMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -56,7 +75,10 @@ ROOT_URLCONF = 'mysqldbconnect.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': (
+            'base.template_backends.InstrumentedDjangoTemplates' if METRICS_ENABLED
+            else 'django.template.backends.django.DjangoTemplates'
+        ),
         'DIRS': [BASE_DIR / "myapp" / "templates"],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,18 +96,117 @@ WSGI_APPLICATION = 'mysqldbconnect.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# QUIZ_DB_PROFILE picks one of DATABASE_PROFILES. The base.dbbackends engines
+# are the stock Django backends plus connection-open counters (base/dbstats.py).
+# Connections are kept for QUIZ_DB_CONN_MAX_AGE seconds (0 closes them after
+# every request, "none" keeps them forever) and health-checked before reuse.
+# asgi.py forces 0: persistent connections are not safe under ASGI.
+
+DATABASE_PROFILES = {
+    'mysql': {
+        'ENGINE': 'base.dbbackends.mysql',
+        'NAME': os.environ.get("QUIZ_DB_NAME", 'quizzer'),
+        'USER': os.environ.get("QUIZ_DB_USER", 'root'),
+        'PASSWORD': os.environ.get("QUIZ_DB_PASSWORD", 'Soundarya@9786'),
+        'HOST': os.environ.get("QUIZ_DB_HOST", 'localhost'),
+        'PORT': os.environ.get("QUIZ_DB_PORT", '3306'),
+    },
+    # Local benchmarking: WAL lets readers run alongside the single writer,
+    # and IMMEDIATE transactions wait on the lock instead of failing mid-way.
+    'sqlite': {
+        'ENGINE': 'base.dbbackends.sqlite3',
+        'NAME': os.environ.get("QUIZ_SQLITE_PATH", str(BASE_DIR / 'db.sqlite3')),
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+    },
+}
+
+DB_PROFILE = os.environ.get("QUIZ_DB_PROFILE", 'mysql')
+_conn_max_age = os.environ.get("QUIZ_DB_CONN_MAX_AGE", "60")
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': 'quizzer',
-        'USER': 'root',
-        'PASSWORD': 'Soundarya@9786',
-        'HOST': 'localhost',
-        'PORT': '3306',
+        **DATABASE_PROFILES[DB_PROFILE],
+        'CONN_MAX_AGE': None if _conn_max_age.lower() == "none" else int(_conn_max_age),
+        'CONN_HEALTH_CHECKS': os.environ.get("QUIZ_DB_CONN_HEALTH_CHECKS", "1") == "1",
+    }
+}
+
+# Optional read replica for the analytics views (base/routers.py). Set
+# QUIZ_DB_REPLICA to the replica's host (mysql) or database file (sqlite;
+# two SQLite files are enough to try the routing locally; copy the primary's
+# file, as migrate only runs on the primary). Sessions that just submitted a
+# quiz, and analytics cache entries built right after one, read from the
+# primary for REPLICA_PIN_SECONDS.
+
+REPLICA_DB_ALIAS = 'replica'
+REPLICA_PIN_SECONDS = int(os.environ.get("QUIZ_DB_REPLICA_PIN_SECONDS", "10"))
+if os.environ.get("QUIZ_DB_REPLICA"):
+    DATABASES[REPLICA_DB_ALIAS] = {
+        **DATABASES['default'],
+        'HOST' if DB_PROFILE == 'mysql' else 'NAME': os.environ["QUIZ_DB_REPLICA"],
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['base.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The analytics caches rely on every worker seeing the same invalidations, so
+# the default is a file cache shared by all processes on the host. locmem
+# (QUIZ_CACHE_BACKEND=locmem) is per process; with WEB_CONCURRENCY > 1 the
+# analytics cache then switches itself off (base/caching.py, check base.W001).
+
+if os.environ.get("QUIZ_CACHE_BACKEND", "file") == "file":
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get("QUIZ_CACHE_DIR", str(BASE_DIR / ".cache")),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'smartquizzer',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Login token buckets stay in a per-process locmem cache whatever the default is
+CACHES['ratelimit'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'login-ratelimit',
+    'OPTIONS': {'MAX_ENTRIES': 50000},
 }
 
+# Part of the ETag on per-user result pages; set it (e.g. to the release tag)
+# on deploys that change their templates or static assets so browsers stop
+# getting 304s for the old HTML.
+RESULTS_ETAG_VERSION = os.environ.get("QUIZ_RELEASE", "1")
+
+ANALYTICS_CACHE_ALIAS = 'default'
+ANALYTICS_CACHE_TIMEOUT = 60 * 60
+CATALOG_CACHE_TIMEOUT = 5 * 60
+# Admin cohort report (base/cohort.py), shared by all workers; refresh it with
+# `manage.py cohort_analytics` (e.g. nightly from cron).
+COHORT_REPORT_PATH = os.environ.get("QUIZ_COHORT_REPORT", str(BASE_DIR / ".cache" / "cohort_report.json"))
+# Seconds to cache a student's non-sensitive profile fields; 0 disables it.
+QUIZ_USER_CACHE_TIMEOUT = int(os.environ.get("QUIZ_USER_CACHE_TIMEOUT", "60"))
+
+# Near-duplicate detection (base/dedup.py): MinHash LSH index kept on disk in
+# this directory and memory-mapped by every worker, alongside the cluster
+# report written by `manage.py rebuild_dedup_index`.
+# DEDUP_ON_INGEST is "flag" (save and report), "skip" or "off".
+DEDUP_INDEX_PATH = os.environ.get("QUIZ_DEDUP_INDEX", str(BASE_DIR / ".cache" / "dedup_index"))
+DEDUP_ON_INGEST = os.environ.get("QUIZ_DEDUP_ON_INGEST", "flag")
+DEDUP_THRESHOLD = 0.8
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -106,6 +227,32 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Hashers with a configurable PBKDF2 cost; the first entry hashes new and
+# rehashed passwords, the rest only verify older hashes. Override with a
+# comma-separated QUIZ_PASSWORD_HASHERS.
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+
+PBKDF2_ITERATIONS = int(os.environ.get("QUIZ_PBKDF2_ITERATIONS", "1000000"))
+PASSWORD_HASHERS = os.environ.get("QUIZ_PASSWORD_HASHERS", ",".join([
+    'base.hashers.ConfigurablePBKDF2PasswordHasher',
+    'base.hashers.ConfigurablePBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+])).split(",")
+
+# Login rate limiting (base/ratelimit.py): failed logins are charged to token
+# buckets per client IP, per email and IP, and per email. The limits are
+# ratelimit.DEFAULT_LIMITS; set LOGIN_RATE_LIMITS to override single scopes,
+# e.g. {"account": (10, 10 / 300)} as (capacity, tokens refilled per second).
+# An address that logged in successfully is exempt from the per-email bucket
+# for LOGIN_RATELIMIT_KNOWN_SECONDS, so guessing elsewhere cannot lock it out.
+LOGIN_RATELIMIT_ENABLED = os.environ.get("QUIZ_LOGIN_RATELIMIT", "1") == "1"
+LOGIN_RATELIMIT_CACHE_ALIAS = 'ratelimit'
+LOGIN_RATELIMIT_TRUST_FORWARDED = False
+LOGIN_RATELIMIT_KNOWN_SECONDS = 30 * 24 * 3600
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -122,6 +269,18 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Page CSS/JS lives in base/static/{css,js}. collectstatic writes content-hashed
+# copies plus .gz (and .br, with brotli installed) variants; WhiteNoise serves
+# the hashed names with a far-future immutable Cache-Control. Run
+# `python manage.py collectstatic` on every deploy: with DEBUG off, a page
+# that references a file missing from the manifest raises an error rather
+# than linking an unhashed URL that would be cached for a year.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field